@@ -0,0 +1,240 @@
+from collections import OrderedDict
+from os import walk
+from os.path import normpath
+
+import pygame
+from settings import *
+
+
+class AssetCache:
+    """
+    Registro compartido de recursos (imágenes y sonidos) indexado por ruta.
+
+    Cada archivo se carga una sola vez por proceso y todas las instancias que lo piden reciben la
+    misma superficie o el mismo sonido. Cuando la memoria ocupada supera `max_bytes` se descartan
+    las entradas usadas hace más tiempo (LRU); los sprites que todavía las usen las conservan, solo
+    se volverán a cargar si alguien las pide de nuevo.
+
+    Las superficies devueltas son compartidas: no deben modificarse (por ejemplo con `set_alpha`)
+    sin hacer antes una copia.
+
+    Atributos
+    ----------
+    max_bytes : int
+        Memoria máxima aproximada que puede ocupar la caché.
+    memory : int
+        Memoria aproximada ocupada en bytes.
+    hits : int
+        Peticiones servidas desde la caché.
+    misses : int
+        Peticiones que han tenido que cargar el archivo.
+    evictions : int
+        Entradas descartadas por falta de espacio.
+
+    Métodos
+    -------
+    image(path, alpha):
+        Devuelve la imagen de una ruta.
+    folder(path):
+        Devuelve todas las imágenes de una carpeta, en el mismo orden que `support.import_folder`.
+    sound(path, volume):
+        Devuelve el sonido de una ruta.
+    clear():
+        Vacía la caché.
+    """
+    def __init__(self, max_bytes = ASSET_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.folders = {}
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def _put(self, key, asset, size):
+        self.entries[key] = (asset, size)
+        self.memory += size
+        while self.memory > self.max_bytes and len(self.entries) > 1:
+            _, (_, old_size) = self.entries.popitem(last = False)
+            self.memory -= old_size
+            self.evictions += 1
+        return asset
+
+    def image(self, path, alpha = True):
+        """
+           Devuelve la imagen de una ruta, convertida al formato de la pantalla.
+
+           Parámetros
+           ----------
+           path : str
+               Ruta de la imagen.
+           alpha : bool, opcional
+               Usar `convert_alpha()` (por defecto) o `convert()`.
+
+           Retorna
+           -------
+           pygame.Surface
+               Superficie compartida.
+           """
+        key = ('image', normpath(path), alpha)
+        surface = self._get(key)
+        if surface is None:
+            surface = pygame.image.load(path)
+            surface = surface.convert_alpha() if alpha else surface.convert()
+            self._put(key, surface, surface.get_bytesize() * surface.get_width() * surface.get_height())
+        return surface
+
+    def folder(self, path):
+        """
+           Devuelve todas las imágenes de una carpeta.
+
+           Parámetros
+           ----------
+           path : str
+               Ruta de la carpeta.
+
+           Retorna
+           -------
+           list
+               Lista nueva con las superficies compartidas de la carpeta.
+           """
+        files = self.folders.get(normpath(path))
+        if files is None:
+            files = []
+            for _, _, img_files in walk(path):
+                for image in img_files:
+                    files.append(path + '/' + image)
+            self.folders[normpath(path)] = files
+        return [self.image(full_path) for full_path in files]
+
+    def sound(self, path, volume = None):
+        """
+           Devuelve el sonido de una ruta.
+
+           Parámetros
+           ----------
+           path : str
+               Ruta del archivo de audio.
+           volume : float, opcional
+               Volumen a aplicar al sonido compartido.
+
+           Retorna
+           -------
+           pygame.mixer.Sound
+               Sonido compartido.
+           """
+        key = ('sound', normpath(path))
+        sound = self._get(key)
+        if sound is None:
+            sound = pygame.mixer.Sound(path)
+            self._put(key, sound, len(sound.get_raw()))
+        if volume is not None:
+            sound.set_volume(volume)
+        return sound
+
+    def clear(self):
+        self.entries.clear()
+        self.folders.clear()
+        self.memory = 0
+
+
+class TextCache:
+    """
+    Caché de textos renderizados, indexada por fuente, texto, antialias y colores.
+
+    `font.render` rasteriza el texto completo en cada llamada; con la caché un texto que no ha cambiado
+    desde el fotograma anterior (la experiencia, las etiquetas del menú de mejoras, los botones del
+    menú principal...) solo cuesta una búsqueda en un diccionario. Cuando hay más de `max_entries`
+    textos se descartan los usados hace más tiempo (LRU).
+
+    Las superficies devueltas son compartidas: no deben modificarse sin hacer antes una copia.
+
+    Atributos
+    ----------
+    max_entries : int
+        Número máximo de textos guardados.
+    hits : int
+        Peticiones servidas desde la caché.
+    misses : int
+        Peticiones que han tenido que renderizar el texto.
+    evictions : int
+        Textos descartados por falta de espacio.
+
+    Métodos
+    -------
+    render(font, text, antialias, color, background):
+        Devuelve la superficie de un texto, como `font.render`.
+    clear():
+        Vacía la caché.
+    """
+    def __init__(self, max_entries = TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def render(self, font, text, antialias, color, background = None):
+        """
+           Devuelve la superficie de un texto, renderizándolo solo si no está en la caché.
+
+           Parámetros
+           ----------
+           font : pygame.font.Font
+               Fuente con la que se renderiza.
+           text : str
+               Texto a renderizar.
+           antialias : bool
+               Suavizar los bordes del texto.
+           color : str or tuple or pygame.Color
+               Color del texto.
+           background : str or tuple or pygame.Color, opcional
+               Color de fondo; por defecto el fondo es transparente.
+
+           Retorna
+           -------
+           pygame.Surface
+               Superficie compartida con el texto.
+           """
+        # pygame.Color no se puede usar como clave de un diccionario
+        if isinstance(color, pygame.Color):
+            color = tuple(color)
+        if isinstance(background, pygame.Color):
+            background = tuple(background)
+        key = (font, text, antialias, color, background)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color, background)
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last = False)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+
+
+# Cachés únicas para todo el juego
+asset_cache = AssetCache()
+text_cache = TextCache()
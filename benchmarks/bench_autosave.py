@@ -0,0 +1,74 @@
+"""
+Benchmark del autoguardado incremental frente al guardado completo de la partida.
+
+Rellena la capa de entidades del mapa con `--enemies` enemigos (como `bench_load_save`), guarda la
+partida completa y simula `--frames` fotogramas con el guion de `headless.py`, guardando cada
+`--interval` fotogramas de dos formas sobre bases de datos distintas:
+
+- Completo: `Level.save_game`, que escribe el jugador, todos los enemigos y toda la hierba cortada.
+- Incremental: `Level.autosave`, que solo escribe lo marcado como cambiado (`dirty`).
+
+Se usa escritura inmediata para medir el coste real de cada guardado, `commit` incluido.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_autosave [--enemies 2000] [--frames 1200] [--interval 120]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import game_time
+from benchmarks.bench_load_save import crowded_layouts
+from headless import HeadlessRunner, init_headless
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Benchmark del autoguardado incremental.')
+    parser.add_argument('--enemies', type = int, default = 2000, help = 'enemigos añadidos al mapa')
+    parser.add_argument('--frames', type = int, default = 1200, help = 'fotogramas simulados')
+    parser.add_argument('--interval', type = int, default = 120, help = 'fotogramas entre guardados')
+    args = parser.parse_args(argv)
+
+    init_headless()
+    from level import Level
+    from database.database import DataBase
+
+    layouts = crowded_layouts(args.enemies)
+    random.seed(0)
+    level = Level(layouts)
+    with tempfile.TemporaryDirectory() as directory:
+        full_db = DataBase(os.path.join(directory, 'full.db'))
+        delta_db = DataBase(os.path.join(directory, 'delta.db'))
+        level.save_game(full_db, 1)
+        level.save_game(delta_db, 1)
+
+        runner = HeadlessRunner(seed = 0, level = level)
+        full_times, delta_times, delta_rows = [], [], []
+        for _ in range(args.frames // args.interval):
+            runner.run(args.interval)
+
+            start = time.perf_counter()
+            result = level.autosave(delta_db, 1)
+            delta_times.append((time.perf_counter() - start) * 1000)
+            delta_rows.append(result['rows'])
+
+            start = time.perf_counter()
+            level.save_game(full_db, 1)
+            full_times.append((time.perf_counter() - start) * 1000)
+        game_time.stop_simulation()
+
+        full_rows = 1 + len(level.enemy_manager) + len(level.cut_grass)
+        print(f'{len(level.enemy_manager)} enemigos, {len(full_times)} guardados cada {args.interval} fotogramas:')
+        print(f'  completo     media {sum(full_times) / len(full_times):>8.2f} ms  peor {max(full_times):>8.2f} ms  '
+              f'{full_rows} filas por guardado')
+        print(f'  incremental  media {sum(delta_times) / len(delta_times):>8.2f} ms  peor {max(delta_times):>8.2f} ms  '
+              f'{sum(delta_rows) / len(delta_rows):.1f} filas por guardado (máximo {max(delta_rows)})')
+        full_db.close()
+        delta_db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark del coste de colisiones por fotograma en función del número de entidades.
+
+Construye el nivel real a partir de `map/*.csv` y mueve N entidades de prueba por el mapa,
+midiendo cuánto tarda `Entity.move` (y por tanto `Entity.collision`) en cada fotograma con el
+índice espacial (`SpatialHashGroup`) y con un `pygame.sprite.Group` normal. Además comprueba que
+ambas versiones dejan a las entidades exactamente en la misma posición.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_collision
+"""
+import os
+import random
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from settings import *
+
+ENTITY_COUNTS = (10, 100, 1000)
+FRAMES = 120
+SPEED = 5
+SEED = 1234
+
+
+def make_probes(obstacles, map_rect, n):
+    """
+       Crea `n` entidades de prueba con posiciones y direcciones aleatorias reproducibles.
+
+       Parámetros
+       ----------
+       obstacles : pygame.sprite.Group
+           Grupo de obstáculos contra el que colisionan las entidades.
+       map_rect : pygame.Rect
+           Rectángulo del mapa donde se reparten las entidades.
+       n : int
+           Número de entidades a crear.
+
+       Retorna
+       -------
+       list
+           Lista de entidades de prueba.
+       """
+    from entity import Entity
+
+    rng = random.Random(SEED)
+    probes = []
+    for _ in range(n):
+        probe = Entity([])
+        x = rng.randrange(map_rect.width - TILESIZE)
+        y = rng.randrange(map_rect.height - TILESIZE)
+        probe.rect = pygame.Rect(x, y, TILESIZE, TILESIZE)
+        probe.hitbox = probe.rect.inflate(0, -10)
+        probe.obstacle_sprites = obstacles
+        probe.direction = pygame.math.Vector2(rng.choice((-1, 0, 1)), rng.choice((-1, 0, 1)))
+        probes.append(probe)
+    return probes
+
+
+def run_frames(probes):
+    """
+       Mueve todas las entidades durante `FRAMES` fotogramas.
+
+       Retorna
+       -------
+       tuple
+           (milisegundos medios por fotograma, posiciones finales de las hitbox).
+       """
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        if frame % 30 == 0:
+            for probe in probes:
+                probe.direction.x, probe.direction.y = -probe.direction.x, probe.direction.y
+        for probe in probes:
+            probe.move(SPEED)
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / FRAMES, [tuple(probe.hitbox) for probe in probes]
+
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGTH))
+
+    from level import Level
+
+    level = Level()
+    grid_obstacles = level.obstacle_sprites
+    flat_obstacles = pygame.sprite.Group(grid_obstacles.sprites())
+    map_rect = level.visible_sprites.floor_rect
+
+    print(f'Obstáculos en el mapa: {len(grid_obstacles)}  ({FRAMES} fotogramas por medida)')
+    print(f'{"entidades":>10} {"grupo (ms)":>12} {"rejilla (ms)":>13} {"mejora":>8}')
+    for n in ENTITY_COUNTS:
+        flat_ms, flat_positions = run_frames(make_probes(flat_obstacles, map_rect, n))
+        grid_ms, grid_positions = run_frames(make_probes(grid_obstacles, map_rect, n))
+        if flat_positions != grid_positions:
+            raise AssertionError('La rejilla no resuelve las colisiones igual que el grupo completo')
+        print(f'{n:>10} {flat_ms:>12.3f} {grid_ms:>13.3f} {flat_ms / grid_ms:>7.1f}x')
+
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark de los guardados de `DataBase`: escritura inmediata frente a escritura diferida.
+
+Mide dos cosas sobre una base de datos temporal:
+
+- Guardados por segundo: `update_player` repetido, con un `commit` por guardado (modo normal) o
+  encolado para el hilo de escritura (modo diferido, contando el `flush()` final).
+- Bloqueo por fotograma: simula una partida en la que cada fotograma guarda el jugador y el estado
+  de unos cuantos enemigos, y mide cuánto tiempo pasa el bucle del juego dentro de esas llamadas
+  (media, p99 y peor fotograma).
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_database [--saves 2000] [--frames 300] [--enemies 20]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from database.database import DataBase
+from profiling import percentile
+
+ENEMY_NAMES = ('bamboo', 'spirit', 'raccoon', 'squid')
+
+
+def open_database(path, write_behind, enemies):
+    """
+       Crea una base de datos nueva con una partida (save_id 1), su jugador y sus enemigos.
+       """
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    db = DataBase(path, write_behind = write_behind)
+    db.cur.execute("INSERT INTO players VALUES (1, 0, 0, 100, 100, 60, 60, 0, 5, 10, 4, 0, 0, 0, '{}')")
+    db.cur.executemany('INSERT INTO enemies (save_id, enemy_name, position_x, position_y, health) VALUES (1, ?, 0, 0, 100)',
+                       [(f'{ENEMY_NAMES[index % len(ENEMY_NAMES)]}_{index}',) for index in range(enemies)])
+    db.conn.commit()
+    return db
+
+
+def player_data(frame):
+    return {
+        'position': (frame, frame), 'health': 100, 'max_health': 100, 'energy': 60, 'max_energy': 60,
+        'exp': frame, 'speed': 5, 'attack': 10, 'magic': 4,
+        'stats': {'health': 100, 'energy': 60, 'attack': 10, 'magic': 4, 'speed': 5},
+    }
+
+
+def saves_per_second(path, write_behind, saves):
+    db = open_database(path, write_behind, 0)
+    start = time.perf_counter()
+    for index in range(saves):
+        db.update_player(1, player_data(index))
+    db.flush()
+    elapsed = time.perf_counter() - start
+    db.close()
+    return saves / elapsed
+
+
+def frame_stalls(path, write_behind, frames, enemies):
+    """
+       Devuelve el tiempo en milisegundos que cada fotograma pasa dentro de las llamadas de guardado.
+       """
+    db = open_database(path, write_behind, enemies)
+    stalls = []
+    for frame in range(frames):
+        start = time.perf_counter()
+        db.update_player(1, player_data(frame))
+        for index in range(enemies):
+            db.save_enemy_state(1, f'{ENEMY_NAMES[index % len(ENEMY_NAMES)]}_{index}', 100 - frame % 100, True)
+        stalls.append((time.perf_counter() - start) * 1000)
+        time.sleep(1 / 240) # El resto del fotograma
+    db.close()
+    return stalls
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Benchmark de la escritura diferida de DataBase.')
+    parser.add_argument('--saves', type = int, default = 2000, help = 'guardados para medir el rendimiento')
+    parser.add_argument('--frames', type = int, default = 300, help = 'fotogramas simulados')
+    parser.add_argument('--enemies', type = int, default = 20, help = 'enemigos guardados por fotograma')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.db')
+        print(f'Guardados por segundo ({args.saves} update_player):')
+        for name, write_behind in (('inmediato', False), ('diferido', True)):
+            print(f'  {name:<10} {saves_per_second(path, write_behind, args.saves):>10.0f} guardados/s')
+
+        print(f'Tiempo del fotograma dentro de los guardados (jugador + {args.enemies} enemigos por fotograma):')
+        for name, write_behind in (('inmediato', False), ('diferido', True)):
+            stalls = frame_stalls(path, write_behind, args.frames, args.enemies)
+            print(f'  {name:<10} media {sum(stalls) / len(stalls):>7.3f} ms  p99 {percentile(stalls, 99):>7.3f} ms  '
+                  f'peor {max(stalls):>7.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
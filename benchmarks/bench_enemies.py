@@ -0,0 +1,88 @@
+"""
+Benchmark del cálculo de distancia, dirección y estado de los enemigos respecto al jugador.
+
+Compara el cálculo por enemigo de antes (`Enemy.get_player_distance_direction` con `Vector2`, dos o
+tres veces por fotograma) con la pasada por lotes de `EnemyManager.update_player_vectors`, con 1.000
+y 10.000 enemigos repartidos al azar alrededor del jugador. Solo se mide `enemy_status` y `action`;
+los ataques al jugador se sustituyen por una función vacía.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_enemies [--counts 1000 10000] [--frames 60]
+"""
+import argparse
+import random
+import time
+
+from headless import init_headless
+
+SEED = 1234
+ENEMY_NAMES = ('bamboo', 'spirit', 'raccoon', 'squid')
+
+
+class FakePlayer:
+    """
+    Jugador mínimo: solo hace falta su rectángulo.
+    """
+    def __init__(self):
+        import pygame
+        self.rect = pygame.Rect(0, 0, 64, 64)
+
+
+def create_enemies(count, groups):
+    """
+       Crea `count` enemigos en posiciones aleatorias (reproducibles) alrededor del origen.
+       """
+    import pygame
+    from enemy import Enemy
+
+    obstacles = pygame.sprite.Group()
+    ignore = lambda *args: None
+    rng = random.Random(SEED)
+    return [Enemy(rng.choice(ENEMY_NAMES), (rng.randint(-800, 800), rng.randint(-800, 800)),
+                  groups, obstacles, ignore, ignore, ignore)
+            for _ in range(count)]
+
+
+def step(enemies, player):
+    for enemy in enemies:
+        enemy.enemy_status(player)
+        enemy.action(player)
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Benchmark del cálculo por lotes de EnemyManager.')
+    parser.add_argument('--counts', type = int, nargs = '+', default = [1000, 10000], help = 'número de enemigos')
+    parser.add_argument('--frames', type = int, default = 60, help = 'fotogramas medidos')
+    args = parser.parse_args(argv)
+
+    init_headless()
+    from enemy_manager import EnemyManager
+
+    player = FakePlayer()
+    for count in args.counts:
+        # Antes: cada enemigo calcula sus vectores por su cuenta
+        enemies = create_enemies(count, [])
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            step(enemies, player)
+        before_ms = (time.perf_counter() - start) * 1000 / args.frames
+        before = [(enemy.status, tuple(enemy.direction)) for enemy in enemies]
+
+        # Ahora: una pasada por lotes y los enemigos leen el resultado
+        manager = EnemyManager()
+        enemies = create_enemies(count, [manager])
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            manager.update_player_vectors(player)
+            step(enemies, player)
+        after_ms = (time.perf_counter() - start) * 1000 / args.frames
+        after = [(enemy.status, tuple(enemy.direction)) for enemy in enemies]
+
+        assert before == after, 'El cálculo por lotes no coincide con el cálculo por enemigo'
+        print(f'{count:>6} enemigos: antes {before_ms:>8.2f} ms/fotograma  '
+              f'ahora {after_ms:>8.2f} ms/fotograma  ({before_ms / after_ms:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark del guardado de la población de enemigos en `DataBase`.
+
+Crea una base de datos temporal con varias partidas de `--enemies` enemigos cada una y mide:
+
+- `save_enemies_bulk`: el primer guardado de una partida (inserciones) y los siguientes
+  (actualizaciones por `spawn_id`), cada uno en una sola transacción.
+- `save_enemy_state` por enemigo, con un `commit` por llamada, como se guardaba antes. Se mide
+  sobre una muestra de `--sample` enemigos y se extrapola a la partida completa.
+- La lectura de los enemigos vivos de una partida, que usa el índice (save_id, spawn_id).
+
+Los enemigos son objetos con los mismos atributos que `Enemy` (no hace falta cargar gráficos).
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_enemy_save [--enemies 10000] [--slots 4] [--sample 500]
+"""
+import argparse
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+import pygame
+
+from database.database import DataBase
+
+ENEMY_NAMES = ('bamboo', 'spirit', 'raccoon', 'squid')
+
+
+def make_enemies(count, offset = 0):
+    return [SimpleNamespace(spawn_id = index, enemy_name = ENEMY_NAMES[index % len(ENEMY_NAMES)],
+                            rect = pygame.Rect(index % 200 * 64 + offset, index // 200 * 64, 64, 64),
+                            health = 100 - offset % 100)
+            for index in range(count)]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Benchmark del guardado de enemigos de DataBase.')
+    parser.add_argument('--enemies', type = int, default = 10000, help = 'enemigos por partida')
+    parser.add_argument('--slots', type = int, default = 4, help = 'partidas guardadas en la base de datos')
+    parser.add_argument('--sample', type = int, default = 500, help = 'enemigos guardados uno a uno')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = DataBase(os.path.join(directory, 'bench.db'))
+        enemies = make_enemies(args.enemies)
+        for save_id in range(2, args.slots + 1):
+            db.save_enemies_bulk(save_id, enemies)
+
+        print(f'{args.enemies} enemigos por partida, {args.slots} partidas:')
+        insert_ms = timed(db.save_enemies_bulk, 1, enemies)
+        print(f'  save_enemies_bulk (primer guardado)   {insert_ms:>9.1f} ms')
+
+        moved = make_enemies(args.enemies, 32)
+        update_ms = timed(db.save_enemies_bulk, 1, moved)
+        print(f'  save_enemies_bulk (actualización)     {update_ms:>9.1f} ms')
+
+        sample = moved[:args.sample]
+        start = time.perf_counter()
+        for enemy in sample:
+            db.save_enemy_state(1, enemy.enemy_name, enemy.health - 1, True, enemy.spawn_id)
+        single_ms = (time.perf_counter() - start) * 1000 / len(sample) * args.enemies
+        print(f'  save_enemy_state uno a uno (estimado) {single_ms:>9.1f} ms  ({single_ms / update_ms:.0f}x)')
+
+        start = time.perf_counter()
+        rows = db.cur.execute('SELECT spawn_id, enemy_name, position_x, position_y, health FROM enemies '
+                              'WHERE save_id = ? AND is_alive = 1', (1,)).fetchall()
+        select_ms = (time.perf_counter() - start) * 1000
+        plan = db.cur.execute('EXPLAIN QUERY PLAN SELECT * FROM enemies WHERE save_id = ?', (1,)).fetchall()
+        print(f'  lectura de la partida ({len(rows)} filas)    {select_ms:>9.1f} ms  [{plan[0][-1]}]')
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
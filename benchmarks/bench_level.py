@@ -0,0 +1,160 @@
+"""
+Benchmark reproducible del bucle de actualización y dibujado de `Level`.
+
+Construye el nivel a partir de los `map/*.csv` reales y de mapas sintéticos con 10x y 100x enemigos
+y hierba (el mapa original repetido en mosaico), lo simula sin ventana con un guion de entrada fijo y
+una semilla fija, y mide los percentiles p50/p95/p99 del fotograma completo y de cada fase:
+`visible_sprites.update`, `enemy_update_level`, `attack_logic_player`, `custom_draw` y `ui.display`.
+
+Los resultados se guardan en un JSON que se puede comparar entre commits.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_level [--frames 600] [--scales 1 10 100] [--output bench_output.json]
+"""
+import argparse
+import json
+import random
+import subprocess
+import time
+
+from headless import DEFAULT_SCRIPT, HeadlessRunner, init_headless
+from profiling import percentile
+from map_compiler import import_map_layouts
+
+PLAYER_ID = 394
+SEED = 1234
+
+# Nombre de cada fase del perfilador en el informe
+PHASES = {
+    'update': 'visible_sprites.update',
+    'enemy_update': 'enemy_update_level',
+    'attack_logic': 'attack_logic_player',
+    'draw': 'custom_draw',
+    'ui': 'ui.display',
+}
+
+
+def scale_layouts(layouts, factor):
+    """
+       Repite el mapa en mosaico para multiplicar enemigos, hierba y objetos por `factor`.
+
+       Solo se conserva el jugador de la primera copia.
+
+       Parámetros
+       ----------
+       layouts : dict
+           Capas del mapa original.
+       factor : int
+           Número de copias del mapa.
+
+       Retorna
+       -------
+       dict
+           Capas del mapa sintético.
+       """
+    columns = 1
+    while columns * columns < factor:
+        columns += 1
+    rows = -(-factor // columns)
+
+    scaled = {}
+    for style, layout in layouts.items():
+        width = len(layout[0])
+        empty_row = [-1] * width
+        grid = []
+        for tile_row in range(rows):
+            for row in layout:
+                new_row = []
+                for tile_col in range(columns):
+                    copy = tile_row * columns + tile_col
+                    if copy >= factor:
+                        new_row.extend(empty_row)
+                    elif copy > 0 and style == 'entities':
+                        new_row.extend(-1 if col == PLAYER_ID else col for col in row)
+                    else:
+                        new_row.extend(row)
+                grid.append(new_row)
+        scaled[style] = grid
+    return scaled
+
+
+def summarize(values):
+    """
+       Resume una lista de duraciones en milisegundos.
+       """
+    return {
+        'mean': round(sum(values) / len(values), 4) if values else 0.0,
+        'p50': round(percentile(values, 50), 4),
+        'p95': round(percentile(values, 95), 4),
+        'p99': round(percentile(values, 99), 4),
+    }
+
+
+def run_scenario(factor, frames):
+    """
+       Construye y simula un nivel con el mapa multiplicado por `factor`.
+
+       Retorna
+       -------
+       dict
+           Resultados del escenario: tiempo de construcción, población y percentiles por fase.
+       """
+    from level import Level
+
+    random.seed(SEED)
+    layouts = scale_layouts(import_map_layouts(), factor)
+    start = time.perf_counter()
+    level = Level(layouts)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    level.profiler.enabled = True
+    level.profiler.keep_samples = True
+    script = DEFAULT_SCRIPT * (frames // sum(length for length, _ in DEFAULT_SCRIPT) + 1)
+    runner = HeadlessRunner(script = script, render = True, level = level)
+    runner.run(frames)
+
+    return {
+        'scale': factor,
+        'frames': frames,
+        'build_ms': round(build_ms, 2),
+        'enemies': len(level.enemy_manager),
+        'grass': len(level.attackable_sprites) - len(level.enemy_manager),
+        'obstacles': len(level.obstacle_sprites),
+        'frame': summarize(runner.frame_times),
+        'phases': {label: summarize(level.profiler.samples.get(name, [])) for name, label in PHASES.items()},
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output = True, text = True).stdout.strip()
+    except OSError:
+        return None
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Benchmark del bucle de Level.')
+    parser.add_argument('--frames', type = int, default = 600, help = 'fotogramas por escenario')
+    parser.add_argument('--scales', type = int, nargs = '+', default = [1, 10, 100], help = 'multiplicadores del mapa')
+    parser.add_argument('--output', default = 'bench_output.json', help = 'archivo JSON de resultados')
+    args = parser.parse_args(argv)
+
+    init_headless()
+    results = {'revision': git_revision(), 'seed': SEED, 'scenarios': {}}
+    for factor in args.scales:
+        scenario = run_scenario(factor, args.frames)
+        results['scenarios'][f'x{factor}'] = scenario
+        frame = scenario['frame']
+        print(f'x{factor:<4} {scenario["enemies"]:>6} enemigos  construcción {scenario["build_ms"]:>9.1f} ms  '
+              f'fotograma p50 {frame["p50"]:.3f}  p95 {frame["p95"]:.3f}  p99 {frame["p99"]:.3f} ms')
+        for label, stats in scenario['phases'].items():
+            print(f'       {label:<24} p50 {stats["p50"]:.3f}  p95 {stats["p95"]:.3f}  p99 {stats["p99"]:.3f} ms')
+
+    with open(args.output, 'w') as output:
+        json.dump(results, output, indent = 2)
+    print(f'Resultados guardados en {args.output}')
+
+
+if __name__ == '__main__':
+    main()
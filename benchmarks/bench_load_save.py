@@ -0,0 +1,125 @@
+"""
+Benchmark del tiempo hasta poder jugar al cargar una partida grande.
+
+Rellena la capa de entidades del mapa con `--enemies` enemigos, juega la partida guardándola con
+`Level.save_game` después de matar a una parte (`--killed`) y de mover y herir al resto, y mide
+tres formas de llegar a un `Level` listo para jugar:
+
+- Nivel nuevo: `Level(layouts)`, sin restaurar nada (la referencia).
+- Nivel nuevo + restauración fila a fila: se crea el nivel desde la capa de entidades y después se
+  consulta cada enemigo y el jugador por separado para matarlo o colocarlo como estaba.
+- `load_save`: `DataBase.load_save` con tres consultas y `Level(layouts, save)`, que crea solo los
+  enemigos vivos y ya en su estado guardado.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_load_save [--enemies 2000] [--killed 0.5] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from headless import init_headless
+from map_compiler import import_map_layouts
+
+ENEMY_IDS = (390, 391, 392, 393) # bamboo, spirit, raccoon, squid en la capa de entidades
+
+
+def crowded_layouts(enemies):
+    """
+       Devuelve las capas del mapa con enemigos añadidos en casillas libres de la capa de entidades.
+       """
+    layouts = import_map_layouts()
+    entities = [list(row) for row in layouts['entities']]
+    free = [(row, col) for row in range(len(entities)) for col in range(len(entities[row]))
+            if all(layouts[style][row][col] == -1 for style in layouts)]
+    for index, (row, col) in enumerate(random.Random(0).sample(free, min(enemies, len(free)))):
+        entities[row][col] = ENEMY_IDS[index % len(ENEMY_IDS)]
+    return dict(layouts, entities = entities)
+
+
+def restore_row_by_row(level, db, save_id):
+    """
+       Restaura una partida sobre un nivel recién creado con una consulta por enemigo.
+       """
+    row = db.cur.execute('SELECT position_x, position_y, health, energy, exp FROM players WHERE save_id = ?',
+                         (save_id,)).fetchone()
+    level.player.rect.topleft = (row[0], row[1])
+    level.player.hitbox = level.player.rect.inflate(0, -26)
+    level.player.health, level.player.energy, level.player.exp = row[2], row[3], row[4]
+    for enemy in list(level.enemy_manager):
+        row = db.cur.execute('SELECT position_x, position_y, health, is_alive FROM enemies '
+                             'WHERE save_id = ? AND spawn_id = ?', (save_id, enemy.spawn_id)).fetchone()
+        if row is None or not row[3]:
+            enemy.kill()
+            continue
+        enemy.rect.topleft = (row[0], row[1])
+        enemy.hitbox = enemy.rect.inflate(0, -10)
+        enemy.health = row[2]
+
+
+def timed(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Benchmark de la carga de partidas guardadas.')
+    parser.add_argument('--enemies', type = int, default = 2000, help = 'enemigos añadidos al mapa')
+    parser.add_argument('--killed', type = float, default = 0.5, help = 'fracción de enemigos muertos en la partida')
+    parser.add_argument('--repeat', type = int, default = 5, help = 'repeticiones de cada medida (mediana)')
+    args = parser.parse_args(argv)
+
+    init_headless()
+    from level import Level
+    from database.database import DataBase
+
+    layouts = crowded_layouts(args.enemies)
+    with tempfile.TemporaryDirectory() as directory:
+        db = DataBase(os.path.join(directory, 'bench.db'))
+
+        # Partida guardada: parte de los enemigos muertos y el resto movidos y heridos
+        level = Level(layouts)
+        rng = random.Random(1)
+        for enemy in list(level.enemy_manager):
+            if rng.random() < args.killed:
+                enemy.kill()
+            else:
+                enemy.rect.move_ip(rng.randint(-32, 32), rng.randint(-32, 32))
+                enemy.health -= rng.randint(0, 50)
+        level.player.health -= 40
+        level.save_game(db, 1)
+        alive = len(level.enemy_manager)
+        del level
+
+        def fresh():
+            return Level(layouts)
+
+        def fresh_restored():
+            level = Level(layouts)
+            restore_row_by_row(level, db, 1)
+            return level
+
+        def loaded():
+            return Level(layouts, db.load_save(1))
+
+        print(f'Partida con {alive} enemigos vivos de {args.enemies + 35}:')
+        fresh_ms, _ = timed(fresh, args.repeat)
+        print(f'  nivel nuevo                          {fresh_ms:>8.1f} ms')
+        restored_ms, restored = timed(fresh_restored, args.repeat)
+        print(f'  nivel nuevo + restauración por filas {restored_ms:>8.1f} ms  ({len(restored.enemy_manager)} enemigos)')
+        loaded_ms, level = timed(loaded, args.repeat)
+        print(f'  load_save                            {loaded_ms:>8.1f} ms  ({len(level.enemy_manager)} enemigos)  '
+              f'{fresh_ms / loaded_ms:.2f}x frente al nivel nuevo, {restored_ms / loaded_ms:.2f}x frente a la restauración')
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark del coste por fotograma del menú principal (`menu.principal_menu.Menu`).
+
+Simula sin ventana tres situaciones: la pantalla principal con el personaje animado, la misma
+pantalla durante la transición día/noche y la pantalla de controles sin cambios. Para cada una mide
+`Menu.step` y, como referencia, el dibujado de antes, que rellenaba la pantalla, mezclaba los fondos
+en cada fotograma de la transición, creaba la sombra y renderizaba y escalaba el texto de cada botón
+en cada fotograma y renderizaba cada línea de texto de las pantallas de controles y créditos.
+
+La música de fondo del menú no está en el repositorio, así que se usa el sonido de los botones.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_menu [--frames 300]
+"""
+import argparse
+import time
+
+from headless import init_headless
+
+FRAME_MS = 1000 / 60
+
+
+def legacy_draw(menu):
+    """
+       Dibuja un fotograma como lo hacía `Menu.run` antes de las cachés.
+       """
+    import pygame
+
+    menu.screen.fill(menu.BLACK)
+    if menu.is_day:
+        menu.screen.blit(menu.background_day, (0, 0))
+        if menu.fading:
+            menu.background_night.set_alpha(menu.fade_alpha)
+            menu.screen.blit(menu.background_night, (0, 0))
+            menu.background_night.set_alpha(None)
+    else:
+        menu.screen.blit(menu.background_night, (0, 0))
+        if menu.fading:
+            menu.background_day.set_alpha(menu.fade_alpha)
+            menu.screen.blit(menu.background_day, (0, 0))
+            menu.background_day.set_alpha(None)
+
+    if menu.current_screen == "menu":
+        shadow_surface = pygame.Surface((menu.character_width * 0.6, 10), pygame.SRCALPHA)
+        pygame.draw.ellipse(shadow_surface, (0, 0, 0), shadow_surface.get_rect())
+        menu.screen.blit(shadow_surface, (menu.character_x + (menu.character_width * 0.2),
+                                          menu.ground_y + menu.character_height - 10))
+        menu.screen.blit(menu.img_normal, (menu.character_x, menu.character_y))
+        menu.screen.blit(menu.title_shadow, menu.title_shadow_rect)
+        menu.screen.blit(menu.title_text, menu.title_rect)
+        for button in menu.buttons:
+            scale = 1.2 if button.hovered else 1.0
+            rect = button.base_rect.inflate(scale * button.base_rect.width - button.base_rect.width,
+                                            scale * button.base_rect.height - button.base_rect.height)
+            pygame.draw.rect(menu.screen, button.color, rect, border_radius=15)
+            text_surf = menu.button_font.render(button.text, True, menu.WHITE)
+            scaled_text = pygame.transform.scale(text_surf, (int(text_surf.get_width() * scale),
+                                                             int(text_surf.get_height() * scale)))
+            menu.screen.blit(scaled_text, scaled_text.get_rect(center = rect.center))
+        menu.slider.draw(menu.screen)
+        menu.screen.blit(menu.button_font.render("Volumen", True, menu.WHITE), (20, menu.SCREEN_HEIGHT - 70))
+    else:
+        lines = menu.screen_lines[menu.current_screen] + ["Presiona ESC para volver"]
+        for line, (_, pos) in zip(lines, menu.screen_texts[menu.current_screen]):
+            menu.screen.blit(menu.button_font.render(line, True, menu.BLACK), pos)
+
+
+def measure(menu, frames, start_time, draw):
+    """
+       Simula `frames` fotogramas desde `start_time` y devuelve el coste medio en milisegundos.
+       """
+    times = []
+    for frame in range(frames):
+        now = int(start_time + frame * FRAME_MS)
+        start = time.perf_counter()
+        if draw is None:
+            menu.step(now, [])
+        else:
+            menu.update_fade(now)
+            if menu.current_screen == "menu":
+                menu.update_character()
+            draw(menu)
+        times.append((time.perf_counter() - start) * 1000)
+    return sum(times) / len(times)
+
+
+def scenario(screen, fade, frames, draw):
+    from menu.principal_menu import Menu
+
+    menu = Menu(music_path = 'menu/musica_boton.wav')
+    menu.current_screen = screen
+    # La transición empieza a los background_switch_time ms y dura fade_duration ms
+    start_time = menu.last_switch_time + (menu.background_switch_time if fade else 0)
+    frames = min(frames, int(menu.fade_duration / FRAME_MS)) if fade else frames
+    return measure(menu, frames, start_time, draw)
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Benchmark del coste por fotograma del menú principal.')
+    parser.add_argument('--frames', type = int, default = 300, help = 'fotogramas simulados por situación')
+    args = parser.parse_args(argv)
+
+    init_headless()
+    print('Coste por fotograma del menú (sin contar display.flip):')
+    for name, screen, fade in (('principal', 'menu', False), ('transición', 'menu', True), ('controles', 'controls', False)):
+        before = scenario(screen, fade, args.frames, legacy_draw)
+        after = scenario(screen, fade, args.frames, None)
+        print(f'  {name:<11} antes {before:>6.3f} ms  ahora {after:>6.3f} ms  ({before / after:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
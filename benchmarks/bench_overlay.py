@@ -0,0 +1,53 @@
+"""
+Benchmark del panel de rendimiento (`debug.PerfOverlay`).
+
+Simula el nivel real sin ventana dibujando cada fotograma con el panel visible y mide lo que tarda
+`PerfOverlay.draw` (media y peor caso, incluidos los fotogramas en los que se rehace el texto). Como
+referencia mide también el coste de dibujar las mismas líneas con `font.render` en cada fotograma,
+como hacía `debug.debug`.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_overlay [--frames 600]
+"""
+import argparse
+import time
+
+from headless import HeadlessRunner, DEFAULT_SCRIPT
+
+SEED = 1234
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Benchmark del panel de rendimiento.')
+    parser.add_argument('--frames', type = int, default = 600, help = 'fotogramas simulados')
+    args = parser.parse_args(argv)
+
+    runner = HeadlessRunner(DEFAULT_SCRIPT, render = True, seed = SEED)
+    level = runner.level
+    overlay = level.perf_overlay
+    level.toggle_perf_overlay()
+
+    overlay_times = []
+    render_times = []
+    for _ in range(args.frames):
+        runner.step()
+        overlay_times.append(overlay.draw_ms)
+
+        # Referencia: renderizar todas las líneas del panel con la fuente en cada fotograma
+        lines = overlay.lines(level)
+        start = time.perf_counter()
+        for index, line in enumerate(lines):
+            surface = overlay.glyphs.font.render(line, True, 'White')
+            runner.screen.blit(surface, (10, 10 + index * overlay.glyphs.height))
+        render_times.append((time.perf_counter() - start) * 1000)
+
+    overlay_times.sort()
+    print(f'Panel de rendimiento en {args.frames} fotogramas:')
+    print(f'  con caché de glifos: media {sum(overlay_times) / len(overlay_times):.3f} ms  '
+          f'p99 {overlay_times[int(len(overlay_times) * 0.99)]:.3f} ms  peor {overlay_times[-1]:.3f} ms')
+    print(f'  font.render por fotograma: media {sum(render_times) / len(render_times):.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
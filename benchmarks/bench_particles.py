@@ -0,0 +1,84 @@
+"""
+Benchmark de partículas: sprites (`ParticleEffect`) frente al sistema por lotes (`ParticleSystem`).
+
+Mantiene miles de hojas activas a la vez alrededor del jugador en el nivel real y mide el coste por
+fotograma de avanzar y dibujar el mundo (`visible_sprites.update` + `custom_draw`), primero con cada
+partícula como sprite y después con el sistema por lotes. Comprueba además que la pantalla final es
+idéntica en los dos casos.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_particles [--counts 1000 5000] [--frames 200]
+"""
+import argparse
+import random
+import time
+
+from headless import init_headless
+
+SEED = 1234
+
+
+def run(level, animation_exec, count, frames):
+    """
+       Simula `frames` fotogramas creando hojas continuamente hasta tener unas `count` activas.
+
+       Retorna
+       -------
+       tuple
+           (ms por fotograma de la segunda mitad, partículas activas al final, imagen final de la pantalla)
+       """
+    import pygame
+
+    rng = random.Random(SEED)
+    player = level.player
+    groups = [level.visible_sprites, level.particle_sprites]
+
+    # Una hoja vive len(fotogramas) / 0.15 pasos: se crean las justas para mantener `count` activas
+    leaves = animation_exec.frames['leaf']
+    lifetime = sum(len(frames) for frames in leaves) / len(leaves) / 0.15
+    per_frame = max(1, round(count / lifetime))
+    times = []
+    for _ in range(frames):
+        for _ in range(per_frame):
+            pos = (player.rect.centerx + rng.randint(-600, 600), player.rect.centery + rng.randint(-340, 340))
+            animation_exec.create_grass_particles(pos, groups)
+        start = time.perf_counter()
+        level.visible_sprites.update()
+        level.visible_sprites.custom_draw(player)
+        times.append((time.perf_counter() - start) * 1000)
+    half = times[len(times) // 2:]
+    active = len(level.particle_sprites) + len(level.visible_sprites.particles)
+    return sum(half) / len(half), active, pygame.image.tobytes(level.display_surface, 'RGB')
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Benchmark del sistema de partículas por lotes.')
+    parser.add_argument('--counts', type = int, nargs = '+', default = [1000, 5000], help = 'partículas activas')
+    parser.add_argument('--frames', type = int, default = 200, help = 'fotogramas simulados')
+    args = parser.parse_args(argv)
+
+    init_headless()
+    from level import Level
+    from particles import AnimationExec
+
+    print(f'Avance y dibujado del mundo por fotograma (presupuesto a 60 FPS: 16.7 ms):')
+    for count in args.counts:
+        random.seed(SEED)
+        level = Level()
+        # El jugador no se actualiza: se quedan quietos el mundo y la cámara
+        level.player.update = lambda: None
+        sprite_ms, sprite_active, sprite_screen = run(level, AnimationExec(pool_size = count * 2), count, args.frames)
+
+        random.seed(SEED)
+        level = Level()
+        level.player.update = lambda: None
+        batch_ms, batch_active, batch_screen = run(level, AnimationExec(system = level.visible_sprites.particles), count, args.frames)
+        assert sprite_screen == batch_screen, 'El sistema por lotes no dibuja lo mismo que los sprites'
+
+        print(f'{count:>6} partículas: sprites {sprite_ms:>7.2f} ms ({sprite_active} activas)  '
+              f'lotes {batch_ms:>7.2f} ms ({batch_active} activas)  ({sprite_ms / batch_ms:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
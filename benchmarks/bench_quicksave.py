@@ -0,0 +1,95 @@
+"""
+Benchmark del guardado y la carga rápidos (`quicksave`) de un nivel grande.
+
+Rellena la capa de entidades del mapa con `--enemies` enemigos (como `bench_load_save`), simula
+unos fotogramas y mide:
+
+- Guardado: `quicksave.save`, empaquetado y escritura del archivo.
+- Carga sobre el mismo nivel, con los enemigos ya creados.
+- Carga después de que mueran `--killed` de los enemigos y se corte hierba, que obliga a volver a
+  crear esos enemigos y a poner la hierba otra vez.
+- Como referencia, construir el nivel de nuevo (`Level(layouts)`), que es lo que costaría volver a
+  un punto de control sin el guardado rápido.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_quicksave [--enemies 2000] [--killed 0.5] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import pygame
+
+import game_time
+import quicksave
+from benchmarks.bench_load_save import crowded_layouts
+from headless import HeadlessRunner, init_headless
+
+
+def damage_level(level, killed):
+    """
+       Mata una fracción de los enemigos y corta la mitad de la hierba del nivel.
+       """
+    rng = random.Random(1)
+    for enemy in list(level.enemy_manager):
+        if rng.random() < killed:
+            enemy.health = 0
+            enemy.is_dead()
+    grass = [tile for tile in level.grass_tiles.values() if tile.alive()]
+    for tile in grass[::2]:
+        attack = pygame.sprite.Sprite(level.attack_sprites)
+        attack.rect = tile.rect.copy()
+        attack.sprite_type = 'weapon'
+        level.attack_logic_player()
+        attack.kill()
+
+
+def median_ms(function, repeat, setup = None):
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Benchmark del guardado y la carga rápidos.')
+    parser.add_argument('--enemies', type = int, default = 2000, help = 'enemigos añadidos al mapa')
+    parser.add_argument('--killed', type = float, default = 0.5, help = 'fracción de enemigos muertos antes de cargar')
+    parser.add_argument('--repeat', type = int, default = 5, help = 'repeticiones de cada medida (mediana)')
+    args = parser.parse_args(argv)
+
+    init_headless()
+    from level import Level
+
+    layouts = crowded_layouts(args.enemies)
+    random.seed(0)
+    level = Level(layouts)
+    HeadlessRunner(seed = 0, level = level).run(60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'quicksave.bin')
+        save_ms = median_ms(lambda: quicksave.save(level, path), args.repeat)
+        size = os.path.getsize(path)
+        same_ms = median_ms(lambda: quicksave.load(level, path), args.repeat)
+        damaged_ms = median_ms(lambda: quicksave.load(level, path), args.repeat,
+                               setup = lambda: damage_level(level, args.killed))
+    game_time.stop_simulation()
+    rebuild_ms = median_ms(lambda: Level(layouts), args.repeat)
+
+    print(f'Nivel con {len(level.enemy_manager)} enemigos y {len(level.grass_tiles)} casillas de hierba:')
+    print(f'  guardado rápido                     {save_ms:>8.2f} ms  ({size / 1024:.0f} KiB)')
+    print(f'  carga rápida (mismo estado)         {same_ms:>8.2f} ms')
+    print(f'  carga rápida (tras {args.killed:.0%} de muertes)  {damaged_ms:>8.2f} ms')
+    print(f'  reconstruir el nivel                {rebuild_ms:>8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Micro-benchmark del coste de crear un ataque (`Weapon`).
+
+Compara la versión anterior, que cargaba y convertía el PNG del arma desde disco en cada ataque,
+con la tabla de superficies precargadas de `weapon.load_weapon_surfaces`.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_weapon
+"""
+import time
+
+from headless import init_headless
+
+ATTACKS = 2000
+
+
+class FakePlayer:
+    """
+    Jugador mínimo con lo que necesita `Weapon`: estado, arma y rectángulo.
+    """
+    def __init__(self, weapon, status):
+        import pygame
+        self.weapon = weapon
+        self.status = status
+        self.rect = pygame.Rect(640, 360, 64, 64)
+
+
+def attack_from_disk(player):
+    """
+       Reproduce el `Weapon.__init__` anterior: carga de disco y conversión en cada ataque.
+       """
+    import pygame
+    direction = player.status.split('_')[0]
+    full_path = f'./graphics/weapons/{player.weapon}/{direction}.png'
+    image = pygame.image.load(full_path).convert_alpha()
+    return image.get_rect(midleft = player.rect.midright + pygame.math.Vector2(0, 16))
+
+
+def main():
+    init_headless()
+    import pygame
+    from settings import weapon_data
+    from weapon import Weapon, load_weapon_surfaces, DIRECTIONS
+
+    players = [FakePlayer(weapon, f'{direction}_attack') for weapon in weapon_data for direction in DIRECTIONS]
+    group = pygame.sprite.Group()
+
+    start = time.perf_counter()
+    for i in range(ATTACKS):
+        attack_from_disk(players[i % len(players)])
+    disk_us = (time.perf_counter() - start) * 1e6 / ATTACKS
+
+    load_weapon_surfaces()
+    start = time.perf_counter()
+    for i in range(ATTACKS):
+        Weapon(players[i % len(players)], [group]).kill()
+    table_us = (time.perf_counter() - start) * 1e6 / ATTACKS
+
+    print(f'Creación de un ataque ({ATTACKS} ataques):')
+    print(f'  antes (carga de disco)   {disk_us:>9.1f} us')
+    print(f'  ahora (tabla precargada) {table_us:>9.1f} us  ({disk_us / table_us:.0f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,20 @@
 import sqlite3
 import json
+import queue
+import threading
+import time
 from typing import Dict
 
+# Segundos que el hilo de escritura agrupa operaciones antes de confirmarlas en una transacción
+FLUSH_INTERVAL = 0.25
+
+# Versión del esquema, guardada en `PRAGMA user_version`. Las bases de datos anteriores se migran al abrirlas.
+SCHEMA_VERSION = 2
+
+# Columnas de players que se pueden guardar por separado con `save_changes`
+PLAYER_COLUMNS = ('position_x', 'position_y', 'health', 'max_health', 'energy', 'max_energy', 'exp', 'speed',
+                  'attack', 'magic', 'gold', 'weapon_index', 'magic_index', 'stats')
+
 class DataBase:
     """
     Clase para gestionar interacciones de la base de datos con el juego,
@@ -15,20 +28,53 @@ class DataBase:
     create_tables():
         Crea las tablas necesarias para el guardado de datos.
 
+    migrate():
+        Actualiza el esquema de la base de datos a `SCHEMA_VERSION`.
+
     update_player():
         Actualiza los datos del jugador en base a la partida actual.
 
     save_enemy_state():
         Actualiza el estado de un enemigo en base a la partida actual.
 
+    save_enemies_bulk():
+        Guarda de una vez el estado de todos los enemigos de un nivel.
+
+    save_cut_grass():
+        Guarda la hierba cortada de la partida.
+
+    save_changes():
+        Guarda en una transacción solo lo que ha cambiado desde el último guardado.
+
     add_item_to_inventory():
         Añade los objetos adquiridos por el juagdor durante la partida a su inventario.
 
+    load_save():
+        Lee una partida guardada completa: jugador, enemigos vivos e inventario.
+
+    flush():
+        Espera a que estén escritas todas las operaciones pendientes.
+
     close():
-        Cierra la conexión con la base de datos.
+        Escribe lo pendiente y cierra la conexión con la base de datos.
+
+    Modo de escritura diferida
+    --------------------------
+    Con `write_behind=True` los métodos de guardado no escriben: preparan los parámetros, encolan la
+    operación y vuelven enseguida. Un hilo de escritura con su propia conexión agrupa las operaciones
+    que llegan durante `flush_interval` segundos y las confirma en una sola transacción, así que el
+    bucle del juego no espera nunca a un `commit` (ni a la sincronización con el disco que conlleva).
+    La base de datos usa el diario WAL, con el que las lecturas no se bloquean mientras se escribe.
+
+    Las operaciones se ejecutan en el orden en que se encolaron. `flush()` espera a que todo lo
+    encolado esté confirmado y `close()` lo hace antes de cerrar, así que no se pierde nada al salir.
+    Cada operación va en su propio punto de guardado: si una falla solo se deshace esa, el resto de
+    operaciones de la misma transacción se confirman igualmente y el error se vuelve a lanzar en el
+    siguiente `flush()` o `close()`.
     """
 
-    def __init__(self, db_name: str = 'database.py'):
+    def __init__(self, db_name: str = 'database.py', write_behind: bool = False,
+                 flush_interval: float = FLUSH_INTERVAL):
         """
         Inicializa la conexión con la base de datos y se encarga de llamar a la
         creación de tablas donde guardar los datos.
@@ -36,11 +82,41 @@ class DataBase:
         Parámetros
         ----------
         db_name: Nombre del archivo de la base de datos.
+        write_behind: Encolar los guardados y escribirlos desde un hilo aparte.
+        flush_interval: Segundos que se agrupan operaciones en cada transacción del hilo de escritura.
         """
 
+        self.db_name = db_name
         self.conn = sqlite3.connect(db_name)
         self.cur = self.conn.cursor()
+        self.writer = None
+        if write_behind:
+            self.conn.execute('PRAGMA journal_mode=WAL')
         self.create_tables()
+        if write_behind:
+            self.writer = _Writer(db_name, flush_interval)
+            self.writer.start()
+
+    def _submit(self, operation, *args):
+        """
+        Ejecuta una operación de escritura `operation(cursor, *args)`.
+
+        Sin escritura diferida se ejecuta y se confirma en el momento. Con ella se encola para el hilo
+        de escritura; los argumentos no deben modificarse después de encolarlos.
+        """
+        if self.writer is not None:
+            self.writer.submit(operation, args)
+        else:
+            operation(self.cur, *args)
+            self.conn.commit()
+
+    def flush(self):
+        """
+        Espera a que todas las operaciones encoladas estén confirmadas en la base de datos.
+        Sin escritura diferida no hace nada.
+        """
+        if self.writer is not None:
+            self.writer.flush()
 
     def create_tables(self):
         """
@@ -121,10 +197,44 @@ class DataBase:
         ''')
 
         self.conn.commit()
+        self.migrate()
+
+    def migrate(self):
+        """
+        Actualiza el esquema de la base de datos a `SCHEMA_VERSION`. La versión se guarda en
+        `PRAGMA user_version`; cada migración se aplica una sola vez y en su propia transacción.
+
+        Versión 1: columna `spawn_id` en enemies (el punto de aparición del enemigo en el mapa, que lo
+        identifica dentro de la partida) e índices por `save_id` en todas las tablas de la partida.
+        Versión 2: tabla cut_grass con las casillas de hierba cortada de cada partida.
+        """
+        version = self.cur.execute('PRAGMA user_version').fetchone()[0]
+        if version < 1:
+            columns = [row[1] for row in self.cur.execute('PRAGMA table_info(enemies)')]
+            if 'spawn_id' not in columns:
+                self.cur.execute('ALTER TABLE enemies ADD COLUMN spawn_id INTEGER')
+            # Los enemigos guardados antes tienen spawn_id NULL, que no choca con el índice único
+            self.cur.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_enemies_spawn ON enemies (save_id, spawn_id)')
+            self.cur.execute('CREATE INDEX IF NOT EXISTS idx_players_save ON players (save_id)')
+            self.cur.execute('CREATE INDEX IF NOT EXISTS idx_items_save ON items (save_id)')
+            self.cur.execute('CREATE INDEX IF NOT EXISTS idx_inventory_save_item ON player_inventory (save_id, item_id)')
+            self.cur.execute('CREATE INDEX IF NOT EXISTS idx_abilities_save ON player_abilities (save_id)')
+            self.cur.execute('PRAGMA user_version = 1')
+            self.conn.commit()
+        if version < 2:
+            self.cur.execute('''
+                CREATE TABLE IF NOT EXISTS cut_grass (
+                    save_id INTEGER NOT NULL,
+                    tile_id INTEGER NOT NULL,
+                    PRIMARY KEY (save_id, tile_id)
+                ) WITHOUT ROWID
+            ''')
+            self.cur.execute('PRAGMA user_version = 2')
+            self.conn.commit()
 
     def update_player(self, save_id: int, player_data: Dict):
         """
-        Actualiza los datos del jugador en la base de datos.
+        Actualiza los datos del jugador en la base de datos. Si la partida aún no tiene jugador, lo crea.
 
         Parámetros
         ----------
@@ -132,7 +242,8 @@ class DataBase:
         player_data: Diccionario con los datos del jugador.
         """
 
-        self.cur.execute('''
+        # Los parámetros se preparan ahora: el diccionario puede cambiar antes de que se escriban
+        self._submit(_update_player, '''
             UPDATE players SET
                 position_x = ?,
                 position_y = ?,
@@ -167,9 +278,8 @@ class DataBase:
             save_id
         ))
 
-        self.conn.commit()
-
-    def save_enemy_state(self, save_id: int, enemy_name: str, health: float, is_alive: bool):
+    def save_enemy_state(self, save_id: int, enemy_name: str, health: float, is_alive: bool,
+                         spawn_id: int = None):
         """
         Actualiza el estado de un enemigo.
 
@@ -179,15 +289,96 @@ class DataBase:
         enemy_name: nombre.
         health: vida actual.
         is_alive: estado de vida.
+        spawn_id: punto de aparición del enemigo. Sin él se actualizan todos los enemigos de la
+            partida con ese nombre.
         """
 
-        self.cur.execute('''
-            UPDATE enemies SET
-                health = ?,
-                is_alive = ?
-            WHERE save_id = ? AND enemy_name = ?
-        ''', (health, int(is_alive), save_id, enemy_name))
-        self.conn.commit()
+        if spawn_id is None:
+            self._submit(_execute, '''
+                UPDATE enemies SET
+                    health = ?,
+                    is_alive = ?
+                WHERE save_id = ? AND enemy_name = ?
+            ''', (health, int(is_alive), save_id, enemy_name))
+        else:
+            self._submit(_execute, '''
+                UPDATE enemies SET
+                    health = ?,
+                    is_alive = ?
+                WHERE save_id = ? AND spawn_id = ?
+            ''', (health, int(is_alive), save_id, spawn_id))
+
+    def save_enemies_bulk(self, save_id: int, enemies):
+        """
+        Guarda el estado de toda la población de enemigos de un nivel en una sola transacción.
+
+        Cada enemigo se identifica por su `spawn_id`: los que ya estaban guardados se actualizan y los
+        nuevos se insertan, todo con un único `executemany`. Los enemigos guardados de la partida que
+        no están en `enemies` (los que han muerto) quedan marcados como muertos.
+
+        Parámetros
+        ----------
+        save_id: ID de guardado.
+        enemies: enemigos vivos del nivel (por ejemplo `level.enemy_manager`); todos deben tener `spawn_id`
+            (si no, se lanza ValueError).
+        """
+
+        # Las filas se copian ahora: los enemigos siguen moviéndose mientras se escriben
+        rows = _enemy_rows(save_id, enemies)
+        self._submit(_save_enemies_bulk, save_id, rows)
+
+    def save_cut_grass(self, save_id: int, tile_ids):
+        """
+        Guarda las casillas de hierba cortada de la partida (las ya guardadas se ignoran).
+
+        Parámetros
+        ----------
+        save_id: ID de guardado.
+        tile_ids: índices de las casillas de hierba cortada.
+        """
+
+        self._submit(_executemany, 'INSERT OR IGNORE INTO cut_grass (save_id, tile_id) VALUES (?, ?)',
+                     [(save_id, tile_id) for tile_id in tile_ids])
+
+    def save_changes(self, save_id: int, player_fields: Dict, enemies, killed, cut_grass) -> int:
+        """
+        Guarda en una sola transacción solo lo que ha cambiado desde el último guardado completo o
+        parcial: las columnas cambiadas del jugador, los enemigos que han cambiado, los que han muerto
+        y la hierba cortada. La partida tiene que haberse guardado completa antes (el jugador se
+        actualiza, no se crea).
+
+        Parámetros
+        ----------
+        save_id: ID de guardado.
+        player_fields: columnas de players que han cambiado con su nuevo valor (ver `PLAYER_COLUMNS`).
+            'stats' se serializa a JSON solo si está aquí.
+        enemies: enemigos vivos que han cambiado; se guardan como en `save_enemies_bulk`.
+        killed: spawn_id de los enemigos muertos.
+        cut_grass: índices de las casillas de hierba cortada.
+
+        Retorna
+        -------
+        Número de filas que se escriben.
+        """
+
+        unknown = set(player_fields).difference(PLAYER_COLUMNS)
+        if unknown:
+            raise ValueError(f'Columnas de players desconocidas: {sorted(unknown)}')
+        player_update = None
+        if player_fields:
+            columns = list(player_fields)
+            values = [json.dumps(player_fields[column]) if column == 'stats' else player_fields[column]
+                      for column in columns]
+            player_update = (f'UPDATE players SET {", ".join(f"{column} = ?" for column in columns)} WHERE save_id = ?',
+                             (*values, save_id))
+        enemy_rows = _enemy_rows(save_id, enemies)
+        killed_rows = [(save_id, spawn_id) for spawn_id in killed]
+        grass_rows = [(save_id, tile_id) for tile_id in cut_grass]
+
+        rows = (player_update is not None) + len(enemy_rows) + len(killed_rows) + len(grass_rows)
+        if rows:
+            self._submit(_save_changes, player_update, enemy_rows, killed_rows, grass_rows)
+        return rows
 
     def add_item_to_inventory(self, save_id: int, item_id: int, quantity: int = 1):
         """
@@ -200,31 +391,301 @@ class DataBase:
         quantity: cantidad del objeto..
         """
 
-        self.cur.execute('''
-            SELECT quantity FROM player_inventory 
-            WHERE save_id = ? AND item_id = ?
-        ''', (save_id, item_id))
+        self._submit(_add_item_to_inventory, save_id, item_id, quantity)
 
-        existing = self.cur.fetchone()
+    def load_save(self, save_id: int):
+        """
+        Lee una partida guardada con cuatro consultas: el jugador, todos sus enemigos vivos (por el
+        índice de save_id), el inventario con los datos de cada objeto (un JOIN con items) y la hierba
+        cortada.
 
-        if existing:
-            new_quantity = existing[0] + quantity
-            self.cur.execute('''
-                UPDATE player_inventory SET
-                    quantity = ?
-                WHERE save_id = ? AND item_id = ?
-            ''', (new_quantity, save_id, item_id))
-        else:
-            self.cur.execute('''
-                INSERT INTO player_inventory (save_id, item_id, quantity)
-                VALUES (?, ?, ?)
-            ''', (save_id, item_id, quantity))
+        Parámetros
+        ----------
+        save_id: ID de guardado.
 
-        self.conn.commit()
+        Retorna
+        -------
+        Diccionario {'player', 'enemies', 'inventory', 'cut_grass'}, o None si la partida no tiene jugador.
+        'player' tiene el formato de `update_player`; 'enemies' son tuplas
+        (spawn_id, enemy_name, position_x, position_y, health) ordenadas por spawn_id; 'inventory'
+        son diccionarios con los datos del objeto, su cantidad y si está equipado; 'cut_grass' es el
+        conjunto de casillas de hierba cortada.
+        """
+
+        # Lo encolado también forma parte de la partida
+        self.flush()
+
+        row = self.cur.execute('''
+            SELECT position_x, position_y, health, max_health, energy, max_energy, exp, speed,
+                   attack, magic, gold, weapon_index, magic_index, stats
+            FROM players WHERE save_id = ?
+        ''', (save_id,)).fetchone()
+        if row is None:
+            return None
+        player = {
+            'position': (row[0], row[1]),
+            'health': row[2],
+            'max_health': row[3],
+            'energy': row[4],
+            'max_energy': row[5],
+            'exp': row[6],
+            'speed': row[7],
+            'attack': row[8],
+            'magic': row[9],
+            'gold': row[10],
+            'weapon_index': row[11],
+            'magic_index': row[12],
+            'stats': json.loads(row[13]),
+        }
+
+        enemies = self.cur.execute('''
+            SELECT spawn_id, enemy_name, position_x, position_y, health
+            FROM enemies WHERE save_id = ? AND is_alive = 1
+            ORDER BY spawn_id
+        ''', (save_id,)).fetchall()
+
+        inventory = [
+            {'item_id': item_id, 'item_type': item_type, 'item_name': item_name, 'quantity': quantity,
+             'is_equipped': bool(is_equipped), 'properties': json.loads(properties) if properties else None}
+            for item_id, item_type, item_name, quantity, is_equipped, properties in self.cur.execute('''
+                SELECT inventory.item_id, items.item_type, items.item_name, inventory.quantity,
+                       inventory.is_equipped, items.properties
+                FROM player_inventory AS inventory
+                LEFT JOIN items ON items.item_id = inventory.item_id
+                WHERE inventory.save_id = ?
+                ORDER BY inventory.inventory_id
+            ''', (save_id,)).fetchall()
+        ]
+
+        cut_grass = {tile_id for tile_id, in self.cur.execute(
+            'SELECT tile_id FROM cut_grass WHERE save_id = ?', (save_id,)).fetchall()}
+
+        return {'player': player, 'enemies': enemies, 'inventory': inventory, 'cut_grass': cut_grass}
 
     def close(self):
         """
-        Cierra la conexión con la base de datos.
+        Escribe las operaciones pendientes, detiene el hilo de escritura y cierra la conexión con la
+        base de datos. La conexión se cierra aunque `close()` vuelva a lanzar un error de escritura.
         """
-        self.conn.close()
+        try:
+            if self.writer is not None:
+                writer, self.writer = self.writer, None
+                writer.close()
+        finally:
+            self.conn.close()
+
+
+def _execute(cur, sql, params):
+    cur.execute(sql, params)
+
+
+def _update_player(cur, sql, params):
+    """
+    Actualiza el jugador de la partida (el último parámetro es el save_id) o lo inserta si no existe.
+    """
+    cur.execute(sql, params)
+    if cur.rowcount == 0:
+        cur.execute('''
+            INSERT INTO players (position_x, position_y, health, max_health, energy, max_energy, exp, speed,
+                                 attack, magic, gold, weapon_index, magic_index, stats, save_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', params)
 
+
+def _executemany(cur, sql, rows):
+    cur.executemany(sql, rows)
+
+
+def _enemy_rows(save_id, enemies):
+    """
+    Copia el estado de los enemigos en filas para `_UPSERT_ENEMY`. Un spawn_id NULL no choca nunca
+    con el índice único, así que cada guardado insertaría otra fila del mismo enemigo.
+    """
+    rows = [(save_id, enemy.spawn_id, enemy.enemy_name, enemy.rect.x, enemy.rect.y, enemy.health)
+            for enemy in enemies]
+    missing = [row[2] for row in rows if row[1] is None]
+    if missing:
+        raise ValueError(f'Enemigos sin spawn_id: {missing}')
+    return rows
+
+
+# Inserta un enemigo vivo o actualiza el que ya estaba guardado con el mismo spawn_id
+_UPSERT_ENEMY = '''
+    INSERT INTO enemies (save_id, spawn_id, enemy_name, position_x, position_y, health, is_alive)
+    VALUES (?, ?, ?, ?, ?, ?, 1)
+    ON CONFLICT (save_id, spawn_id) DO UPDATE SET
+        enemy_name = excluded.enemy_name,
+        position_x = excluded.position_x,
+        position_y = excluded.position_y,
+        health = excluded.health,
+        is_alive = 1
+'''
+
+
+def _save_enemies_bulk(cur, save_id, rows):
+    """
+    Marca como muertos los enemigos de la partida y guarda como vivos los de `rows`.
+    """
+    cur.execute('UPDATE enemies SET is_alive = 0 WHERE save_id = ?', (save_id,))
+    cur.executemany(_UPSERT_ENEMY, rows)
+
+
+def _save_changes(cur, player_update, enemy_rows, killed_rows, grass_rows):
+    if player_update is not None:
+        cur.execute(*player_update)
+    cur.executemany(_UPSERT_ENEMY, enemy_rows)
+    cur.executemany('UPDATE enemies SET is_alive = 0 WHERE save_id = ? AND spawn_id = ?', killed_rows)
+    cur.executemany('INSERT OR IGNORE INTO cut_grass (save_id, tile_id) VALUES (?, ?)', grass_rows)
+
+
+def _add_item_to_inventory(cur, save_id, item_id, quantity):
+    """
+    Suma `quantity` al objeto del inventario, o lo añade si el jugador aún no lo tiene.
+    """
+    cur.execute('''
+        SELECT quantity FROM player_inventory 
+        WHERE save_id = ? AND item_id = ?
+    ''', (save_id, item_id))
+
+    existing = cur.fetchone()
+
+    if existing:
+        new_quantity = existing[0] + quantity
+        cur.execute('''
+            UPDATE player_inventory SET
+                quantity = ?
+            WHERE save_id = ? AND item_id = ?
+        ''', (new_quantity, save_id, item_id))
+    else:
+        cur.execute('''
+            INSERT INTO player_inventory (save_id, item_id, quantity)
+            VALUES (?, ?, ?)
+        ''', (save_id, item_id, quantity))
+
+
+class _Writer(threading.Thread):
+    """
+    Hilo de escritura de `DataBase` en modo diferido.
+
+    Tiene su propia conexión (las de sqlite3 no se comparten entre hilos). Espera a la primera
+    operación encolada, recoge las que llegan durante `flush_interval` segundos y las ejecuta todas
+    en una transacción con un solo `commit`. Si una operación falla solo se descarta esa.
+
+    Atributos
+    ----------
+    transactions : int
+        Transacciones confirmadas.
+    operations : int
+        Operaciones escritas.
+    error : BaseException or None
+        Primer error producido al escribir, pendiente de lanzar en `flush()` o `close()`.
+    """
+    _STOP = object()
+
+    def __init__(self, db_name, flush_interval):
+        super().__init__(name = 'DataBaseWriter', daemon = True)
+        self.db_name = db_name
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.transactions = 0
+        self.operations = 0
+        self.error = None
+
+    def submit(self, operation, args):
+        self.queue.put((operation, args))
+
+    def flush(self):
+        """
+        Espera a que se confirmen las operaciones encoladas hasta ahora.
+        """
+        done = threading.Event()
+        self.queue.put((None, done))
+        # Si el hilo termina por un error nadie marcará `done`: se deja de esperar
+        while not done.wait(0.1):
+            if not self.is_alive():
+                break
+        self._raise_error()
+        if not done.is_set():
+            raise RuntimeError('El hilo de escritura de la base de datos no está activo')
+
+    def close(self):
+        if self.is_alive():
+            self.queue.put((self._STOP, None))
+            self.join()
+        self._raise_error()
+
+    def _raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def _collect(self):
+        """
+        Espera a la primera operación y añade las que lleguen durante `flush_interval` segundos, salvo
+        que antes se pida un `flush()` o el cierre.
+        """
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while batch[-1][0] is not None and batch[-1][0] is not self._STOP:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout = timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        conn = None
+        try:
+            conn = sqlite3.connect(self.db_name)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # Con WAL basta sincronizar con el disco en los checkpoints
+            conn.execute('PRAGMA synchronous=NORMAL')
+            cur = conn.cursor()
+            stop = False
+            while not stop:
+                batch = self._collect()
+                waiting = [args for operation, args in batch if operation is None]
+                stop = any(operation is self._STOP for operation, _ in batch)
+                operations = [(operation, args) for operation, args in batch
+                              if operation is not None and operation is not self._STOP]
+                if operations:
+                    self._write(conn, cur, operations)
+                for done in waiting:
+                    done.set()
+        except BaseException as error:
+            if self.error is None:
+                self.error = error
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _write(self, conn, cur, operations):
+        """
+        Ejecuta un lote de operaciones en una transacción. Cada operación va en su propio punto de
+        guardado, así que si una falla solo se deshace esa y el resto del lote se confirma.
+        """
+        written = 0
+        try:
+            cur.execute('BEGIN')
+            for operation, args in operations:
+                cur.execute('SAVEPOINT op')
+                try:
+                    operation(cur, *args)
+                except Exception as error:
+                    cur.execute('ROLLBACK TO op')
+                    if self.error is None:
+                        self.error = error
+                else:
+                    written += 1
+                cur.execute('RELEASE op')
+            conn.commit()
+        except Exception as error:
+            conn.rollback()
+            if self.error is None:
+                self.error = error
+            return
+        self.transactions += 1
+        self.operations += written
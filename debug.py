@@ -1,6 +1,11 @@
+import time
+
 import pygame
+from settings import *
+from assets import asset_cache, text_cache
 pygame.init()
 font = pygame.font.Font(None,30)
+glyphs = None
 
 
 def debug(info,y = 10, x = 10):
@@ -19,9 +24,287 @@ def debug(info,y = 10, x = 10):
         Posición vertical (coordenada Y) desde la esquina superior izquierda de la pantalla (por defecto 10).
     x : int, opcional
         Posición horizontal (coordenada X) desde la esquina superior izquierda de la pantalla (por defecto 10).
+
+    Los caracteres se renderizan una sola vez y se reutilizan en las siguientes llamadas (ver `GlyphCache`).
 	"""
+	global glyphs
+	if glyphs is None:
+		glyphs = GlyphCache(font)
 	display_surface = pygame.display.get_surface()
-	debug_surf = font.render(str(info),True,'White')
-	debug_rect = debug_surf.get_rect(topleft = (x,y))
+	info = str(info)
+	debug_rect = pygame.Rect((x,y), glyphs.size(info))
 	pygame.draw.rect(display_surface,'Black',debug_rect)
-	display_surface.blit(debug_surf,debug_rect)
\ No newline at end of file
+	glyphs.draw(display_surface,info,(x,y))
+
+class GlyphCache:
+    """
+    Caché de glifos: cada carácter se renderiza una sola vez por color y los textos se dibujan
+    juntando los glifos ya renderizados con `Surface.blits`.
+
+    Si se indica un color de fondo los glifos se renderizan ya mezclados con él: son opacos y
+    dibujarlos es una copia directa, sin mezcla alfa.
+
+    Atributos
+    ----------
+    font : pygame.font.Font
+        Fuente usada para renderizar los glifos.
+    background : str or None
+        Color de fondo de los glifos, o `None` para glifos con transparencia.
+    glyphs : dict
+        Superficie de cada glifo por color {color: {carácter: pygame.Surface}}.
+    widths : dict
+        Ancho de cada glifo por color {color: {carácter: int}}.
+    height : int
+        Altura de una línea de texto.
+
+    Métodos
+    -------
+    prepare(text, color):
+        Renderiza los glifos de un texto que aún no estén en la caché.
+    size(text):
+        Devuelve el ancho y alto que ocupa un texto.
+    draw(surface, text, pos, color):
+        Dibuja un texto y devuelve su rectángulo.
+    """
+    def __init__(self, font, background = None):
+        self.font = font
+        self.background = background
+        self.glyphs = {}
+        self.widths = {}
+        self.height = font.get_linesize()
+
+    def prepare(self, text, color):
+        """
+           Renderiza los caracteres de `text` que aún no están en la caché y devuelve los diccionarios
+           {carácter: superficie} y {carácter: ancho} del color.
+           """
+        glyphs = self.glyphs.setdefault(color, {})
+        widths = self.widths.setdefault(color, {})
+        for char in set(text).difference(glyphs):
+            surface = self.font.render(char, True, color, self.background)
+            surface = surface.convert() if self.background is not None else surface.convert_alpha()
+            glyphs[char] = surface
+            widths[char] = surface.get_width()
+        return glyphs, widths
+
+    def size(self, text, color = 'White'):
+        _, widths = self.prepare(text, color)
+        return sum(map(widths.__getitem__, text)), self.height
+
+    def draw(self, surface, text, pos, color = 'White'):
+        """
+           Dibuja un texto con los glifos de la caché.
+
+           Parámetros
+           ----------
+           surface : pygame.Surface
+               Superficie sobre la que se dibuja.
+           text : str
+               Texto a dibujar.
+           pos : tuple
+               Esquina superior izquierda del texto.
+           color : str, opcional
+               Color del texto, por defecto 'White'.
+
+           Retorna
+           -------
+           pygame.Rect
+               Rectángulo ocupado por el texto.
+           """
+        glyphs, widths = self.prepare(text, color)
+        left, y = pos
+        x = left
+        blits = []
+        for char in text:
+            blits.append((glyphs[char], (x, y)))
+            x += widths[char]
+        surface.blits(blits, doreturn = False)
+        return pygame.Rect(left, y, x - left, self.height)
+
+
+class PerfOverlay:
+    """
+    Panel de rendimiento superpuesto al juego (se muestra y oculta con F3).
+
+    Muestra los FPS con una gráfica del tiempo de cada fotograma, el tiempo de cada fase del nivel
+    (`Level.profiler`), los sprites de cada grupo, las partículas activas, la memoria de la caché de
+    recursos y los aciertos de la caché de textos. El texto se compone con `GlyphCache` sobre un panel guardado, del que cada fotograma solo
+    se reescribe una línea; además se desplaza la gráfica una columna y se dibujan el panel y la
+    gráfica, así que el panel cuesta en torno a una décima de milisegundo por fotograma.
+
+    Atributos
+    ----------
+    enabled : bool
+        Indica si el panel está visible.
+    timestep : FixedTimestep or None
+        Bucle de paso fijo del juego, para mostrar sus estadísticas (lo asigna `Game`).
+    frame_times : list
+        Duración en milisegundos de los últimos fotogramas.
+    draw_ms : float
+        Coste en milisegundos del último dibujado del panel.
+
+    Métodos
+    -------
+    toggle(level):
+        Muestra u oculta el panel y activa o desactiva el perfilador del nivel.
+    draw(level):
+        Mide el fotograma actual y dibuja el panel.
+    """
+    def __init__(self, pos = (10, 10)):
+        self.enabled = False
+        self.timestep = None
+        self.pos = pos
+        self.background_color = pygame.Color(UI_BACKGROUND_COLOR)
+        self.text_color = pygame.Color(TEXT_COLOR)
+        self.good_color = pygame.Color('green')
+        self.slow_color = pygame.Color(HEALTH_COLOR)
+        self.glyphs = GlyphCache(pygame.font.Font(None, PERF_OVERLAY_FONT_SIZE), self.background_color)
+        self.panel = None
+        self.panel_lines = 0
+        self.current_lines = []
+        self.line_index = 0
+        self.profiler_was_enabled = False
+
+        # Gráfica del tiempo de fotograma: cada fotograma se desplaza una columna a la izquierda
+        self.graph = pygame.Surface((PERF_GRAPH_WIDTH, PERF_GRAPH_HEIGHT)).convert()
+        self.graph.fill(self.background_color)
+        self.graph_scale = PERF_GRAPH_HEIGHT / PERF_GRAPH_MAX_MS
+        self.budget_y = PERF_GRAPH_HEIGHT - round(1000 / FPS * self.graph_scale)
+
+        self.frame_times = []
+        self.last_time = None
+        self.draw_ms = 0.0
+
+    def toggle(self, level):
+        """
+           Muestra u oculta el panel. Mientras está visible el perfilador del nivel está activado.
+
+           Parámetros
+           ----------
+           level : Level
+               Nivel cuyo perfilador se activa.
+           """
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.profiler_was_enabled = level.profiler.enabled
+            level.profiler.enabled = True
+            self.last_time = None
+            self.panel = None
+            self.line_index = 0
+        else:
+            level.profiler.enabled = self.profiler_was_enabled
+
+    def lines(self, level):
+        """
+           Devuelve las líneas de texto del panel.
+           """
+        frame_times = self.frame_times
+        average = sum(frame_times) / len(frame_times) if frame_times else 0.0
+        fps = 1000 / average if average else 0.0
+        worst = max(frame_times, default = 0.0)
+        phases = level.profiler.last
+        visible = level.visible_sprites
+        enemies = level.enemy_manager
+        particles = visible.particles
+        pool = level.animation_exec.pool
+
+        lines = [
+            f'FPS {fps:5.1f}  fotograma {average:5.2f} ms  peor {worst:5.2f} ms',
+            '  '.join(f'{name} {phases.get(name, 0.0):.2f}' for name in PERF_OVERLAY_PHASES),
+            f'visibles {len(visible)}  dibujados {visible.drawn_count}  descartados {visible.culled_count}  chunks {visible.chunks_drawn}',
+            f'enemigos {enemies.awake_count}/{len(enemies)}  obstaculos {len(level.obstacle_sprites)}  '
+            f'atacables {len(level.attackable_sprites)}  estaticos {len(level.static_sprites)}',
+            f'particulas {len(particles)}/{particles.capacity}  sprites {len(pool)}/{pool.capacity}',
+            f'assets {len(asset_cache)}  {asset_cache.memory / (1024 * 1024):.1f} MB  '
+            f'aciertos {asset_cache.hits}  fallos {asset_cache.misses}',
+            f'textos {len(text_cache)}  aciertos {text_cache.hits}  fallos {text_cache.misses}',
+        ]
+        if self.timestep is not None:
+            stats = self.timestep.stats()
+            lines.append(f'pasos/fotograma {stats["updates_per_frame"]:.2f}  con retraso {stats["late_frames"]}  '
+                         f'descartado {stats["dropped_ms"]:.0f} ms')
+        if level.last_autosave is not None:
+            autosave = level.last_autosave
+            lines.append(f'autoguardado {autosave["ms"]:.2f} ms  filas {autosave["rows"]}')
+        if level.last_quicksave is not None:
+            quick = level.last_quicksave
+            if quick['error'] is not None:
+                lines.append(f'{quick["action"]}: {quick["error"]}')
+            elif quick['bytes'] is not None:
+                lines.append(f'{quick["action"]} {quick["ms"]:.2f} ms  {quick["bytes"] / 1024:.0f} KiB')
+            else:
+                lines.append(f'{quick["action"]} {quick["ms"]:.2f} ms')
+        lines.append(f'panel {self.draw_ms:.3f} ms')
+        return lines
+
+    def build_panel(self, lines):
+        """
+           Crea el panel con espacio para `lines` y dibuja todas las líneas.
+           """
+        line_height = self.glyphs.height
+        width = max(self.glyphs.size(line, TEXT_COLOR)[0] for line in lines)
+        width = -(-max(width, PERF_GRAPH_WIDTH) // 64) * 64 + 12 # Margen para que no haya que rehacerlo a menudo
+        height = line_height * len(lines) + PERF_GRAPH_HEIGHT + 16
+        self.panel = pygame.Surface((width, height)).convert()
+        self.panel.fill(self.background_color)
+        for index, line in enumerate(lines):
+            self.glyphs.draw(self.panel, line, (6, 6 + index * line_height), TEXT_COLOR)
+        self.graph_pos = (self.pos[0] + 6, self.pos[1] + 10 + line_height * len(lines))
+
+    def refresh_line(self, level):
+        """
+           Vuelve a escribir una línea del panel. Cada fotograma se actualiza la siguiente, así que el
+           coste de componer el texto se reparte entre fotogramas en lugar de concentrarse en uno.
+           """
+        if self.line_index == 0:
+            self.current_lines = self.lines(level)
+        lines = self.current_lines
+        line = lines[self.line_index]
+        width, line_height = self.glyphs.size(line, TEXT_COLOR)
+        if self.panel is None or width + 12 > self.panel.get_width() or len(lines) != self.panel_lines:
+            self.build_panel(lines)
+            self.panel_lines = len(lines)
+        else:
+            top = 6 + self.line_index * line_height
+            self.panel.fill(self.background_color, (6, top, self.panel.get_width() - 12, line_height))
+            self.glyphs.draw(self.panel, line, (6, top), TEXT_COLOR)
+        self.line_index = (self.line_index + 1) % len(lines)
+
+    def add_frame(self, milliseconds):
+        """
+           Añade un fotograma a la historia y a la gráfica.
+           """
+        self.frame_times.append(milliseconds)
+        if len(self.frame_times) > PERF_GRAPH_WIDTH:
+            del self.frame_times[0]
+
+        graph = self.graph
+        graph.scroll(-1, 0)
+        x = PERF_GRAPH_WIDTH - 1
+        pygame.draw.line(graph, self.background_color, (x, 0), (x, PERF_GRAPH_HEIGHT - 1))
+        height = min(PERF_GRAPH_HEIGHT, max(1, round(milliseconds * self.graph_scale)))
+        color = self.slow_color if milliseconds > 1000 / FPS else self.good_color
+        pygame.draw.line(graph, color, (x, PERF_GRAPH_HEIGHT - height), (x, PERF_GRAPH_HEIGHT - 1))
+        graph.set_at((x, self.budget_y), self.text_color)
+
+    def draw(self, level):
+        """
+           Mide el tiempo desde el fotograma anterior y dibuja el panel si está visible.
+
+           Parámetros
+           ----------
+           level : Level
+               Nivel del que se muestran las estadísticas.
+           """
+        if not self.enabled:
+            return
+        start = time.perf_counter()
+        if self.last_time is not None:
+            self.add_frame((start - self.last_time) * 1000)
+        self.last_time = start
+
+        self.refresh_line(level)
+
+        display_surface = pygame.display.get_surface()
+        display_surface.blits(((self.panel, self.pos), (self.graph, self.graph_pos)), doreturn = False)
+        self.draw_ms = (time.perf_counter() - start) * 1000
@@ -1,8 +1,10 @@
 import pygame
+import game_time
 from settings import *
 from entity import Entity
 from support import *
 from debug import *
+from assets import asset_cache
 
 class Enemy(Entity):
 
@@ -30,6 +32,9 @@ class Enemy(Entity):
         Función que se llama para mostrar partículas al morir.
     gain_xp : function
         Función que se llama para otorgar experiencia al jugador al morir.
+    spawn_id : int, opcional
+        Identificador del punto de aparición del enemigo en el mapa, único en el nivel. Identifica al
+        enemigo en las partidas guardadas.
 
     Atributos
     ----------
@@ -55,11 +60,18 @@ class Enemy(Entity):
         Indica si el enemigo puede recibir daño.
     direction : Vector2
         Dirección actual del movimiento.
+    enemy_manager : EnemyManager or None
+        Gestor que calcula por lotes la distancia y dirección al jugador, si el enemigo pertenece a uno.
+    asleep : bool
+        Indica si el enemigo está dormido (lejos del jugador y fuera de la cámara) y no se actualiza.
     """
 
-    def __init__(self, enemy_name, pos, groups, obstacle_sprites, dmg_player, death_particles, gain_xp):
+    def __init__(self, enemy_name, pos, groups, obstacle_sprites, dmg_player, death_particles, gain_xp, spawn_id = None):
 
-        # Setup general
+        # Setup general (el EnemyManager, si está entre los grupos, rellena estos dos atributos)
+        self.enemy_manager = None
+        self.manager_index = None
+        self.asleep = False
         super().__init__(groups)
         self.sprite_type = 'enemy'
 
@@ -75,6 +87,7 @@ class Enemy(Entity):
 
         # Estadísticas del enemigo
         self.enemy_name = enemy_name
+        self.spawn_id = spawn_id
         enemy_info = monster_data[self.enemy_name]
         self.health = enemy_info['health']
         self.exp = enemy_info['exp']
@@ -98,17 +111,15 @@ class Enemy(Entity):
         self.hit_time = 0
         self.invincibility_duration = 300
 
-        # Sonidos
-        self.death_sound = pygame.mixer.Sound('audio/death.wav')
-        self.hit_sound = pygame.mixer.Sound('audio/hit.wav')
-        self.attack_sounds = pygame.mixer.Sound(enemy_info['attack_sound'])
-        self.death_sound.set_volume(0.3)
-        self.hit_sound.set_volume(0.3)
-        self.attack_sounds.set_volume(0.3)
+        # Sonidos (compartidos entre todos los enemigos)
+        self.death_sound = asset_cache.sound('audio/death.wav', 0.3)
+        self.hit_sound = asset_cache.sound('audio/hit.wav', 0.3)
+        self.attack_sounds = asset_cache.sound(enemy_info['attack_sound'], 0.3)
 
     def import_graphics(self, enemy_name):
         """
             Importa las animaciones del enemigo desde la carpeta de gráficos correspondiente.
+            Los fotogramas se comparten con el resto de enemigos del mismo tipo a través de `asset_cache`.
 
             Parámetros
             ----------
@@ -118,12 +129,23 @@ class Enemy(Entity):
         self.animations = {'idle': [], 'move': [], 'attack': []}
         main_path = f'./graphics/monsters/{enemy_name}/'
         for animation in self.animations.keys():
-            self.animations[animation] = import_folder(main_path + animation)
+            self.animations[animation] = asset_cache.folder(main_path + animation)
+
+    def manager_index_for(self, player):
+        """
+           Devuelve el índice del enemigo en su `EnemyManager` si los valores calculados en la última
+           pasada siguen siendo válidos, o `None` en caso contrario.
+           """
+        if self.enemy_manager is None:
+            return None
+        return self.enemy_manager.index_for(self, player)
 
     def get_player_distance_direction(self, player):
         """
            Calcula la distancia y dirección hacia el jugador.
 
+           Si el `EnemyManager` ya las ha calculado en este fotograma se reutilizan sus valores.
+
            Parámetros
            ----------
            player : Player
@@ -134,6 +156,9 @@ class Enemy(Entity):
            tuple
                (distancia, dirección) hacia el jugador como (float, Vector2).
            """
+        index = self.manager_index_for(player)
+        if index is not None:
+            return self.enemy_manager.distance[index], self.enemy_manager.direction(index)
 
         enemy_vector = pygame.math.Vector2(self.rect.center)
         player_vector = pygame.math.Vector2(player.rect.center)
@@ -155,12 +180,20 @@ class Enemy(Entity):
            player : Player
                Instancia del jugador.
            """
-        distance = self.get_player_distance_direction(player)[0]
-        if distance <= self.attack_radius and self.able_to_attack:
+        index = self.manager_index_for(player)
+        if index is not None:
+            in_attack_radius = self.enemy_manager.in_attack_radius[index]
+            in_notice_radius = self.enemy_manager.in_notice_radius[index]
+        else:
+            distance = self.get_player_distance_direction(player)[0]
+            in_attack_radius = distance <= self.attack_radius
+            in_notice_radius = distance <= self.notice_radius
+
+        if in_attack_radius and self.able_to_attack:
             if self.status != 'attack':
                 self.frame_index = 0
             self.status = 'attack'
-        elif distance <= self.notice_radius:
+        elif in_notice_radius:
             self.status = 'move'
         else:
             self.status = 'idle'
@@ -176,16 +209,29 @@ class Enemy(Entity):
           """
         if self.status == 'attack':
             self.attack_sounds.play()
-            self.attack_time = pygame.time.get_ticks()
+            self.attack_time = game_time.get_ticks()
             self.dmg_player(self.attack_damage, self.attack_type)
         if self.status == 'move':
             self.direction = self.get_player_distance_direction(player)[1]
 
+    def can_sleep(self):
+        """
+           Indica si el enemigo está en reposo: parado, sin animación de ataque y sin tiempos de
+           reutilización pendientes. Solo entonces se le puede dormir sin cambiar su comportamiento.
+
+           Retorna
+           -------
+           bool
+               `True` si el enemigo puede dormirse.
+           """
+        return (self.status == 'idle' and self.vulnerable and self.able_to_attack
+                and self.direction.x == 0 and self.direction.y == 0)
+
     def cooldown(self):
         """
            Controla los tiempos de reutilización del ataque y de la invulnerabilidad del enemigo.
            """
-        current_time = pygame.time.get_ticks()
+        current_time = game_time.get_ticks()
 
         if not self.able_to_attack:
             if current_time - self.attack_time >= self.attack_cooldown:
@@ -210,11 +256,12 @@ class Enemy(Entity):
         self.image = animation[int(self.frame_index)]
         self.rect = self.image.get_rect(center = self.hitbox.center)
 
+        # Los fotogramas son compartidos: el parpadeo se aplica sobre una copia
         if not self.vulnerable:
             alpha = self.alpha_variation()
-            self.image.set_alpha(alpha)
-        else:
-            self.image.set_alpha(255)
+            if alpha != 255:
+                self.image = self.image.copy()
+                self.image.set_alpha(alpha)
 
 
     def get_damage(self, player, attack_type):
@@ -229,6 +276,7 @@ class Enemy(Entity):
                Tipo de ataque que se aplica ('weapon' o 'magic').
            """
         if self.vulnerable:
+            self.asleep = False
             self.hit_sound.play()
             self.direction = self.get_player_distance_direction(player)[1]
             if attack_type == 'weapon':
@@ -236,7 +284,8 @@ class Enemy(Entity):
             else:
                 self.health -= player.get_full_magic_dmg()
                 # Daño por magia
-            self.hit_time = pygame.time.get_ticks()
+            self.dirty.add('health')
+            self.hit_time = game_time.get_ticks()
             self.vulnerable = False
 
     def is_dead(self):
@@ -247,6 +296,7 @@ class Enemy(Entity):
         if self.health <= 0:
             self.death_sound.play()
             self.death_particles(self.rect.center, self.enemy_name)
+            self.dirty.add('alive')
             self.kill()
             self.gain_xp(self.exp)
     def knockback(self):
@@ -258,8 +308,10 @@ class Enemy(Entity):
 
     def update(self):
         """
-          Actualiza el estado del enemigo: retroceso y movimiento.
+          Actualiza el estado del enemigo: retroceso y movimiento. Los enemigos dormidos no se mueven.
           """
+        if self.asleep:
+            return
         self.knockback()
         self.move(self.speed)
 
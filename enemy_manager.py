@@ -0,0 +1,190 @@
+from array import array
+from math import sqrt
+
+import pygame
+from settings import *
+
+
+class EnemyManager(pygame.sprite.Group):
+    """
+    Grupo de enemigos que guarda su estado en arrays y calcula en una sola pasada por fotograma la
+    distancia de cada enemigo al jugador y las comprobaciones de `attack_radius` y `notice_radius`.
+
+    Sustituye a las dos o tres llamadas por enemigo y fotograma a `Enemy.get_player_distance_direction`,
+    que creaban varios `pygame.math.Vector2` cada vez. Los resultados son exactamente los mismos: la
+    distancia es `sqrt(dx*dx + dy*dy)` y la dirección el vector normalizado, igual que `Vector2`.
+
+    Hereda de
+    ----------
+    pygame.sprite.Group
+
+    Atributos
+    ----------
+    enemies : list
+        Enemigos registrados; la posición en la lista es su índice en los arrays.
+    centers : list
+        Centro de cada enemigo usado en el último cálculo.
+    attack_radius, notice_radius : array
+        Radios de ataque y de detección de cada enemigo.
+    distance : array
+        Distancia de cada enemigo al jugador.
+    in_attack_radius, in_notice_radius : array
+        1 si el jugador está dentro del radio de ataque o de detección del enemigo.
+    player_center : tuple or None
+        Centro del jugador usado en el último cálculo.
+    wake_radius : array
+        `notice_radius` más `ENEMY_SLEEP_MARGIN` de cada enemigo.
+    awake_count : int
+        Enemigos despiertos tras el último cálculo.
+    killed : list
+        Enemigos muertos (con 'alive' en `dirty`) que ya han salido del grupo y aún no se han guardado.
+
+    Métodos
+    -------
+    update_player_vectors(player):
+        Calcula distancias y comprobaciones de radio de todos los enemigos en una pasada y decide
+        qué enemigos duermen.
+    direction(index):
+        Devuelve la dirección normalizada de un enemigo hacia el jugador.
+    index_for(enemy, player):
+        Devuelve el índice de un enemigo en los arrays, si sus valores siguen siendo válidos.
+    """
+    def __init__(self, *sprites):
+        self.enemies = []
+        self.pending = []
+        self.centers = []
+        self.attack_radius = array('d')
+        self.notice_radius = array('d')
+        self.distance = array('d')
+        self.in_attack_radius = array('b')
+        self.in_notice_radius = array('b')
+        self.wake_radius = array('d')
+        self.player_center = None
+        self.awake_count = 0
+        self.killed = []
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer = None):
+        super().add_internal(sprite, layer)
+        # El enemigo aún no tiene estadísticas ni rect: se registra en los arrays en el próximo cálculo
+        sprite.enemy_manager = self
+        sprite.manager_index = None
+        self.pending.append(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        if 'alive' in sprite.dirty:
+            self.killed.append(sprite)
+        index = sprite.manager_index
+        sprite.manager_index = None
+        if index is None:
+            return
+
+        # Borrado por intercambio con el último para no desplazar los arrays
+        last = len(self.enemies) - 1
+        if index != last:
+            moved = self.enemies[last]
+            self.enemies[index] = moved
+            moved.manager_index = index
+            for values in self.columns():
+                values[index] = values[last]
+        self.enemies.pop()
+        for values in self.columns():
+            values.pop()
+
+    def columns(self):
+        return (self.centers, self.attack_radius, self.notice_radius, self.wake_radius, self.distance,
+                self.in_attack_radius, self.in_notice_radius)
+
+    def register_pending(self):
+        """
+           Registra en los arrays los enemigos añadidos desde el último cálculo.
+           """
+        for enemy in self.pending:
+            if not self.has(enemy) or enemy.manager_index is not None:
+                continue
+            enemy.manager_index = len(self.enemies)
+            self.enemies.append(enemy)
+            self.centers.append(None)
+            self.attack_radius.append(enemy.attack_radius)
+            self.notice_radius.append(enemy.notice_radius)
+            self.wake_radius.append(enemy.notice_radius + ENEMY_SLEEP_MARGIN)
+            self.distance.append(0)
+            self.in_attack_radius.append(0)
+            self.in_notice_radius.append(0)
+        self.pending.clear()
+
+    def update_player_vectors(self, player):
+        """
+           Calcula en una sola pasada la distancia de todos los enemigos al jugador y si este está
+           dentro de su radio de ataque y de detección.
+
+           Además duerme a los enemigos que están más allá de `notice_radius + ENEMY_SLEEP_MARGIN`,
+           fuera de la cámara (ampliada con el mismo margen) y en reposo (ver `Enemy.can_sleep`), y
+           despierta al resto. Un enemigo dormido no ejecuta `enemy_update` ni `update`: en reposo y
+           lejos del jugador ambos dejarían su estado igual, salvo el fotograma de la animación, que
+           no se ve fuera de la cámara.
+
+           Parámetros
+           ----------
+           player : Player
+               Instancia del jugador.
+           """
+        if self.pending:
+            self.register_pending()
+
+        px, py = self.player_center = player.rect.center
+        self.centers = centers = [enemy.rect.center for enemy in self.enemies]
+        self.distance = distance = array('d', [sqrt((px - x) * (px - x) + (py - y) * (py - y)) for x, y in centers])
+        self.in_attack_radius = array('b', [length <= radius for length, radius in zip(distance, self.attack_radius)])
+        self.in_notice_radius = array('b', [length <= radius for length, radius in zip(distance, self.notice_radius)])
+
+        view_rect = pygame.Rect(0, 0, WIDTH, HEIGTH).inflate(ENEMY_SLEEP_MARGIN * 2, ENEMY_SLEEP_MARGIN * 2)
+        view_rect.center = self.player_center
+        awake_count = 0
+        for enemy, length, radius in zip(self.enemies, distance, self.wake_radius):
+            enemy.asleep = length > radius and enemy.can_sleep() and not view_rect.colliderect(enemy.rect)
+            awake_count += not enemy.asleep
+        self.awake_count = awake_count
+
+    def direction(self, index):
+        """
+           Devuelve la dirección normalizada del enemigo `index` hacia el jugador.
+
+           Solo la necesitan los enemigos que se mueven o reciben daño, así que se calcula al pedirla a
+           partir de la distancia ya calculada, con la misma operación que `Vector2.normalize()`.
+
+           Retorna
+           -------
+           Vector2
+               Dirección hacia el jugador, o (0, 0) si el enemigo está sobre él.
+           """
+        length = self.distance[index]
+        if length > 0:
+            x, y = self.centers[index]
+            px, py = self.player_center
+            return pygame.math.Vector2((px - x) / length, (py - y) / length)
+        return pygame.math.Vector2(0, 0)
+
+    def index_for(self, enemy, player):
+        """
+           Devuelve el índice de un enemigo en los arrays si sus valores siguen siendo válidos.
+
+           Solo lo son si ni el enemigo ni el jugador se han movido desde el último cálculo.
+
+           Parámetros
+           ----------
+           enemy : Enemy
+               Enemigo consultado.
+           player : Player
+               Instancia del jugador.
+
+           Retorna
+           -------
+           int or None
+               Índice del enemigo, o `None` si hay que calcular los valores directamente.
+           """
+        index = enemy.manager_index
+        if index is None or enemy.rect.center != self.centers[index] or player.rect.center != self.player_center:
+            return None
+        return index
@@ -1,4 +1,5 @@
 import pygame
+import game_time
 from math import sin
 
 class Entity(pygame.sprite.Sprite):
@@ -21,6 +22,8 @@ class Entity(pygame.sprite.Sprite):
             Rectángulo que define el área de colisión de la entidad.
         rect : pygame.Rect
             Rectángulo de la imagen de la entidad (para renderizarla).
+        dirty : set
+            Datos guardables que han cambiado desde el último guardado ('position', 'health', ...).
         """
     def __init__(self, groups):
         """
@@ -38,6 +41,7 @@ class Entity(pygame.sprite.Sprite):
         super().__init__(groups)
         self.frame_index = 0
         self.animation_speed = 0.15
+        self.dirty = set()
         self.direction = pygame.math.Vector2()
 
     def move(self, speed):
@@ -56,11 +60,30 @@ class Entity(pygame.sprite.Sprite):
         if self.direction.magnitude() != 0:
             self.direction = self.direction.normalize()
 
+        start = self.hitbox.topleft
         self.hitbox.x += self.direction.x * speed
         self.collision('horizontal')
         self.hitbox.y += self.direction.y * speed
         self.collision('vertical')
         self.rect.center = self.hitbox.center
+        if self.hitbox.topleft != start:
+            self.dirty.add('position')
+
+    def nearby_obstacles(self):
+        """
+           Devuelve los obstáculos que pueden chocar con la hitbox de la entidad.
+
+           Si `obstacle_sprites` es un `SpatialHashGroup` solo se consultan las celdas que toca la
+           hitbox; con un grupo normal se recorren todos los obstáculos.
+
+           Retorna
+           -------
+           iterable
+               Sprites obstáculo candidatos, en el orden del grupo.
+           """
+        if hasattr(self.obstacle_sprites, 'nearby'):
+            return self.obstacle_sprites.nearby(self.hitbox)
+        return self.obstacle_sprites
 
     def collision(self, direction):
         """
@@ -76,14 +99,14 @@ class Entity(pygame.sprite.Sprite):
            """
 
         if direction == 'horizontal':
-            for sprite in self.obstacle_sprites:
+            for sprite in self.nearby_obstacles():
                 if sprite.hitbox.colliderect(self.hitbox):
                     if self.direction.x > 0:  # Nos movemos a la derecha.
                         self.hitbox.right = sprite.hitbox.left
                     if self.direction.x < 0:  # Nos movemos a la izquierda.
                         self.hitbox.left = sprite.hitbox.right
         if direction == 'vertical':
-            for sprite in self.obstacle_sprites:
+            for sprite in self.nearby_obstacles():
                 if sprite.hitbox.colliderect(self.hitbox):
                     if self.direction.y > 0:  # Nos movemos hacia abajo
                         self.hitbox.bottom = sprite.hitbox.top  # Ponemos la parte baja del player(Self.rect.Bottom) pegada a la parte alta del obstacle (sprite.rect.top).
@@ -119,7 +142,7 @@ class Entity(pygame.sprite.Sprite):
             int
                 255 si el valor del seno es positivo, 0 si es negativo.
             """
-        value = sin(pygame.time.get_ticks())
+        value = sin(game_time.get_ticks())
         if value >= 0:
             return 255
         else:
@@ -0,0 +1,178 @@
+"""
+Reloj de la lógica del juego.
+
+Todos los tiempos de recarga y periodos de invencibilidad se miden con `get_ticks()`. Normalmente
+devuelve el reloj real de pygame, pero en una simulación (modo sin ventana, pruebas, repeticiones)
+el tiempo solo avanza cuando se llama a `advance()`, de forma que cada paso de la simulación
+equivale a un fotograma del juego aunque se ejecute mucho más rápido.
+
+El bucle del juego usa también el reloj simulado: `FixedTimestep` decide cuántos pasos de lógica de
+duración fija tocan en cada fotograma, y el reloj avanza exactamente un paso por actualización.
+"""
+import pygame
+from settings import *
+
+_simulated_ticks = None
+
+
+def get_ticks():
+    """
+       Devuelve el tiempo del juego en milisegundos.
+
+       Retorna
+       -------
+       int
+           Milisegundos simulados si hay una simulación activa; si no, `pygame.time.get_ticks()`.
+       """
+    if _simulated_ticks is None:
+        return pygame.time.get_ticks()
+    return int(_simulated_ticks)
+
+
+def start_simulation(start = 0):
+    """
+       Pasa a usar un reloj simulado que solo avanza con `advance()`.
+
+       Parámetros
+       ----------
+       start : float, opcional
+           Tiempo inicial en milisegundos, por defecto 0.
+       """
+    global _simulated_ticks
+    _simulated_ticks = start
+
+
+def stop_simulation():
+    """
+       Vuelve a usar el reloj real de pygame.
+       """
+    global _simulated_ticks
+    _simulated_ticks = None
+
+
+def get_time():
+    """
+       Devuelve el tiempo simulado exacto, con los decimales acumulados, o `None` si no hay simulación.
+       Sirve para guardar el reloj y restaurarlo después con `start_simulation`.
+       """
+    return _simulated_ticks
+
+
+def is_simulated():
+    """
+       Indica si el reloj simulado está activo.
+       """
+    return _simulated_ticks is not None
+
+
+def advance(milliseconds):
+    """
+       Avanza el reloj simulado.
+
+       Parámetros
+       ----------
+       milliseconds : float
+           Tiempo a avanzar en milisegundos. Se acumulan los decimales.
+       """
+    global _simulated_ticks
+    if _simulated_ticks is None:
+        raise RuntimeError('El reloj simulado no está activo: llama antes a start_simulation()')
+    _simulated_ticks += milliseconds
+
+
+class FixedTimestep:
+    """
+    Acumulador de tiempo para un bucle de lógica de paso fijo.
+
+    Cada fotograma se le pasa el tiempo real transcurrido y devuelve cuántos pasos de lógica de
+    `step` milisegundos hay que ejecutar. Si la máquina va lenta se ejecutan varios pasos por
+    fotograma (se dejan de dibujar fotogramas, pero la velocidad del juego no cambia); si va tan
+    lenta que harían falta más de `max_steps`, el tiempo sobrante se descarta y queda anotado en
+    `dropped_ms` para que la pérdida de rendimiento sea medible.
+
+    Parámetros
+    ----------
+    step : float, opcional
+        Duración de un paso de lógica en milisegundos, por defecto `1000 / UPDATE_RATE`.
+    max_steps : int, opcional
+        Pasos máximos por fotograma, por defecto `MAX_UPDATES_PER_FRAME`.
+
+    Atributos
+    ----------
+    accumulator : float
+        Tiempo pendiente de simular, siempre menor que un paso tras `add_time`.
+    frames : int
+        Fotogramas dibujados.
+    updates : int
+        Pasos de lógica ejecutados.
+    late_frames : int
+        Fotogramas que han necesitado más de un paso de lógica.
+    dropped_ms : float
+        Tiempo real descartado por superar `max_steps`.
+
+    Métodos
+    -------
+    add_time(milliseconds):
+        Añade tiempo real y devuelve los pasos de lógica a ejecutar.
+    alpha():
+        Fracción de paso pendiente, para interpolar el dibujado.
+    stats():
+        Devuelve las estadísticas del bucle.
+    """
+    def __init__(self, step = 1000 / UPDATE_RATE, max_steps = MAX_UPDATES_PER_FRAME):
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.frames = 0
+        self.updates = 0
+        self.late_frames = 0
+        self.dropped_ms = 0.0
+
+    def add_time(self, milliseconds):
+        """
+           Añade el tiempo real transcurrido desde el fotograma anterior.
+
+           Parámetros
+           ----------
+           milliseconds : float
+               Tiempo real transcurrido en milisegundos.
+
+           Retorna
+           -------
+           int
+               Número de pasos de lógica a ejecutar en este fotograma.
+           """
+        self.accumulator += milliseconds
+        steps = int(self.accumulator // self.step)
+        if steps > self.max_steps:
+            dropped = (steps - self.max_steps) * self.step
+            self.dropped_ms += dropped
+            self.accumulator -= dropped
+            steps = self.max_steps
+        self.accumulator -= steps * self.step
+
+        self.frames += 1
+        self.updates += steps
+        if steps > 1:
+            self.late_frames += 1
+        return steps
+
+    def alpha(self):
+        return self.accumulator / self.step
+
+    def stats(self):
+        """
+           Devuelve las estadísticas del bucle.
+
+           Retorna
+           -------
+           dict
+               Fotogramas, pasos, fotogramas con retraso, tiempo descartado y pasos por fotograma.
+           """
+        return {
+            'frames': self.frames,
+            'updates': self.updates,
+            'late_frames': self.late_frames,
+            'dropped_ms': self.dropped_ms,
+            'updates_per_frame': self.updates / self.frames if self.frames else 0.0,
+        }
@@ -0,0 +1,236 @@
+"""
+Modo de simulación sin ventana.
+
+Permite construir un `Level` con el driver de vídeo `dummy` de SDL y avanzarlo N fotogramas con una
+entrada de teclado programada, tan rápido como permita la CPU (sin `clock.tick(FPS)`). El reloj del
+juego (`game_time`) avanza 1000 / FPS milisegundos por paso, así que la simulación se comporta
+igual que el juego real a 60 FPS. Para reproducir una partida grabada ver `replay.py`.
+
+Uso (desde la raíz del proyecto):
+
+    python headless.py --frames 600 [--render]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import pygame
+import game_time
+from settings import *
+
+# Guion de ejemplo: andar, atacar, lanzar un hechizo y cambiar de arma y magia
+DEFAULT_SCRIPT = [
+    (60, ('d',)),
+    (20, ('space',)),
+    (60, ('s',)),
+    (20, ('left ctrl',)),
+    (60, ('a',)),
+    (10, ('c', 'r')),
+    (60, ('w',)),
+    (20, ('space',)),
+]
+
+
+def init_headless():
+    """
+       Inicializa pygame con los drivers `dummy` de vídeo y audio y crea una pantalla fuera de
+       ventana del tamaño del juego, necesaria para `convert()` y `convert_alpha()`.
+
+       Retorna
+       -------
+       pygame.Surface
+           Superficie de la pantalla virtual.
+       """
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+    # Si pygame ya estaba iniciado con otros drivers se reinicia para aplicar los nuevos
+    if pygame.display.get_init() and pygame.display.get_driver() != 'dummy':
+        pygame.display.quit()
+        pygame.mixer.quit()
+    pygame.init()
+    return pygame.display.set_mode((WIDTH, HEIGTH))
+
+
+class PressedKeys:
+    """
+    Estado del teclado con la misma interfaz que `pygame.key.get_pressed()`.
+
+    Atributos
+    ----------
+    keys : frozenset
+        Códigos de las teclas pulsadas.
+    """
+    def __init__(self, keys = ()):
+        self.keys = frozenset(keys)
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+
+class ScriptedInput:
+    """
+    Entrada de teclado programada, fotograma a fotograma.
+
+    El guion es una lista de tramos (fotogramas, teclas): durante ese número de fotogramas se mantienen
+    pulsadas esas teclas. Las teclas se indican por su nombre de pygame ('w', 'space', 'left ctrl'...)
+    o por su código. Pulsar 'escape' equivale al evento KEYDOWN que abre el menú de mejoras.
+
+    Atributos
+    ----------
+    frames : list
+        Lista de `PressedKeys`, una por fotograma del guion.
+    frame : int
+        Fotograma actual. Pasado el final del guion no se pulsa ninguna tecla.
+
+    Métodos
+    -------
+    get_pressed():
+        Devuelve las teclas pulsadas en el fotograma actual.
+    menu_toggled():
+        Indica si en el fotograma actual se acaba de pulsar ESC.
+    frame_ms():
+        Devuelve los milisegundos que avanza el reloj tras el fotograma actual.
+    next_frame():
+        Avanza al siguiente fotograma del guion.
+    """
+    def __init__(self, script = ()):
+        """
+           Parámetros
+           ----------
+           script : list, opcional
+               Lista de tramos (fotogramas, teclas).
+           """
+        self.frames = []
+        for length, names in script:
+            codes = [name if isinstance(name, int) else pygame.key.key_code(name) for name in names]
+            self.frames.extend([PressedKeys(codes)] * length)
+        self.empty = PressedKeys()
+        self.frame = 0
+
+    def get_pressed(self):
+        if self.frame < len(self.frames):
+            return self.frames[self.frame]
+        return self.empty
+
+    def menu_toggled(self):
+        pressed = self.get_pressed()[pygame.K_ESCAPE]
+        was_pressed = 0 < self.frame <= len(self.frames) and self.frames[self.frame - 1][pygame.K_ESCAPE]
+        return pressed and not was_pressed
+
+    def frame_ms(self):
+        return 1000 / FPS
+
+    def next_frame(self):
+        self.frame += 1
+
+
+class HeadlessRunner:
+    """
+    Avanza un `Level` fotograma a fotograma sin ventana y sin limitar los FPS.
+
+    Atributos
+    ----------
+    level : Level
+        Nivel simulado.
+    input : ScriptedInput or replay.Replay
+        Entrada programada conectada al jugador y al menú de mejoras.
+    render : bool
+        Si es `True` también se dibuja cada fotograma en la pantalla virtual.
+    frame_times : list
+        Duración en milisegundos de cada fotograma simulado.
+
+    Métodos
+    -------
+    step():
+        Simula un fotograma.
+    run(frames):
+        Simula varios fotogramas y devuelve sus duraciones.
+    """
+    def __init__(self, script = DEFAULT_SCRIPT, render = False, seed = None, level = None, input = None):
+        """
+           Parámetros
+           ----------
+           script : list, opcional
+               Guion de entrada para `ScriptedInput`.
+           render : bool, opcional
+               Dibujar también cada fotograma, por defecto `False`.
+           seed : int, opcional
+               Semilla de `random` para que la simulación sea reproducible.
+           level : Level, opcional
+               Nivel ya construido. Si no se indica se crea uno nuevo.
+           input : object, opcional
+               Entrada con la interfaz de `ScriptedInput` (por ejemplo una grabación de
+               `replay.Replay`). Si no se indica se usa `ScriptedInput(script)`.
+           """
+        self.screen = init_headless()
+        game_time.start_simulation()
+        if seed is not None:
+            random.seed(seed)
+
+        if level is None:
+            from level import Level
+            level = Level()
+        self.level = level
+        self.render = render
+        self.input = ScriptedInput(script) if input is None else input
+        self.level.player.get_keys = self.input.get_pressed
+        self.level.upgrade.get_keys = self.input.get_pressed
+        self.frame_times = []
+
+    def step(self):
+        """
+           Simula un fotograma con el mismo orden que `Game.run`: eventos, dibujado y lógica.
+           """
+        start = time.perf_counter()
+        if self.input.menu_toggled():
+            self.level.toggle_menu()
+        if self.render:
+            self.screen.fill(WATER_COLOR)
+            self.level.draw()
+        self.level.update()
+        game_time.advance(self.input.frame_ms())
+        self.input.next_frame()
+        self.frame_times.append((time.perf_counter() - start) * 1000)
+
+    def run(self, frames):
+        """
+           Simula varios fotogramas seguidos.
+
+           Parámetros
+           ----------
+           frames : int
+               Número de fotogramas a simular.
+
+           Retorna
+           -------
+           list
+               Duración en milisegundos de cada fotograma simulado.
+           """
+        for _ in range(frames):
+            self.step()
+        return self.frame_times
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Simula el nivel sin ventana.')
+    parser.add_argument('--frames', type = int, default = 600, help = 'fotogramas a simular')
+    parser.add_argument('--render', action = 'store_true', help = 'dibujar también cada fotograma')
+    parser.add_argument('--seed', type = int, default = 0, help = 'semilla de random')
+    args = parser.parse_args(argv)
+
+    runner = HeadlessRunner(render = args.render, seed = args.seed)
+    frame_times = runner.run(args.frames)
+    total = sum(frame_times)
+    level = runner.level
+    enemies = level.enemy_manager
+    print(f'{args.frames} fotogramas en {total:.1f} ms ({total / args.frames:.3f} ms/fotograma, '
+          f'{1000 * args.frames / total:.0f} FPS)')
+    print(f'Jugador en {level.player.rect.center} con {level.player.health:.0f} de vida; '
+          f'{len(enemies)} enemigos vivos')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
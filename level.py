@@ -1,4 +1,7 @@
+import time
+
 import pygame
+import game_time
 
 from magic import MagicExec
 from settings import *
@@ -14,6 +17,14 @@ from particles import *
 from random import randint
 from magic import *
 from upgrade import Upgrade
+from spatial import SpatialHashGroup
+from static_layer import StaticChunkLayer
+from itertools import count
+from heapq import merge
+from profiling import PhaseProfiler
+from assets import asset_cache
+from map_compiler import import_map_layouts
+from enemy_manager import EnemyManager
 
 class Level:
 
@@ -29,14 +40,21 @@ class Level:
         Superficie de visualización principal del juego.
     visible_sprites : YSortCameraGroup
         Grupo de sprites visibles ordenados por coordenada Y (efecto de profundidad).
-    obstacle_sprites : pygame.sprite.Group
-        Grupo de sprites que actúan como obstáculos (colisiones).
+    obstacle_sprites : SpatialHashGroup
+        Grupo de sprites que actúan como obstáculos (colisiones), indexado por casillas.
     current_attack : Weapon or None
         Ataque activo actual del jugador.
-    attackable_sprites : pygame.sprite.Group
-        Sprites que pueden ser afectados por ataques.
+    attackable_sprites : SpatialHashGroup
+        Registro de los sprites que pueden ser afectados por ataques (hierba y enemigos), indexado
+        por casillas según su `rect`.
     attack_sprites : pygame.sprite.Group
         Sprites que representan los ataques activos.
+    enemy_manager : EnemyManager
+        Registro de los enemigos del nivel, con su distancia y dirección al jugador calculadas por lotes.
+    particle_sprites : pygame.sprite.Group
+        Registro de las partículas que son sprites (llamas). El resto vive en `visible_sprites.particles`.
+    static_sprites : pygame.sprite.Group
+        Registro de los azulejos visibles del mapa (hierba y objetos).
     ui : UI
         Interfaz de usuario.
     upgrade : Upgrade
@@ -45,6 +63,24 @@ class Level:
         Administrador de efectos de animaciones/partículas.
     magic_exec : MagicExec
         Administrador de hechizos mágicos.
+    profiler : PhaseProfiler
+        Medidor de tiempos de cada fase del fotograma ('update', 'enemy_update', 'attack_logic', 'draw', 'ui').
+    perf_overlay : PerfOverlay
+        Panel de rendimiento, oculto por defecto.
+    inventory : list
+        Objetos del inventario del jugador en la partida cargada (vacío en una partida nueva).
+    cut_grass : set
+        Casillas de hierba cortada (`Tile.tile_id`), incluidas las de la partida cargada.
+    dirty_grass : list
+        Hierba cortada desde el último guardado.
+    grass_tiles : dict
+        Todas las casillas de hierba del mapa {tile_id: Tile}, también las cortadas (fuera de los grupos).
+    needs_full_save : bool
+        Indica si el siguiente autoguardado tiene que ser completo (tras una carga rápida).
+    last_autosave : dict or None
+        Resultado del último autoguardado (ver `autosave`).
+    last_quicksave : dict or None
+        Resultado del último guardado o carga rápidos ('action', 'ms', 'bytes', 'error'; ver `Game`).
 
     Métodos
     -------
@@ -56,6 +92,18 @@ class Level:
         Elimina el ataque actual.
     create_map():
         Crea el mapa del juego basado en archivos CSV.
+    grass_groups(), enemy_groups():
+        Devuelven los grupos de una casilla de hierba y de un enemigo.
+    spawn_enemy(enemy_name, pos, spawn_id):
+        Crea un enemigo en el nivel.
+    spawn_saved_entities(save):
+        Crea el jugador y los enemigos de una partida guardada.
+    save_game(db, save_id):
+        Guarda el jugador, los enemigos y la hierba cortada en la base de datos.
+    autosave(db, save_id):
+        Guarda solo lo que ha cambiado desde el último guardado.
+    clear_dirty():
+        Marca todo el estado del nivel como guardado.
     attack_logic_player():
         Lógica de colisiones entre ataques del jugador y objetos o enemigos.
     dmg_player(amount, attack_type):
@@ -66,15 +114,29 @@ class Level:
         Añade experiencia al jugador.
     toggle_menu():
         Alterna entre pausa y juego activo.
+    toggle_perf_overlay():
+        Muestra u oculta el panel de rendimiento.
     run():
         Ejecuta la lógica de actualización y renderizado del nivel.
+    draw():
+        Dibuja el mundo y la interfaz de usuario.
+    update():
+        Avanza un fotograma de la lógica del nivel.
     """
 
-    def __init__(self):
+    def __init__(self, layouts = None, save = None):
         """
            Inicializa el nivel del juego, configurando los grupos de sprites y la interfaz de usuario.
            Además, crea el mapa, los enemigos y otras entidades necesarias.
 
+           Parámetros
+           ----------
+           layouts : dict, opcional
+               Capas del mapa {'boundary', 'grass', 'object', 'entities'}. Por defecto se leen de `map/`.
+           save : dict, opcional
+               Partida guardada, como la devuelve `DataBase.load_save`. Si se indica, el jugador y los
+               enemigos se crean con su estado guardado en lugar de a partir de la capa de entidades.
+
            """
 
         # Pausa del juego
@@ -86,22 +148,42 @@ class Level:
         
         # Setup de grupos de sprites.
         self.visible_sprites = YSortCameraGroup()
-        self.obstacle_sprites = pygame.sprite.Group()
+        self.obstacle_sprites = SpatialHashGroup()
 
         # Sprites de ataque
         self.current_attack = None
-        self.attackable_sprites = pygame.sprite.Group()
+        load_weapon_surfaces() # Precarga de las imágenes de las armas
+        self.attackable_sprites = SpatialHashGroup(rect_attr = 'rect')
         self.attack_sprites = pygame.sprite.Group()
 
+        # Registros por tipo. Cada sprite entra al crearse y sale al destruirse con kill(), así que
+        # cada bucle recorre solo la población que le interesa.
+        self.enemy_manager = EnemyManager()
+        self.particle_sprites = pygame.sprite.Group()
+        self.static_sprites = pygame.sprite.Group()
+
+        # Medición de tiempos por fase (desactivada por defecto)
+        self.profiler = PhaseProfiler()
+        self.perf_overlay = PerfOverlay()
+
         # Setup de los sprites.
-        self.create_map()
+        self.cut_grass = set(save['cut_grass']) if save is not None else set()
+        self.dirty_grass = []
+        self.grass_tiles = {}
+        self.last_autosave = None
+        self.last_quicksave = None
+        self.needs_full_save = False
+        self.create_map(layouts, spawn_entities = save is None)
+        self.inventory = []
+        if save is not None:
+            self.spawn_saved_entities(save)
 
         # Interfaz de usuario
         self.ui = UI()
         self.upgrade = Upgrade(self.player)
 
         # Partículas
-        self.animation_exec = AnimationExec()
+        self.animation_exec = AnimationExec(system = self.visible_sprites.particles)
         self.magic_exec = MagicExec(self.animation_exec)
 
     def create_attack(self):
@@ -127,9 +209,9 @@ class Level:
            """
 
         if style == 'heal':
-            self.magic_exec.heal(self.player, strength, cost, [self.visible_sprites])
+            self.magic_exec.heal(self.player, strength, cost, [self.visible_sprites, self.particle_sprites])
         if style == 'flame':
-            self.magic_exec.flame(self.player, cost, [self.visible_sprites, self.attack_sprites])
+            self.magic_exec.flame(self.player, cost, [self.visible_sprites, self.particle_sprites, self.attack_sprites])
 
     def destroy_attack(self):
         """
@@ -140,42 +222,55 @@ class Level:
             self.current_attack.kill()
         self.current_attack = None
         
-    def create_map(self):
+    def create_map(self, layouts = None, spawn_entities = True):
         """
-          Crea el mapa del juego cargando y procesando archivos CSV y gráficos.
+          Crea el mapa del juego a partir de sus capas (compiladas desde los archivos CSV) y gráficos.
 
           Organiza las capas de terreno, obstáculos, objetos y entidades, y coloca los sprites correspondientes
           en la pantalla.
 
+          Parámetros
+          ----------
+          layouts : dict, opcional
+              Capas del mapa ya cargadas, como filas de enteros. Por defecto se leen con
+              `import_map_layouts`, que usa el mapa compilado `map/map.bin`.
+          spawn_entities : bool, opcional
+              Crear el jugador y los enemigos de la capa de entidades, por defecto `True`. Al cargar
+              una partida se crean después con `spawn_saved_entities`.
+
+          La hierba de `cut_grass` se crea fuera de los grupos, solo en `grass_tiles`.
+
           """
         
-        layouts = {
-            'boundary': import_csv_layout('map/map_FloorBlocks.csv'),
-            'grass': import_csv_layout('map/map_Grass.csv'),
-            'object': import_csv_layout('map/map_Objects.csv'),
-            'entities': import_csv_layout('map/map_Entities.csv')
-        }
+        if layouts is None:
+            layouts = import_map_layouts()
+        if not spawn_entities:
+            layouts = {style: layout for style, layout in layouts.items() if style != 'entities'}
         
         graphics = {
-            'grass': import_folder('graphics/grass'),
-            'objects': import_folder('graphics/objects')
+            'grass': asset_cache.folder('graphics/grass'),
+            'objects': asset_cache.folder('graphics/objects')
         }
         
         for style, layout in layouts.items():   
             for row_index, row in enumerate(layout):
                 for col_index, col in enumerate(row):
-                    if col != '-1':
+                    if col != -1:
                         x = col_index * TILESIZE # Coordenadas en x.
                         y = row_index * TILESIZE # Coordenadas en y.
                         if style == 'boundary':
                             Tile((x,y), [self.obstacle_sprites], 'invisible')
                         if style == 'grass':
-                            Tile((x,y), [self.visible_sprites, self.obstacle_sprites, self.attackable_sprites], 'grass', random.choice(graphics['grass']))
+                            # El gráfico se elige aunque la hierba esté cortada para que el resto salga igual
+                            surf = random.choice(graphics['grass'])
+                            tile_id = row_index * len(row) + col_index
+                            groups = [] if tile_id in self.cut_grass else self.grass_groups()
+                            self.grass_tiles[tile_id] = Tile((x,y), groups, 'grass', surf, tile_id)
                         if style == 'object':
-                            surf = graphics['objects'][int(col)]
-                            Tile((x,y), [self.visible_sprites, self.obstacle_sprites], 'object', surf)
+                            surf = graphics['objects'][col]
+                            Tile((x,y), [self.visible_sprites, self.obstacle_sprites, self.static_sprites], 'object', surf)
                         if style == 'entities':
-                            if col == '394': # ID del jugador en el .CSV
+                            if col == 394: # ID del jugador en el .CSV
                                 self.player = Player((x,y),
                                                      [self.visible_sprites],
                                                      self.obstacle_sprites,
@@ -183,34 +278,172 @@ class Level:
                                                      self.destroy_attack,
                                                      self.create_magic)
                             else:
-                                if col == '390': enemy_name = 'bamboo'
-                                elif col == '391': enemy_name = 'spirit'
-                                elif col == '392': enemy_name = 'raccoon'
-                                elif col == '393': enemy_name = 'squid'
-                                Enemy(enemy_name,(x,y),
-                                      [self.visible_sprites, self.attackable_sprites],
-                                      self.obstacle_sprites, self.dmg_player, self.enemy_death_particle, self.gain_xp)
+                                if col == 390: enemy_name = 'bamboo'
+                                elif col == 391: enemy_name = 'spirit'
+                                elif col == 392: enemy_name = 'raccoon'
+                                elif col == 393: enemy_name = 'squid'
+                                # La casilla del mapa identifica a cada enemigo en las partidas guardadas
+                                self.spawn_enemy(enemy_name, (x,y), row_index * len(row) + col_index)
+
+    def grass_groups(self):
+        """
+           Devuelve los grupos a los que pertenece una casilla de hierba sin cortar.
+           """
+        return [self.visible_sprites, self.obstacle_sprites, self.attackable_sprites, self.static_sprites]
+
+    def enemy_groups(self):
+        """
+           Devuelve los grupos a los que pertenece un enemigo vivo.
+           """
+        return [self.visible_sprites, self.attackable_sprites, self.enemy_manager]
+
+    def spawn_enemy(self, enemy_name, pos, spawn_id):
+        """
+           Crea un enemigo en el nivel.
+
+           Parámetros
+           ----------
+           enemy_name : str
+               Tipo de enemigo ('bamboo', 'spirit', 'raccoon' o 'squid').
+           pos : tuple
+               Esquina superior izquierda del enemigo.
+           spawn_id : int
+               Casilla del mapa en la que aparece, que lo identifica en las partidas guardadas.
+
+           Retorna
+           -------
+           Enemy
+               El enemigo creado.
+           """
+        return Enemy(enemy_name, pos, self.enemy_groups(), self.obstacle_sprites, self.dmg_player,
+                     self.enemy_death_particle, self.gain_xp, spawn_id = spawn_id)
+
+    def spawn_saved_entities(self, save):
+        """
+           Crea el jugador y los enemigos vivos de una partida guardada directamente en su estado
+           guardado (posición, vida, estadísticas), sin recorrer la capa de entidades del mapa.
+           Los enemigos se crean en el orden de su `spawn_id`, el mismo en que los crea `create_map`.
+
+           Parámetros
+           ----------
+           save : dict
+               Partida guardada, como la devuelve `DataBase.load_save`.
+           """
+        player_data = save['player']
+        self.player = Player(player_data['position'],
+                             [self.visible_sprites],
+                             self.obstacle_sprites,
+                             self.create_attack,
+                             self.destroy_attack,
+                             self.create_magic)
+        self.player.load_data(player_data)
+
+        for spawn_id, enemy_name, x, y, health in save['enemies']:
+            enemy = self.spawn_enemy(enemy_name, (x, y), spawn_id)
+            enemy.health = health
+
+        self.inventory = save['inventory']
+
+    def save_game(self, db, save_id):
+        """
+           Guarda el jugador, todos los enemigos vivos del nivel y la hierba cortada en la base de datos
+           y marca todo como guardado.
+
+           Parámetros
+           ----------
+           db : DataBase
+               Base de datos en la que se guarda.
+           save_id : int
+               ID de guardado de la partida.
+           """
+        db.update_player(save_id, self.player.save_data())
+        db.save_enemies_bulk(save_id, self.enemy_manager)
+        db.save_cut_grass(save_id, self.cut_grass)
+        self.clear_dirty()
+        self.needs_full_save = False
+
+    def autosave(self, db, save_id):
+        """
+           Guarda solo lo que ha cambiado desde el último guardado, según las marcas `dirty` del jugador,
+           los enemigos y la hierba, en una transacción (`DataBase.save_changes`). Su coste depende de
+           lo que ha pasado en la partida, no del tamaño del mundo. La partida tiene que haberse guardado
+           antes completa con `save_game`.
+
+           Parámetros
+           ----------
+           db : DataBase
+               Base de datos en la que se guarda.
+           save_id : int
+               ID de guardado de la partida.
+
+           Retorna
+           -------
+           dict
+               Duración en milisegundos ('ms'), filas escritas ('rows') y, de ellas, enemigos cambiados
+               ('enemies'), muertos ('killed') y casillas de hierba ('grass'). Con escritura diferida
+               la duración es lo que tarda en encolarse. También queda en `last_autosave`.
+
+           Tras una carga rápida (`needs_full_save`) el estado ya no se deriva del último guardado, así
+           que se guarda completo con `save_game`.
+           """
+        start = time.perf_counter()
+        if self.needs_full_save:
+            self.save_game(db, save_id)
+            self.last_autosave = {'ms': (time.perf_counter() - start) * 1000,
+                                  'rows': 1 + len(self.enemy_manager) + len(self.cut_grass),
+                                  'enemies': len(self.enemy_manager), 'killed': 0, 'grass': len(self.cut_grass)}
+            return self.last_autosave
+
+        changed = [enemy for enemy in self.enemy_manager if enemy.dirty]
+        killed = [enemy.spawn_id for enemy in self.enemy_manager.killed]
+        grass = [tile.tile_id for tile in self.dirty_grass]
+        rows = db.save_changes(save_id, self.player.dirty_data(), changed, killed, grass)
+
+        self.player.dirty.clear()
+        for enemy in changed:
+            enemy.dirty.clear()
+        self.enemy_manager.killed.clear()
+        self.dirty_grass.clear()
+
+        self.last_autosave = {'ms': (time.perf_counter() - start) * 1000, 'rows': rows, 'enemies': len(changed),
+                              'killed': len(killed), 'grass': len(grass)}
+        return self.last_autosave
+
+    def clear_dirty(self):
+        """
+           Borra las marcas `dirty` del jugador y los enemigos y la hierba pendiente, tras guardar todo el nivel.
+           """
+        self.player.dirty.clear()
+        for enemy in self.enemy_manager:
+            enemy.dirty.clear()
+        self.enemy_manager.killed.clear()
+        self.dirty_grass.clear()
 
     def attack_logic_player(self):
         """
            Lógica de colisiones entre los ataques del jugador y los objetos o enemigos.
 
            Si un ataque del jugador colisiona con un objeto o enemigo, se aplica el daño o se generan efectos.
+           Solo se comprueban los sprites atacables de las casillas que toca cada ataque; antes se
+           vuelve a indexar a los enemigos que se han movido.
 
            """
         if self.attack_sprites:
+            self.attackable_sprites.refresh(self.enemy_manager)
             for attack_sprite in self.attack_sprites:
-                collision_sprites = pygame.sprite.spritecollide(attack_sprite,self.attackable_sprites,False)
+                collision_sprites = self.attackable_sprites.collide(attack_sprite.rect)
                 if collision_sprites:
                     for target_sprite in collision_sprites:
-                        if target_sprite.sprite_type == 'grass':
+                        if target_sprite in self.enemy_manager:
+                            target_sprite.get_damage(self.player,attack_sprite.sprite_type)
+                        else: # Hierba
                             pos = target_sprite.rect.center
                             offset = pygame.math.Vector2(0,50)
                             for leaf in range(randint(3,6)):
-                                self.animation_exec.create_grass_particles(pos - offset,[self.visible_sprites])
+                                self.animation_exec.create_grass_particles(pos - offset,[self.visible_sprites, self.particle_sprites])
+                            self.cut_grass.add(target_sprite.tile_id)
+                            self.dirty_grass.append(target_sprite)
                             target_sprite.kill()
-                        elif target_sprite.sprite_type == 'enemy':
-                            target_sprite.get_damage(self.player,attack_sprite.sprite_type)
 
     def dmg_player(self, amount, attack_type):
         """
@@ -226,11 +459,12 @@ class Level:
            """
         if self.player.vulnerable:
             self.player.health -= amount
+            self.player.dirty.add('health')
             self.player.vulnerable = False
-            self.player.hurt_time = pygame.time.get_ticks()
+            self.player.hurt_time = game_time.get_ticks()
 
             # Partículas
-            self.animation_exec.create_particles(attack_type, self.player.rect.center, [self.visible_sprites])
+            self.animation_exec.create_particles(attack_type, self.player.rect.center, [self.visible_sprites, self.particle_sprites])
 
     def enemy_death_particle(self, pos, particle_type):
         """
@@ -244,7 +478,7 @@ class Level:
               El tipo de partícula a generar (por ejemplo, 'flame', 'blood', etc.).
 
           """
-        self.animation_exec.create_particles(particle_type, pos, self.visible_sprites)
+        self.animation_exec.create_particles(particle_type, pos, [self.visible_sprites, self.particle_sprites])
 
 
     def gain_xp(self, amount):
@@ -258,6 +492,7 @@ class Level:
 
           """
         self.player.exp += amount
+        self.player.dirty.add('exp')
 
     def toggle_menu(self):
         """
@@ -268,6 +503,13 @@ class Level:
           """
         self.game_paused = not self.game_paused
 
+    def toggle_perf_overlay(self):
+        """
+          Muestra u oculta el panel de rendimiento. Mientras está visible se miden las fases del fotograma.
+
+          """
+        self.perf_overlay.toggle(self)
+
     def run(self):
         """
            Ejecuta la lógica de actualización y renderizado del nivel.
@@ -276,17 +518,38 @@ class Level:
            y dibuja la interfaz de usuario.
 
            """
-        self.visible_sprites.custom_draw(self.player)
-        self.ui.display(self.player)
+        self.draw()
+        self.update()
+
+    def draw(self):
+        """
+           Dibuja el mundo, la interfaz de usuario y, si está visible, el panel de rendimiento.
+
+           """
+        with self.profiler.phase('draw'):
+            self.visible_sprites.custom_draw(self.player)
+        with self.profiler.phase('ui'):
+            self.ui.display(self.player)
+        self.perf_overlay.draw(self)
+
+    def update(self):
+        """
+           Avanza un fotograma de la lógica del nivel: sprites, enemigos y ataques, o el menú de
+           mejoras si el juego está en pausa.
 
+           """
         # Mostrar menú de mejoras
         if self.game_paused:
             self.upgrade.display()
         # Ejecutar el juego
         else:
-            self.visible_sprites.update()
-            self.visible_sprites.enemy_update_level(self.player)
-            self.attack_logic_player()
+            with self.profiler.phase('update'):
+                self.visible_sprites.update()
+            with self.profiler.phase('enemy_update'):
+                self.enemy_manager.update_player_vectors(self.player)
+                self.visible_sprites.enemy_update_level(self.player, self.enemy_manager)
+            with self.profiler.phase('attack_logic'):
+                self.attack_logic_player()
 
 class YSortCameraGroup(pygame.sprite.Group):
     """
@@ -305,6 +568,20 @@ class YSortCameraGroup(pygame.sprite.Group):
          Imagen del suelo del nivel.
      floor_rect : pygame.Rect
          Rectángulo que delimita el suelo.
+     static_layer : StaticChunkLayer
+         Capa con el suelo y los azulejos estáticos pre-renderizados por chunks.
+     dynamic_sprites : dict
+         Sprites que se mueven o cambian de imagen {sprite: orden}. Se ordenan y dibujan cada fotograma.
+     y_sorted : list
+         Sprites dinámicos en el orden de dibujado del último fotograma.
+     particles : ParticleSystem
+         Partículas por lotes, que se dibujan intercaladas en Y con los sprites.
+     drawn_count : int
+         Sprites y partículas dibujados uno a uno en el último fotograma.
+     culled_count : int
+         Sprites dinámicos descartados en el último fotograma por quedar fuera de la cámara.
+     chunks_drawn : int
+         Chunks de la capa estática dibujados en el último fotograma.
      offset : pygame.math.Vector2
          Desplazamiento de cámara en x e y, centrado en el jugador.
 
@@ -312,7 +589,9 @@ class YSortCameraGroup(pygame.sprite.Group):
      -------
      custom_draw(player):
          Dibuja todos los sprites ordenados por Y con desplazamiento centrado en el jugador.
-     enemy_update_level(player):
+     update():
+         Avanza las partículas y actualiza los sprites dinámicos; los azulejos estáticos no tienen lógica que actualizar.
+     enemy_update_level(player, enemies):
          Llama a la actualización específica de enemigos visibles en el nivel.
      """
     def __init__(self):
@@ -322,16 +601,65 @@ class YSortCameraGroup(pygame.sprite.Group):
         self.half_width = self.display_surface.get_size()[0] // 2
         self.half_heigth = self.display_surface.get_size()[1] // 2
         
-        # Creando el suelo
-        self.floor_surf = pygame.image.load('graphics/tilemap/ground.png').convert()
+        # Creando el suelo (compartido con los niveles que se creen después, al cargar una partida)
+        self.floor_surf = asset_cache.image('graphics/tilemap/ground.png', alpha = False)
         self.floor_rect = self.floor_surf.get_rect(topleft=(0,0))
 
+        # Azulejos estáticos horneados por chunks y sprites dinámicos
+        self.static_layer = StaticChunkLayer(self.floor_surf)
+        self.dynamic_sprites = {}
+        self.pending_static = []
+        self.order_counter = count() # Orden de inserción, para desempatar igual que sorted()
+        self.y_sorted = []
+        self.y_sorted_dirty = False
+        self.particles = ParticleSystem(self.order_counter)
+
+        # Estadísticas del último fotograma dibujado
+        self.drawn_count = 0
+        self.culled_count = 0
+        self.chunks_drawn = 0
 
         self.offset = pygame.math.Vector2()
+
+    def add_internal(self, sprite, layer = None):
+        super().add_internal(sprite, layer)
+        order = next(self.order_counter)
+        if isinstance(sprite, Tile):
+            # El azulejo aún no tiene rect: se registra en la capa estática al dibujar
+            self.pending_static.append((sprite, order))
+        else:
+            self.dynamic_sprites[sprite] = order
+            self.y_sorted.append(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        if self.dynamic_sprites.pop(sprite, None) is None:
+            self.static_layer.remove(sprite)
+        else:
+            self.y_sorted_dirty = True
+
+    def update(self, *args, **kwargs):
+        # Las partículas avanzan antes, así que las que creen los sprites en este paso empiezan quietas
+        self.particles.update()
+        for sprite in list(self.dynamic_sprites):
+            sprite.update(*args, **kwargs)
+
+    def sort_key(self, sprite):
+        """
+          Clave de ordenación de un sprite: su coordenada Y y, en caso de empate, su orden de inserción.
+          """
+        return sprite.rect.centery, self.dynamic_sprites[sprite]
+
     def custom_draw(self, player):
         """
           Dibuja todos los sprites ordenados por su coordenada Y, aplicando un desplazamiento para centrar la cámara en el jugador.
 
+          El suelo y los azulejos estáticos se dibujan desde los chunks pre-renderizados. Encima se dibujan
+          los sprites dinámicos que caen dentro de la cámara, ordenados por Y, junto con los azulejos estáticos
+          que se solapan con ellos y quedan delante, para mantener el mismo efecto de profundidad. Los sprites
+          dinámicos fuera de la cámara se descartan y se cuentan en `culled_count`. Las partículas por lotes
+          se intercalan en el mismo orden y todo se dibuja con una sola llamada a `Surface.blits`.
+
           Parámetros
           ----------
           player : Player
@@ -342,29 +670,65 @@ class YSortCameraGroup(pygame.sprite.Group):
         # Conseguimos el desplazamiento (offset)
         self.offset.x = player.rect.centerx - self.half_width
         self.offset.y = player.rect.centery - self.half_heigth 
+        view_rect = self.display_surface.get_rect(topleft = (self.offset.x, self.offset.y))
         
-        # Dibujando el mapa
-        floor_offset_pos = self.floor_rect.topleft - self.offset
-        self.display_surface.blit(self.floor_surf, floor_offset_pos)
-        
-        for sprite in sorted(self.sprites(), key = lambda sprite: sprite.rect.centery):
-            offset_pos = sprite.rect.topleft - self.offset
-            self.display_surface.blit(sprite.image, offset_pos)
-
-    def enemy_update_level(self, player):
+        # Dibujando el mapa y los azulejos estáticos
+        for sprite, order in self.pending_static:
+            if self.has(sprite):
+                self.static_layer.add(sprite, order)
+        self.pending_static.clear()
+        self.chunks_drawn = self.static_layer.draw(self.display_surface, self.offset)
+
+        # Orden en Y de los sprites dinámicos. La lista del fotograma anterior ya está casi ordenada,
+        # así que reordenarla es prácticamente lineal.
+        if self.y_sorted_dirty:
+            self.y_sorted = [sprite for sprite in dict.fromkeys(self.y_sorted) if sprite in self.dynamic_sprites]
+            self.y_sorted_dirty = False
+        self.y_sorted.sort(key = self.sort_key)
+        visible_sprites = [sprite for sprite in self.y_sorted if sprite.rect.colliderect(view_rect)]
+        sprite_items = [(sprite.rect.centery, self.dynamic_sprites[sprite], sprite.image, sprite.rect.topleft, sprite.rect)
+                        for sprite in visible_sprites]
+        particle_items = self.particles.draw_items(view_rect)
+
+        # Azulejos estáticos que deben volver a dibujarse delante de algún sprite o partícula. Si un
+        # azulejo se redibuja, también los que a su vez quedan delante de él y lo solapan.
+        occluders = {}
+        stack = [(centery, order, rect) for centery, order, _, _, rect in sprite_items]
+        stack.extend((centery, order, rect) for centery, order, _, _, rect in particle_items)
+        while stack:
+            centery, order, rect = stack.pop()
+            for tile, tile_order in self.static_layer.occluders(rect).items():
+                if tile not in occluders and (tile.rect.centery, tile_order) > (centery, order):
+                    occluders[tile] = tile_order
+                    stack.append((tile.rect.centery, tile_order, tile.rect))
+        occluder_items = sorted((tile.rect.centery, order, tile.image, tile.rect.topleft, tile.rect)
+                                for tile, order in occluders.items())
+
+        # Los órdenes de inserción son únicos, así que las tuplas nunca llegan a comparar imágenes
+        offset_x, offset_y = self.offset
+        self.display_surface.blits(
+            [(image, (left - offset_x, top - offset_y))
+             for _, _, image, (left, top), _ in merge(sprite_items, particle_items, occluder_items)],
+            doreturn = False)
+
+        # Estadísticas de dibujado
+        self.drawn_count = len(sprite_items) + len(particle_items) + len(occluder_items)
+        self.culled_count = len(self.y_sorted) + len(self.particles) - len(sprite_items) - len(particle_items)
+
+    def enemy_update_level(self, player, enemies):
         """
           Actualiza a los enemigos visibles en el nivel, llamando su método de actualización.
+          Los enemigos dormidos se omiten.
 
           Parámetros
           ----------
           player : Player
               El jugador que es usado para actualizar a los enemigos visibles.
+          enemies : pygame.sprite.Group
+              Registro de enemigos del nivel (`Level.enemy_manager`).
 
           """
-        enemy_sprites = []
-        for sprite in self.sprites():
-            if hasattr(sprite, 'sprite_type') and sprite.sprite_type == 'enemy':
-                enemy_sprites.append(sprite)
+        enemy_sprites = [enemy for enemy in enemies if not enemy.asleep]
 
         for enemy in enemy_sprites:
             enemy.enemy_update(player)
\ No newline at end of file
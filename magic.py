@@ -1,6 +1,7 @@
 import pygame
 from settings import *
 from random import randint
+from assets import asset_cache
 
 class MagicExec:
     """
@@ -38,8 +39,8 @@ class MagicExec:
            """
         self.animation_exec = animation_exec
         self.sounds = {
-            'heal': pygame.mixer.Sound('audio/heal.wav'),
-            'flame': pygame.mixer.Sound('audio/Fire.wav')
+            'heal': asset_cache.sound('audio/heal.wav'),
+            'flame': asset_cache.sound('audio/Fire.wav')
         }
     def heal(self, player, strength, cost, groups):
         """
@@ -63,6 +64,7 @@ class MagicExec:
             player.energy -= cost
             if player.health >= player.stats['health']:
                 player.health = player.stats['health']
+            player.dirty.add('health')
             self.animation_exec.create_particles('aura',player.rect.center, groups)
             self.animation_exec.create_particles('heal',player.rect.center + pygame.math.Vector2(0,-65), groups)
 
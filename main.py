@@ -1,32 +1,100 @@
+import argparse
+import os
+import random
+import struct
+import time
+
+import game_time
+import quicksave
+from replay import InputRecorder
 from level import *
 from player import *
+from database.database import DataBase
 from menu.principal_menu import *
 
 class Game:
     """
        Clase principal del juego que inicializa y ejecuta el bucle principal de la aplicación.
 
+       Atributos
+       ---------
+       render_fps : int
+           Límite de fotogramas dibujados por segundo (0 = sin límite).
+       timestep : FixedTimestep
+           Acumulador del bucle de lógica de paso fijo, con sus estadísticas.
+       seed : int or None
+           Semilla de `random` con la que se construyó el nivel.
+       record_path : str or None
+           Archivo donde se guarda la grabación de la partida, si se está grabando.
+       recorder : InputRecorder or None
+           Grabación de la entrada de cada paso de lógica.
+       db : DataBase or None
+           Base de datos de la partida, con escritura diferida, si se juega en una partida guardada.
+       save_id : int or None
+           Partida guardada en la que se juega y se autoguarda.
+       last_autosave : int
+           Tiempo del juego en milisegundos del último autoguardado.
+
        Métodos
        -------
-       __init__():
+       __init__(render_fps, seed, record_path, save_id):
            Inicializa la pantalla, el reloj, el nivel del juego y reproduce la música de fondo.
 
+       autosave():
+           Guarda lo que ha cambiado en la partida si han pasado `AUTOSAVE_INTERVAL` milisegundos.
+
+       quick_save(), quick_load():
+           Guardan y cargan el estado completo del nivel (F5 y F9).
+
        run():
            Ejecuta el bucle principal del juego, procesando eventos, actualizando el nivel y refrescando la pantalla.
     """
-    def __init__(self):
+    def __init__(self, render_fps = RENDER_FPS, seed = None, record_path = None, save_id = None):
         """
               Inicializa la instancia del juego:
               - Configura la ventana principal de pygame.
               - Establece el título del juego.
               - Crea un objeto Level para manejar la lógica del nivel.
               - Reproduce música de fondo en bucle.
+
+              Parámetros
+              ----------
+              render_fps : int, opcional
+                  Límite de fotogramas dibujados por segundo, por defecto `RENDER_FPS`. Con 0 se dibuja
+                  sin límite; la lógica sigue avanzando a `UPDATE_RATE` pasos por segundo.
+              seed : int, opcional
+                  Semilla de `random` para construir el nivel de forma reproducible.
+              record_path : str, opcional
+                  Grabar la partida en este archivo para reproducirla con `replay.py`. Si no se indica
+                  `seed` se elige una al azar.
+              save_id : int, opcional
+                  Jugar en esta partida guardada: se carga si existe y, si no, se crea con un nivel nuevo.
+                  Cada `AUTOSAVE_INTERVAL` milisegundos de juego se guarda lo que ha cambiado.
         """
         pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGTH))
         pygame.display.set_caption('FlowerPower Hardcore')
         self.clock = pygame.time.Clock()
-        self.level = Level()  # Se llama a la función level, por lo que se ejecuta su constructor
+        self.render_fps = render_fps
+        self.timestep = game_time.FixedTimestep()
+        if record_path is not None and seed is None:
+            seed = random.randrange(2 ** 32)
+        if seed is not None:
+            random.seed(seed)
+        self.seed = seed
+        self.record_path = record_path
+        self.recorder = None
+        self.db = None
+        self.save_id = save_id
+        self.last_autosave = 0
+        save = None
+        if save_id is not None:
+            self.db = DataBase(SAVE_DB_PATH, write_behind = True)
+            save = self.db.load_save(save_id)
+        self.level = Level(save = save)  # Se llama a la función level, por lo que se ejecuta su constructor
+        if self.db is not None and save is None:
+            self.level.save_game(self.db, save_id)
+        self.level.perf_overlay.timestep = self.timestep
         self.menu = Menu()   # Inicializamos el menú
         
 
@@ -37,9 +105,19 @@ class Game:
                Ejecuta el bucle principal del juego:
                - Muestra el menú al inicio y espera el resultado.
                - Si el resultado es 'game', comienza el bucle del juego.
-               - Captura y gestiona eventos del teclado y del sistema.
-               - Llama a la función de ejecución del nivel.
-               - Actualiza la pantalla a la velocidad de fotogramas definida.
+               - Captura y gestiona eventos del teclado y del sistema (ESC abre el menú de mejoras, F3
+                 el panel de rendimiento, F5 hace un guardado rápido y F9 lo carga).
+               - Ejecuta la lógica del nivel a paso fijo (`UPDATE_RATE` pasos por segundo, con el reloj
+                 de `game_time` avanzando exactamente un paso cada vez), tantas veces como indique el
+                 tiempo real transcurrido.
+               - Dibuja el nivel una vez por fotograma, limitado a `render_fps`.
+
+               Con el menú de mejoras abierto el nivel se ejecuta como antes, una vez por fotograma, y el
+               reloj avanza con el tiempo real.
+
+               Si se está grabando, antes de cada paso se guardan las teclas pulsadas y si se ha pulsado
+               ESC desde el paso anterior, y tras cada paso el hash del estado cuando toca. La grabación
+               se escribe al cerrar la ventana.
         """
         result = self.menu.run()  # Mostramos el menú y obtenemos el resultado
         if result == 'game':
@@ -47,19 +125,140 @@ class Game:
             main_sound = pygame.mixer.Sound('audio/main.ogg')
             main_sound.play(loops=-1)
             main_sound.set_volume(0.4)
+
+            game_time.start_simulation(pygame.time.get_ticks())
+            self.last_autosave = game_time.get_ticks()
+            if self.record_path is not None:
+                self.recorder = InputRecorder(self.seed, game_time.get_ticks())
+            menu_toggled = False  # ESC pulsado desde el último paso grabado
+            last_time = time.perf_counter()
             while True:
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
+                        if self.recorder is not None:
+                            self.recorder.save(self.record_path)
+                        if self.db is not None:
+                            self.db.close()
                         pygame.quit()
                         sys.exit()
                     if event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_ESCAPE:
                             self.level.toggle_menu()
+                            menu_toggled = not menu_toggled
+                        if event.key == pygame.K_F3:
+                            self.level.toggle_perf_overlay()
+                        if event.key == pygame.K_F5:
+                            self.quick_save()
+                        if event.key == pygame.K_F9:
+                            self.quick_load()
+
+                now = time.perf_counter()
+                elapsed = (now - last_time) * 1000
+                last_time = now
+
                 self.screen.fill(WATER_COLOR)
-                self.level.run()
+                if self.level.game_paused:
+                    menu_toggled = self.record_step(menu_toggled, elapsed)
+                    self.level.run()
+                    game_time.advance(elapsed)
+                    self.checkpoint()
+                else:
+                    for _ in range(self.timestep.add_time(elapsed)):
+                        menu_toggled = self.record_step(menu_toggled, self.timestep.step)
+                        self.level.update()
+                        game_time.advance(self.timestep.step)
+                        self.checkpoint()
+                        self.autosave()
+                    self.level.draw()
                 pygame.display.update()
-                self.clock.tick(FPS)
+                self.clock.tick(self.render_fps)
+
+    def record_step(self, menu_toggled, milliseconds):
+        """
+               Graba la entrada del paso de lógica que se va a ejecutar, si se está grabando.
+
+               Parámetros
+               ----------
+               menu_toggled : bool
+                   Si se ha pulsado ESC (un número impar de veces) desde el último paso grabado.
+               milliseconds : float
+                   Tiempo que avanzará el reloj tras el paso.
+
+               Retorna
+               -------
+               bool
+                   `False`: la pulsación de ESC queda grabada en este paso.
+        """
+        if self.recorder is not None:
+            self.recorder.record(pygame.key.get_pressed(), menu_toggled, milliseconds)
+        return False
+
+    def autosave(self):
+        """
+               Guarda lo que ha cambiado en la partida (`Level.autosave`) si se juega en una partida
+               guardada y han pasado `AUTOSAVE_INTERVAL` milisegundos desde el último autoguardado.
+        """
+        if self.db is None or game_time.get_ticks() - self.last_autosave < AUTOSAVE_INTERVAL:
+            return
+        self.last_autosave = game_time.get_ticks()
+        self.level.autosave(self.db, self.save_id)
+
+    def quick_save(self):
+        """
+               Guarda el estado completo del nivel en `QUICKSAVE_PATH` (ver `quicksave`).
+
+               Retorna
+               -------
+               dict
+                   Resultado, que también queda en `Level.last_quicksave` y se muestra en el panel F3.
+        """
+        start = time.perf_counter()
+        size = quicksave.save(self.level)
+        self.level.last_quicksave = {'action': 'guardado rápido', 'ms': (time.perf_counter() - start) * 1000,
+                                     'bytes': size, 'error': None}
+        return self.level.last_quicksave
+
+    def quick_load(self):
+        """
+               Restaura el estado del nivel desde `QUICKSAVE_PATH`. No se permite mientras se graba,
+               porque la grabación ya no se podría reproducir. Si el archivo no se puede leer o está
+               dañado el nivel sigue como estaba y el error queda en el resultado.
+
+               Retorna
+               -------
+               dict
+                   Resultado, que también queda en `Level.last_quicksave` y se muestra en el panel F3.
+        """
+        error = None
+        start = time.perf_counter()
+        if self.recorder is not None:
+            error = 'no se puede cargar mientras se graba la partida'
+        elif not os.path.exists(QUICKSAVE_PATH):
+            error = f'no hay guardado rápido en {QUICKSAVE_PATH}'
+        else:
+            try:
+                quicksave.load(self.level)
+            except (ValueError, struct.error, OSError) as exception:
+                error = str(exception)
+        self.level.last_quicksave = {'action': 'carga rápida', 'ms': (time.perf_counter() - start) * 1000,
+                                     'bytes': None, 'error': error}
+        return self.level.last_quicksave
+
+    def checkpoint(self):
+        if self.recorder is not None:
+            self.recorder.checkpoint(self.level)
 
 if __name__ == '__main__':
-    game = Game()
+    parser = argparse.ArgumentParser(description = 'FlowerPower Hardcore')
+    parser.add_argument('--uncapped', action = 'store_true', help = 'dibujar sin límite de fotogramas por segundo')
+    parser.add_argument('--record', metavar = 'PATH', help = 'grabar la partida para reproducirla con replay.py')
+    parser.add_argument('--seed', type = int, help = 'semilla de random para construir el nivel')
+    parser.add_argument('--save', type = int, metavar = 'SAVE_ID',
+                        help = f'partida guardada en {SAVE_DB_PATH} en la que jugar: se carga si existe y se autoguarda')
+    args = parser.parse_args()
+    if args.save is not None and args.record is not None:
+        parser.error('las grabaciones empiezan siempre en un nivel nuevo: --record no se puede usar con --save')
+
+    game = Game(render_fps = 0 if args.uncapped else RENDER_FPS, seed = args.seed, record_path = args.record,
+                save_id = args.save)
     game.run()
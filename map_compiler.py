@@ -0,0 +1,198 @@
+"""
+Compilador del mapa a un formato binario compacto.
+
+Las capas `map/map_*.csv` que usa `Level.create_map` se convierten en un único archivo `map/map.bin`
+con enteros de 16 bits, que se lee de una vez con `array.frombytes` en lugar de interpretar texto en
+cada arranque. El archivo guarda el tamaño y la fecha de modificación de cada CSV: si alguno cambia,
+se vuelve a compilar automáticamente.
+
+Formato (little-endian):
+
+    cabecera   : 'FPMAP', versión (H), número de capas (H), filas (I), columnas (I)
+    por capa   : longitud del nombre (B), nombre, tamaño del CSV (Q), mtime del CSV en ns (Q)
+    datos      : filas * columnas enteros int16 por capa, en el mismo orden
+
+Uso (desde la raíz del proyecto):
+
+    python map_compiler.py [carpeta]
+"""
+import os
+import struct
+import sys
+from array import array
+
+from support import import_csv_layout
+
+MAGIC = b'FPMAP'
+VERSION = 1
+HEADER = struct.Struct('<5sHHII')
+LAYER_HEADER = struct.Struct('<QQ')
+COMPILED_NAME = 'map.bin'
+
+# Capa de Level.create_map -> archivo CSV de origen
+LAYER_FILES = {
+    'boundary': 'map_FloorBlocks.csv',
+    'grass': 'map_Grass.csv',
+    'object': 'map_Objects.csv',
+    'entities': 'map_Entities.csv',
+}
+
+
+def source_signature(folder):
+    """
+       Devuelve (tamaño, mtime en ns) de cada CSV de origen, en el orden de `LAYER_FILES`.
+       """
+    signature = []
+    for file_name in LAYER_FILES.values():
+        stat = os.stat(os.path.join(folder, file_name))
+        signature.append((stat.st_size, stat.st_mtime_ns))
+    return signature
+
+
+def compile_map(folder = 'map', output = None):
+    """
+       Compila las capas CSV del mapa en un archivo binario.
+
+       Parámetros
+       ----------
+       folder : str, opcional
+           Carpeta con los archivos `map_*.csv`, por defecto 'map'.
+       output : str, opcional
+           Ruta del archivo binario, por defecto `<folder>/map.bin`.
+
+       Retorna
+       -------
+       dict
+           Capas del mapa {'boundary', 'grass', 'object', 'entities'} como listas de filas de enteros.
+       """
+    output = output or os.path.join(folder, COMPILED_NAME)
+    signature = source_signature(folder)
+    layouts = {}
+    for style, file_name in LAYER_FILES.items():
+        layouts[style] = [array('h', map(int, row)) for row in import_csv_layout(os.path.join(folder, file_name))]
+
+    rows = len(layouts['boundary'])
+    cols = len(layouts['boundary'][0])
+    for style, layout in layouts.items():
+        if len(layout) != rows or any(len(row) != cols for row in layout):
+            raise ValueError(f'La capa {style} no mide {rows}x{cols}')
+
+    data = bytearray(HEADER.pack(MAGIC, VERSION, len(layouts), rows, cols))
+    for (style, layout), (size, mtime) in zip(layouts.items(), signature):
+        name = style.encode()
+        data += struct.pack('<B', len(name)) + name + LAYER_HEADER.pack(size, mtime)
+    for layout in layouts.values():
+        cells = array('h')
+        for row in layout:
+            cells.extend(row)
+        if sys.byteorder != 'little':
+            cells.byteswap()
+        data += cells.tobytes()
+
+    # Se escribe en un archivo temporal y se reemplaza el anterior, para que un fallo a mitad de la
+    # escritura no deje un map.bin truncado
+    temporary = output + '.tmp'
+    try:
+        with open(temporary, 'wb') as compiled:
+            compiled.write(data)
+        os.replace(temporary, output)
+    except OSError:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return layouts
+
+
+def load_compiled_map(path, signature = None):
+    """
+       Lee un mapa compilado.
+
+       Parámetros
+       ----------
+       path : str
+           Ruta del archivo binario.
+       signature : list, opcional
+           Firma actual de los CSV. Si no coincide con la guardada se devuelve `None`.
+
+       Retorna
+       -------
+       dict or None
+           Capas del mapa como listas de filas de enteros, o `None` si el archivo no es válido o
+           está desactualizado.
+       """
+    with open(path, 'rb') as compiled:
+        data = compiled.read()
+
+    # Un archivo truncado o dañado se trata como desactualizado, para que se vuelva a compilar
+    try:
+        magic, version, layer_count, rows, cols = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            return None
+
+        offset = HEADER.size
+        names = []
+        stored_signature = []
+        for _ in range(layer_count):
+            name_length = data[offset]
+            names.append(data[offset + 1:offset + 1 + name_length].decode())
+            offset += 1 + name_length
+            stored_signature.append(LAYER_HEADER.unpack_from(data, offset))
+            offset += LAYER_HEADER.size
+    except (IndexError, struct.error, UnicodeDecodeError):
+        return None
+    if set(names) != set(LAYER_FILES):
+        return None
+    if signature is not None and stored_signature != [tuple(item) for item in signature]:
+        return None
+
+    layer_bytes = rows * cols * 2
+    if len(data) != offset + layer_count * layer_bytes:
+        return None
+
+    layouts = {}
+    for name in names:
+        cells = array('h')
+        cells.frombytes(data[offset:offset + layer_bytes])
+        if sys.byteorder != 'little':
+            cells.byteswap()
+        layouts[name] = [cells[row * cols:(row + 1) * cols] for row in range(rows)]
+        offset += layer_bytes
+    return layouts
+
+
+def import_map_layouts(folder = 'map'):
+    """
+    Importa las capas del mapa que usa `Level.create_map`.
+
+    Usa el mapa compilado si existe y está al día; si no, lo vuelve a compilar desde los CSV. Si
+    no se puede escribir el archivo compilado se siguen usando los CSV.
+
+    Parámetros
+    ----------
+    folder : str, opcional
+        Carpeta con los archivos `map_*.csv`, por defecto 'map'.
+
+    Retorna
+    -------
+    dict
+        Diccionario {'boundary', 'grass', 'object', 'entities'} con cada capa como lista de filas de
+        enteros (-1 indica casilla vacía).
+    """
+    path = os.path.join(folder, COMPILED_NAME)
+    signature = source_signature(folder)
+    if os.path.exists(path):
+        layouts = load_compiled_map(path, signature)
+        if layouts is not None:
+            return layouts
+    try:
+        return compile_map(folder, path)
+    except OSError:
+        return {style: [array('h', map(int, row)) for row in import_csv_layout(os.path.join(folder, file_name))]
+                for style, file_name in LAYER_FILES.items()}
+
+
+if __name__ == '__main__':
+    folder = sys.argv[1] if len(sys.argv) > 1 else 'map'
+    layouts = compile_map(folder)
+    print(f'{os.path.join(folder, COMPILED_NAME)}: {len(layouts)} capas de '
+          f'{len(layouts["boundary"])}x{len(layouts["boundary"][0])} casillas')
@@ -1,6 +1,8 @@
 import pygame
 import sys
 
+from assets import text_cache
+
 
 class Menu:
     """
@@ -11,10 +13,16 @@ class Menu:
     el volumen de la música de fondo.
     """
 
-    def __init__(self):
+    def __init__(self, music_path="menu/musica_fondo.wav"):
         """
         Inicializa el menú principal, configurando Pygame, la pantalla, colores, fuentes,
         fondos, música y elementos del menú como botones y el personaje animado.
+
+        Todo lo que no cambia de un fotograma a otro se prepara aquí una sola vez: los botones en sus
+        dos estados, la sombra del personaje y los textos de cada pantalla.
+
+        Args:
+            music_path (str): Ruta de la música de fondo.
         """
         pygame.init()
         pygame.mixer.init()
@@ -45,16 +53,21 @@ class Menu:
         self.fade_start_time = None
         self.fading = False
         self.fade_alpha = 0
+        # Transición día/noche: la mezcla de los dos fondos se cuantiza en fade_steps niveles y cada
+        # nivel se compone una sola vez en fade_surface
+        self.fade_steps = 32
+        self.fade_surface = pygame.Surface((self.SCREEN_WIDTH, self.SCREEN_HEIGHT)).convert()
+        self.fade_key = None
 
         # Música
-        self.background_music = pygame.mixer.Sound("menu/musica_fondo.wav")
+        self.background_music = pygame.mixer.Sound(music_path)
         self.button_sound = pygame.mixer.Sound("menu/musica_boton.wav")
         self.background_music.play(-1)
         self.background_music.set_volume(0.2)
 
         # Título
-        self.title_text = self.title_font.render("FlowerPower Hardcore", True, self.LIGHT_BLUE)
-        self.title_shadow = self.title_font.render("FlowerPower Hardcore", True, self.BLACK)
+        self.title_text = text_cache.render(self.title_font, "FlowerPower Hardcore", True, self.LIGHT_BLUE)
+        self.title_shadow = text_cache.render(self.title_font, "FlowerPower Hardcore", True, self.BLACK)
         self.title_rect = self.title_text.get_rect(center=(self.SCREEN_WIDTH // 2, int(self.SCREEN_HEIGHT * 0.15)))
         self.title_shadow_rect = self.title_shadow.get_rect(
             center=(self.SCREEN_WIDTH // 2 + 5, int(self.SCREEN_HEIGHT * 0.15 + 5)))
@@ -84,6 +97,35 @@ class Menu:
         self.character_phase = "normal"
         self.wait_counter = 0
 
+        # Sombra del personaje
+        self.shadow_surface = pygame.Surface((self.character_width * 0.6, 10), pygame.SRCALPHA)
+        pygame.draw.ellipse(self.shadow_surface, (0, 0, 0), self.shadow_surface.get_rect())
+
+        # Textos de cada pantalla, ya colocados: cada fotograma es una sola llamada a blits
+        self.title_blits = [(self.title_shadow, self.title_shadow_rect), (self.title_text, self.title_rect),
+                            (text_cache.render(self.button_font, "Volumen", True, self.WHITE), (20, self.SCREEN_HEIGHT - 70))]
+        self.screen_lines = {
+            # Lista de controles con descripción
+            "controls": [
+                "W: Mover arriba",
+                "S: Mover abajo",
+                "A: Mover izquierda",
+                "D: Mover derecha",
+                "ESPACIO: Atacar",
+                "R: Cambio de hechizo",
+                "C: Cambio de arma",
+                "ESC: Menu de estadísticas",
+                "CNTRL IZQ: Realizar hechizo"
+            ],
+            # Lista de nombres para los créditos
+            "credits": ["Carlos Crespo Gutiérrez", "Xavier Fuentes Navarro", "Alba García Calvete",
+                        "Victoria Pérez Bernabeu", "Hugo López de la Rosa"],
+        }
+        self.screen_texts = {screen: self._text_block(lines) for screen, lines in self.screen_lines.items()}
+
+        # Si es False el último fotograma dibujado sigue siendo válido y no hace falta redibujar
+        self.needs_redraw = True
+
         self.Slider = self._create_slider_class()
         self.Button = self._create_button_class()
 
@@ -128,6 +170,28 @@ class Menu:
                 self.color = color
                 self.action = action
                 self.hovered = False
+                # Botón ya dibujado en sus dos estados: normal y con el mouse encima (ampliado)
+                self.states = {hovered: self.render(1.2 if hovered else 1.0) for hovered in (False, True)}
+
+            def render(self, scale):
+                """
+                Dibuja el botón con la escala indicada en una superficie propia.
+
+                Args:
+                    scale (float): Escala del botón y de su texto.
+
+                Returns:
+                    tuple: (superficie, rectángulo en pantalla) del botón.
+                """
+                rect = self.base_rect.inflate(scale * self.base_rect.width - self.base_rect.width,
+                                              scale * self.base_rect.height - self.base_rect.height)
+                surface = pygame.Surface(rect.size, pygame.SRCALPHA)
+                pygame.draw.rect(surface, self.color, surface.get_rect(), border_radius=15)
+                text_surf = text_cache.render(menu.button_font, self.text, True, menu.WHITE)
+                scaled_text = pygame.transform.scale(text_surf, (
+                int(text_surf.get_width() * scale), int(text_surf.get_height() * scale)))
+                surface.blit(scaled_text, scaled_text.get_rect(center=surface.get_rect().center))
+                return surface, rect
 
             def draw(self, screen):
                 """
@@ -136,16 +200,8 @@ class Menu:
                 Args:
                     screen (pygame.Surface): Superficie donde dibujar el botón.
                 """
-                scale = 1.2 if self.hovered else 1.0
-                new_rect = self.base_rect.inflate(scale * self.base_rect.width - self.base_rect.width,
-                                                  scale * self.base_rect.height - self.base_rect.height)
-                self.rect = new_rect
-                pygame.draw.rect(screen, self.color, self.rect, border_radius=15)
-                text_surf = menu.button_font.render(self.text, True, menu.WHITE)
-                scaled_text = pygame.transform.scale(text_surf, (
-                int(text_surf.get_width() * scale), int(text_surf.get_height() * scale)))
-                text_rect = scaled_text.get_rect(center=self.rect.center)
-                screen.blit(scaled_text, text_rect)
+                surface, self.rect = self.states[self.hovered]
+                screen.blit(surface, self.rect)
 
             def check_hover(self, pos):
                 """
@@ -154,7 +210,10 @@ class Menu:
                 Args:
                     pos (tuple): Posición del mouse (x, y).
                 """
-                self.hovered = self.rect.collidepoint(pos)
+                hovered = bool(self.rect.collidepoint(pos))
+                if hovered != self.hovered:
+                    self.hovered = hovered
+                    menu.needs_redraw = True
 
             def click(self):
                 """
@@ -223,6 +282,7 @@ class Menu:
                                                  self.rect.x + self.rect.width - self.handle_rect.width))
                     self.value = (new_x - self.rect.x) / (self.rect.width - self.handle_rect.width)
                     menu.background_music.set_volume(self.value)
+                    menu.needs_redraw = True
 
         return Slider
 
@@ -234,9 +294,30 @@ class Menu:
             x (int): Posición x del personaje.
             y (int): Posición y del personaje.
         """
-        shadow_surface = pygame.Surface((self.character_width * 0.6, 10), pygame.SRCALPHA)
-        pygame.draw.ellipse(shadow_surface, (0, 0, 0), shadow_surface.get_rect())
-        self.screen.blit(shadow_surface, (x + (self.character_width * 0.2), self.ground_y + self.character_height - 10))
+        self.screen.blit(self.shadow_surface, (x + (self.character_width * 0.2), self.ground_y + self.character_height - 10))
+
+    def _text_block(self, lines):
+        """
+        Coloca las líneas de texto de una pantalla (controles o créditos), centradas y seguidas del
+        texto para volver.
+
+        Args:
+            lines (list): Líneas de texto.
+
+        Returns:
+            list: Pares (superficie, posición) listos para `Surface.blits`.
+        """
+        # Calcular la posición inicial para centrar las líneas verticalmente
+        total_height = len(lines) * 40  # 40 píxeles de separación entre líneas
+        start_y = (self.SCREEN_HEIGHT - total_height) // 2
+        blits = []
+        for i, line in enumerate(lines):
+            text = text_cache.render(self.button_font, line, True, self.BLACK)
+            blits.append((text, (self.SCREEN_WIDTH // 2 - text.get_width() // 2, start_y + i * 40)))
+        # Texto de "Volver"
+        back = text_cache.render(self.button_font, "Presiona ESC para volver", True, self.BLACK)
+        blits.append((back, (self.SCREEN_WIDTH // 2 - back.get_width() // 2, start_y + len(lines) * 40 + 50)))
+        return blits
 
     def start_game(self):
         """
@@ -266,6 +347,207 @@ class Menu:
         pygame.quit()
         sys.exit()
 
+    def update_fade(self, current_time):
+        """
+        Avanza la transición entre el fondo de día y el de noche.
+
+        Args:
+            current_time (int): Tiempo actual en milisegundos.
+        """
+        if not self.fading and current_time - self.last_switch_time >= self.background_switch_time:
+            self.fading = True
+            self.fade_start_time = current_time
+
+        if self.fading:
+            elapsed_time = current_time - self.fade_start_time
+            fade_progress = min(elapsed_time / self.fade_duration, 1.0)
+            self.fade_alpha = int(fade_progress * 255)
+            if fade_progress >= 1.0:
+                self.fading = False
+                self.last_switch_time = current_time
+                self.is_day = not self.is_day
+                self.needs_redraw = True
+            elif self.fade_key != self.current_fade_key():
+                # Solo cambia el fondo cuando la opacidad pasa a otro nivel; el resto de fotogramas
+                # de la transición redibujan únicamente el personaje
+                self.needs_redraw = True
+
+    def current_fade_key(self):
+        """
+        Devuelve el nivel de la transición que corresponde a la opacidad actual.
+
+        Returns:
+            tuple: (es de día, nivel de opacidad entre 0 y fade_steps - 1).
+        """
+        return self.is_day, self.fade_alpha * self.fade_steps // 256
+
+    def background(self):
+        """
+        Devuelve el fondo del fotograma actual.
+
+        Durante la transición la opacidad del fondo entrante se cuantiza en `fade_steps` niveles y
+        la mezcla de cada nivel se compone una sola vez, así que la mayoría de los fotogramas de la
+        transición solo copian el fondo ya mezclado.
+
+        Returns:
+            pygame.Surface: Fondo a dibujar.
+        """
+        current, incoming = ((self.background_day, self.background_night) if self.is_day
+                             else (self.background_night, self.background_day))
+        if not self.fading:
+            return current
+
+        if self.fade_key != self.current_fade_key():
+            self.fade_key = self.current_fade_key()
+            level = self.fade_key[1]
+            self.fade_surface.blit(current, (0, 0))
+            incoming.set_alpha(level * 255 // (self.fade_steps - 1))
+            self.fade_surface.blit(incoming, (0, 0))
+            incoming.set_alpha(None)
+        return self.fade_surface
+
+    def handle_event(self, event):
+        """
+        Procesa un evento del menú.
+
+        Args:
+            event (pygame.event.Event): Evento de Pygame.
+
+        Returns:
+            str: 'game' si se ha pulsado el botón de jugar, si no None.
+        """
+        if event.type == pygame.QUIT:
+            self.quit_game()
+        elif event.type == pygame.MOUSEMOTION:
+            for button in self.buttons:
+                button.check_hover(event.pos)
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            for button in self.buttons:
+                if button.rect.collidepoint(event.pos):
+                    result = button.click()
+                    self.needs_redraw = True
+                    if result == 'game':
+                        self.background_music.stop()
+                        return 'game'
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            self.current_screen = "menu" if self.current_screen != "menu" else "exit"
+            if self.current_screen == "exit":
+                self.quit_game()
+            self.needs_redraw = True
+        self.slider.handle_event(event)
+        return None
+
+    def update_character(self):
+        """
+        Avanza la animación del personaje que cruza la pantalla saltando.
+        """
+        self.character_x += self.character_speed
+        if self.character_x > self.SCREEN_WIDTH:
+            self.character_x = -self.character_width
+            self.character_y = self.ground_y
+            self.jump_counter = 0
+            self.jumping = True
+
+        if self.jumping:
+            self.jump_counter += 1
+            if self.jump_counter <= self.jump_max // 3:
+                self.character_y -= self.jump_height / (self.jump_max // 3)
+                self.character_phase = "subiendo"
+            elif self.jump_counter <= 2 * (self.jump_max // 3):
+                self.character_phase = "arriba"
+            elif self.jump_counter < self.jump_max:
+                self.character_y += self.jump_height / (self.jump_max // 3)
+                self.character_phase = "bajando"
+            else:
+                self.jumping = False
+                self.jump_counter = 0
+                self.character_y = self.ground_y
+                self.character_phase = "normal"
+        else:
+            if self.wait_counter < 30:
+                self.wait_counter += 1
+                self.character_phase = "normal"
+            else:
+                self.jumping = True
+                self.wait_counter = 0
+
+    def character_area(self):
+        """
+        Devuelve el rectángulo de pantalla que ocupan el personaje y su sombra.
+
+        Returns:
+            pygame.Rect: Área del personaje, con un píxel de margen por las posiciones no enteras.
+        """
+        area = pygame.Rect(self.character_x, self.character_y, self.character_width, self.character_height)
+        shadow_rect = self.shadow_surface.get_rect(topleft=(self.character_x + (self.character_width * 0.2),
+                                                            self.ground_y + self.character_height - 10))
+        return area.union(shadow_rect).inflate(2, 2)
+
+    def draw(self):
+        """
+        Dibuja el fotograma actual: fondo y contenido de la pantalla activa.
+        """
+        self.screen.blit(self.background(), (0, 0))
+        if self.current_screen == "menu":
+            if self.character_phase == "subiendo":
+                img = self.img_izquierda
+            elif self.character_phase == "arriba":
+                img = self.img_girado
+            elif self.character_phase == "bajando":
+                img = self.img_derecha
+            else:
+                img = self.img_normal
+
+            self.draw_shadow(self.character_x, self.character_y)
+            self.screen.blit(img, (self.character_x, self.character_y))
+            self.screen.blits(self.title_blits[:2], doreturn=False)
+            for button in self.buttons:
+                button.draw(self.screen)
+            self.slider.draw(self.screen)
+            self.screen.blits(self.title_blits[2:], doreturn=False)
+        elif self.current_screen in self.screen_texts:
+            self.screen.blits(self.screen_texts[self.current_screen], doreturn=False)
+
+    def step(self, current_time, events):
+        """
+        Ejecuta un fotograma del menú: transición del fondo, eventos, animación y dibujado.
+
+        Solo se dibuja lo que ha cambiado. Si no ha cambiado nada (pantallas de controles o créditos
+        sin transición ni eventos) no se dibuja. Si solo se ha movido el personaje, se redibuja
+        únicamente la zona que ocupaba y la que ocupa ahora, recortando el dibujado a esa zona. El
+        resto de casos (cambio de nivel de la transición, eventos, cambio de pantalla) dibujan la
+        pantalla completa.
+
+        Args:
+            current_time (int): Tiempo actual en milisegundos.
+            events (list): Eventos de Pygame del fotograma.
+
+        Returns:
+            tuple: (resultado, zonas). El resultado es 'game' si se inicia el juego, si no None.
+            Zonas es la lista de rectángulos de pantalla que han cambiado, o None si ha cambiado
+            la pantalla completa.
+        """
+        self.update_fade(current_time)
+        for event in events:
+            if self.handle_event(event) == 'game':
+                return 'game', []
+
+        dirty = []
+        if self.current_screen == "menu":
+            old_area = self.character_area()
+            self.update_character()
+            dirty = [old_area.union(self.character_area())]
+
+        if self.needs_redraw:
+            self.draw()
+            self.needs_redraw = False
+            return None, None
+        if dirty:
+            self.screen.set_clip(dirty[0])
+            self.draw()
+            self.screen.set_clip(None)
+        return None, dirty
+
     def run(self):
         """
         Ejecuta el bucle principal del menú, manejando eventos, animaciones y transiciones.
@@ -274,145 +556,15 @@ class Menu:
             str: Resultado del menú ('game' si se inicia el juego).
         """
         clock = pygame.time.Clock()
+        self.needs_redraw = True
         while True:
-            self.screen.fill(self.BLACK)
-            current_time = pygame.time.get_ticks()
-
-            if not self.fading and current_time - self.last_switch_time >= self.background_switch_time:
-                self.fading = True
-                self.fade_start_time = current_time
-
-            if self.fading:
-                elapsed_time = current_time - self.fade_start_time
-                fade_progress = min(elapsed_time / self.fade_duration, 1.0)
-                self.fade_alpha = int(fade_progress * 255)
-                if fade_progress >= 1.0:
-                    self.fading = False
-                    self.last_switch_time = current_time
-                    self.is_day = not self.is_day
-
-            # Dibujar fondo
-            if self.is_day:
-                self.screen.blit(self.background_day, (0, 0))
-                if self.fading:
-                    self.background_night.set_alpha(self.fade_alpha)
-                    self.screen.blit(self.background_night, (0, 0))
-            else:
-                self.screen.blit(self.background_night, (0, 0))
-                if self.fading:
-                    self.background_day.set_alpha(self.fade_alpha)
-                    self.screen.blit(self.background_day, (0, 0))
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.quit_game()
-                elif event.type == pygame.MOUSEMOTION:
-                    for button in self.buttons:
-                        button.check_hover(event.pos)
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    for button in self.buttons:
-                        if button.rect.collidepoint(event.pos):
-                            result = button.click()
-                            if result == 'game':
-                                self.background_music.stop()
-                                return 'game'
-                elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                    self.current_screen = "menu" if self.current_screen != "menu" else "exit"
-                    if self.current_screen == "exit":
-                        self.quit_game()
-                self.slider.handle_event(event)
-
-            if self.current_screen == "menu":
-                self.character_x += self.character_speed
-                if self.character_x > self.SCREEN_WIDTH:
-                    self.character_x = -self.character_width
-                    self.character_y = self.ground_y
-                    self.jump_counter = 0
-                    self.jumping = True
-
-                if self.jumping:
-                    self.jump_counter += 1
-                    if self.jump_counter <= self.jump_max // 3:
-                        self.character_y -= self.jump_height / (self.jump_max // 3)
-                        self.character_phase = "subiendo"
-                    elif self.jump_counter <= 2 * (self.jump_max // 3):
-                        self.character_phase = "arriba"
-                    elif self.jump_counter < self.jump_max:
-                        self.character_y += self.jump_height / (self.jump_max // 3)
-                        self.character_phase = "bajando"
-                    else:
-                        self.jumping = False
-                        self.jump_counter = 0
-                        self.character_y = self.ground_y
-                        self.character_phase = "normal"
-                else:
-                    if self.wait_counter < 30:
-                        self.wait_counter += 1
-                        self.character_phase = "normal"
-                    else:
-                        self.jumping = True
-                        self.wait_counter = 0
-
-                if self.character_phase == "subiendo":
-                    img = self.img_izquierda
-                elif self.character_phase == "arriba":
-                    img = self.img_girado
-                elif self.character_phase == "bajando":
-                    img = self.img_derecha
-                else:
-                    img = self.img_normal
-
-                self.draw_shadow(self.character_x, self.character_y)
-                self.screen.blit(img, (self.character_x, self.character_y))
-                self.screen.blit(self.title_shadow, self.title_shadow_rect)
-                self.screen.blit(self.title_text, self.title_rect)
-                for button in self.buttons:
-                    button.draw(self.screen)
-                self.slider.draw(self.screen)
-                volume_text = self.button_font.render("Volumen", True, self.WHITE)
-                self.screen.blit(volume_text, (20, self.SCREEN_HEIGHT - 70))
-
-            elif self.current_screen == "controls":
-                # Lista de controles con descripción
-                controls_texts = [
-                    "W: Mover arriba",
-                    "S: Mover abajo",
-                    "A: Mover izquierda",
-                    "D: Mover derecha",
-                    "ESPACIO: Atacar",
-                    "R: Cambio de hechizo",
-                    "C: Cambio de arma",
-                    "ESC: Menu de estadísticas",
-                    "CNTRL IZQ: Realizar hechizo"
-                ]
-                # Calcular la posición inicial para centrar los controles verticalmente
-                total_height = len(controls_texts) * 40  # 40 píxeles de separación entre líneas
-                start_y = (self.SCREEN_HEIGHT - total_height) // 2
-                # Dibujar cada línea de control
-                for i, control_text in enumerate(controls_texts):
-                    text = self.button_font.render(control_text, True, self.BLACK)
-                    self.screen.blit(text, (self.SCREEN_WIDTH // 2 - text.get_width() // 2, start_y + i * 40))
-                # Texto de "Volver"
-                back = self.button_font.render("Presiona ESC para volver", True, self.BLACK)
-                self.screen.blit(back, (
-                self.SCREEN_WIDTH // 2 - back.get_width() // 2, start_y + len(controls_texts) * 40 + 50))
-
-            elif self.current_screen == "credits":
-                # Lista de nombres para los créditos
-                credits_names = ["Carlos Crespo Gutiérrez", "Xavier Fuentes Navarro", "Alba García Calvete", "Victoria Pérez Bernabeu", "Hugo López de la Rosa"]
-                # Calcular la posición inicial para centrar los nombres verticalmente
-                total_height = len(credits_names) * 40  # 40 píxeles de separación entre líneas
-                start_y = (self.SCREEN_HEIGHT - total_height) // 2
-                # Dibujar cada nombre
-                for i, name in enumerate(credits_names):
-                    text = self.button_font.render(name, True, self.BLACK)
-                    self.screen.blit(text, (self.SCREEN_WIDTH // 2 - text.get_width() // 2, start_y + i * 40))
-                # Texto de "Volver"
-                back = self.button_font.render("Presiona ESC para volver", True, self.BLACK)
-                self.screen.blit(back, (
-                self.SCREEN_WIDTH // 2 - back.get_width() // 2, start_y + len(credits_names) * 40 + 50))
-
-            pygame.display.flip()
+            result, dirty = self.step(pygame.time.get_ticks(), pygame.event.get())
+            if result == 'game':
+                return 'game'
+            if dirty is None:
+                pygame.display.flip()
+            elif dirty:
+                pygame.display.update(dirty)
             clock.tick(60)
 
 
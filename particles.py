@@ -1,6 +1,13 @@
 import pygame
-from support import import_folder
+from settings import *
+from assets import asset_cache
 from random import choice
+from array import array
+from bisect import insort
+from heapq import heappush, heappop
+
+# Efectos que forman parte de un ataque: siguen siendo sprites para la detección de impactos
+ATTACK_PARTICLES = ('flame',)
 
 class AnimationExec:
     """
@@ -13,58 +20,73 @@ class AnimationExec:
         ----------
         frames : dict
             Diccionario que almacena las animaciones de las partículas, categorizadas por tipo (magia, ataques, muerte de enemigos, etc.).
+        pool : ParticlePool
+            Pool de efectos de partículas que son sprites (los de `ATTACK_PARTICLES`).
+        system : ParticleSystem or None
+            Sistema por lotes que dibuja el resto de efectos sin crear sprites.
 
         Métodos
         -------
         invert_images(frames):
             Invierte las imágenes de una animación en torno al eje X.
+        spawn(effect_type, pos, animation_frames, groups):
+            Crea un efecto en el sistema por lotes o como sprite.
         create_grass_particles(pos, groups):
             Crea partículas de hierba en la posición especificada.
         create_particles(attack_type, pos, groups):
             Crea partículas para un tipo de ataque específico en la posición indicada.
         """
-    def __init__(self):
+    def __init__(self, pool_size = PARTICLE_POOL_SIZE, system = None):
         """
             Inicializa la clase `AnimationExec` y carga las animaciones de partículas para diferentes efectos.
 
             Carga una serie de animaciones de partículas (como fuego, aura, curación, etc.) y las almacena en un diccionario
             para su uso posterior en el juego.
 
+            Parámetros
+            ----------
+            pool_size : int, opcional
+                Máximo de efectos de partículas que son sprites activos a la vez, por defecto `PARTICLE_POOL_SIZE`.
+            system : ParticleSystem, opcional
+                Sistema de partículas por lotes. Si no se indica, todos los efectos son sprites.
+
             """
+        self.system = system
+        self.pool = ParticlePool(pool_size)
 
         self.frames = {
             # Magia
-            'flame': import_folder('./graphics/particles/flame/frames'),
-            'aura': import_folder('./graphics/particles/aura'),
-            'heal': import_folder('./graphics/particles/heal/frames'),
+            'flame': asset_cache.folder('./graphics/particles/flame/frames'),
+            'aura': asset_cache.folder('./graphics/particles/aura'),
+            'heal': asset_cache.folder('./graphics/particles/heal/frames'),
 
             # Ataques
-            'claw': import_folder('./graphics/particles/claw'),
-            'slash': import_folder('./graphics/particles/slash'),
-            'sparkle': import_folder('./graphics/particles/sparkle'),
-            'leaf_attack': import_folder('./graphics/particles/leaf_attack'),
-            'thunder': import_folder('./graphics/particles/thunder'),
+            'claw': asset_cache.folder('./graphics/particles/claw'),
+            'slash': asset_cache.folder('./graphics/particles/slash'),
+            'sparkle': asset_cache.folder('./graphics/particles/sparkle'),
+            'leaf_attack': asset_cache.folder('./graphics/particles/leaf_attack'),
+            'thunder': asset_cache.folder('./graphics/particles/thunder'),
 
             # Muerte de enemigos
-            'squid': import_folder('./graphics/particles/smoke_orange'),
-            'raccoon': import_folder('./graphics/particles/raccoon'),
-            'spirit': import_folder('./graphics/particles/nova'),
-            'bamboo': import_folder('./graphics/particles/bamboo'),
+            'squid': asset_cache.folder('./graphics/particles/smoke_orange'),
+            'raccoon': asset_cache.folder('./graphics/particles/raccoon'),
+            'spirit': asset_cache.folder('./graphics/particles/nova'),
+            'bamboo': asset_cache.folder('./graphics/particles/bamboo'),
 
             # Hojas
             'leaf': (
-                import_folder('./graphics/particles/leaf1'),
-                import_folder('./graphics/particles/leaf2'),
-                import_folder('./graphics/particles/leaf3'),
-                import_folder('./graphics/particles/leaf4'),
-                import_folder('./graphics/particles/leaf5'),
-                import_folder('./graphics/particles/leaf6'),
-                self.invert_images(import_folder('./graphics/particles/leaf1')),
-                self.invert_images(import_folder('./graphics/particles/leaf2')),
-                self.invert_images(import_folder('./graphics/particles/leaf3')),
-                self.invert_images(import_folder('./graphics/particles/leaf4')),
-                self.invert_images(import_folder('./graphics/particles/leaf5')),
-                self.invert_images(import_folder('./graphics/particles/leaf6'))
+                asset_cache.folder('./graphics/particles/leaf1'),
+                asset_cache.folder('./graphics/particles/leaf2'),
+                asset_cache.folder('./graphics/particles/leaf3'),
+                asset_cache.folder('./graphics/particles/leaf4'),
+                asset_cache.folder('./graphics/particles/leaf5'),
+                asset_cache.folder('./graphics/particles/leaf6'),
+                self.invert_images(asset_cache.folder('./graphics/particles/leaf1')),
+                self.invert_images(asset_cache.folder('./graphics/particles/leaf2')),
+                self.invert_images(asset_cache.folder('./graphics/particles/leaf3')),
+                self.invert_images(asset_cache.folder('./graphics/particles/leaf4')),
+                self.invert_images(asset_cache.folder('./graphics/particles/leaf5')),
+                self.invert_images(asset_cache.folder('./graphics/particles/leaf6'))
             )
         }
 
@@ -104,11 +126,12 @@ class AnimationExec:
            pos : tuple
                Coordenadas (x, y) donde se generarán las partículas.
            groups : list
-               Lista de grupos de sprites donde se agregarán las partículas generadas.
+               Lista de grupos de sprites donde se agregarán las partículas generadas. Solo se usa si
+               no hay sistema de partículas por lotes.
 
            """
         animation_frames = choice(self.frames['leaf'])
-        ParticleEffect(pos, animation_frames, groups)
+        self.spawn('leaf', pos, animation_frames, groups)
 
     def create_particles(self, attack_type, pos, groups):
         """
@@ -124,21 +147,435 @@ class AnimationExec:
           pos : tuple
               Coordenadas (x, y) donde se generarán las partículas.
           groups : list
-              Lista de grupos de sprites donde se agregarán las partículas generadas.
+              Lista de grupos de sprites donde se agregarán las partículas generadas. Solo se usa para
+              los efectos que son sprites.
 
           """
         animation_frames = self.frames[attack_type]
-        ParticleEffect(pos, animation_frames, groups)
+        self.spawn(attack_type, pos, animation_frames, groups)
+
+    def spawn(self, effect_type, pos, animation_frames, groups):
+        """
+          Crea un efecto: en el sistema por lotes si lo hay, o como sprite del pool si el efecto forma
+          parte de un ataque (`ATTACK_PARTICLES`) o no hay sistema.
+          """
+        priority = particle_priority[effect_type]
+        if self.system is None or effect_type in ATTACK_PARTICLES:
+            self.pool.spawn(pos, animation_frames, groups, priority)
+        else:
+            self.system.spawn(pos, animation_frames, priority)
+
+class ParticlePool:
+    """
+    Conjunto acotado de `ParticleEffect` reutilizables.
+
+    Los efectos se crean una sola vez al iniciar el pool. Al pedir uno se reutiliza un efecto libre y,
+    cuando termina su animación (`kill()`), vuelve al pool. Si no queda ninguno libre se recicla el
+    efecto activo más antiguo de menor prioridad; si todos los activos tienen más prioridad que el
+    nuevo, el nuevo se descarta.
+
+    Parámetros
+    ----------
+    capacity : int, opcional
+        Número máximo de efectos activos, por defecto `PARTICLE_POOL_SIZE`.
+
+    Atributos
+    ----------
+    free : list
+        Efectos libres, listos para reutilizarse.
+    active : dict
+        Efectos activos por prioridad {prioridad: {efecto: None}}, del más antiguo al más reciente.
+    requests : int
+        Efectos pedidos.
+    hits : int
+        Peticiones servidas con un efecto libre.
+    evictions : int
+        Peticiones servidas reciclando un efecto activo de menor o igual prioridad.
+    dropped : int
+        Peticiones descartadas por estar el pool lleno de efectos de más prioridad.
+
+    Métodos
+    -------
+    spawn(pos, animation_frames, groups, priority):
+        Activa un efecto del pool.
+    release(effect):
+        Devuelve un efecto al pool.
+    hit_rate():
+        Fracción de peticiones servidas con un efecto libre.
+    stats():
+        Devuelve las estadísticas del pool.
+    """
+    def __init__(self, capacity = PARTICLE_POOL_SIZE):
+        self.capacity = capacity
+        self.free = [ParticleEffect(pool = self) for _ in range(capacity)]
+        self.active = {}
+        self.requests = 0
+        self.hits = 0
+        self.evictions = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self.capacity - len(self.free)
+
+    def spawn(self, pos, animation_frames, groups, priority = 0):
+        """
+           Activa un efecto del pool en una posición y lo añade a los grupos indicados.
+
+           Parámetros
+           ----------
+           pos : tuple
+               Coordenadas (x, y) del centro del efecto.
+           animation_frames : list
+               Fotogramas de la animación.
+           groups : list
+               Grupos de sprites a los que se añade el efecto.
+           priority : int, opcional
+               Prioridad del efecto (ver `particle_priority`).
+
+           Retorna
+           -------
+           ParticleEffect or None
+               El efecto activado, o `None` si se ha descartado.
+           """
+        self.requests += 1
+        if self.free:
+            self.hits += 1
+        else:
+            lowest = min(self.active, default = None)
+            if lowest is None or lowest > priority:
+                self.dropped += 1
+                return None
+            self.evictions += 1
+            next(iter(self.active[lowest])).kill() # Vuelve a la lista de libres
+
+        effect = self.free.pop()
+        effect.reset(pos, animation_frames, priority)
+        effect.add(groups)
+        self.active.setdefault(priority, {})[effect] = None
+        return effect
+
+    def release(self, effect):
+        """
+           Devuelve un efecto al pool. Se llama desde `ParticleEffect.kill()`.
+           """
+        effects = self.active.get(effect.priority)
+        if effects is None or effect not in effects:
+            return
+        del effects[effect]
+        if not effects:
+            del self.active[effect.priority]
+        self.free.append(effect)
+
+    def hit_rate(self):
+        return self.hits / self.requests if self.requests else 0.0
+
+    def stats(self):
+        """
+           Devuelve las estadísticas del pool.
+
+           Retorna
+           -------
+           dict
+               Capacidad, efectos activos, peticiones, aciertos, reciclados, descartes y tasa de aciertos.
+           """
+        return {
+            'capacity': self.capacity,
+            'active': len(self),
+            'requests': self.requests,
+            'hits': self.hits,
+            'evictions': self.evictions,
+            'dropped': self.dropped,
+            'hit_rate': self.hit_rate(),
+        }
+
+class ParticleSystem:
+    """
+    Sistema de partículas por lotes: los efectos no son sprites, sino entradas en arrays.
+
+    Cada partícula guarda su posición, su animación y el paso en el que nació. Todas avanzan a la vez
+    con un único contador de pasos (`update`), de modo que el fotograma de cada una se deduce de su
+    edad y solo cuestan trabajo las que terminan. Al dibujar, `draw_items` devuelve las partículas
+    visibles ordenadas por Y para mezclarlas con el resto del mundo en `YSortCameraGroup`, que las
+    blitea junto a los sprites con un único `Surface.blits`.
+
+    El resultado es idéntico al de un `ParticleEffect`: misma posición, mismo fotograma en cada paso
+    (la misma suma acumulada de `animation_speed`) y misma duración.
+
+    Parámetros
+    ----------
+    order_counter : iterator
+        Contador de orden de inserción compartido con el grupo de cámara, para desempatar en Y igual
+        que los sprites.
+    capacity : int, opcional
+        Número máximo de partículas activas, por defecto `PARTICLE_SYSTEM_SIZE`.
+    animation_speed : float, opcional
+        Avance del índice de fotograma por paso, por defecto 0.15 como `ParticleEffect`.
+
+    Atributos
+    ----------
+    step : int
+        Pasos de actualización dados.
+    left, top, centery : array
+        Posición del rectángulo de cada hueco.
+    born : array
+        Paso en el que nació la partícula de cada hueco.
+    animation : array
+        Índice de la animación de cada hueco.
+    requests, hits, evictions, dropped : int
+        Estadísticas, con el mismo significado que en `ParticlePool`.
+
+    Métodos
+    -------
+    spawn(pos, animation_frames, priority):
+        Crea una partícula.
+    update():
+        Avanza todas las partículas un paso y retira las que han terminado.
+    clear():
+        Retira todas las partículas activas.
+    draw_items(view_rect):
+        Devuelve las partículas visibles como tuplas (centery, orden, imagen, topleft, rect).
+    stats():
+        Devuelve las estadísticas del sistema.
+    """
+    def __init__(self, order_counter, capacity = PARTICLE_SYSTEM_SIZE, animation_speed = 0.15):
+        self.order_counter = order_counter
+        self.capacity = capacity
+        self.step = 0
+
+        # Animaciones registradas: fotograma para cada edad, duración en pasos y tamaño
+        self.animation_ids = {}
+        self.frame_tables = []
+        self.progress = [0]
+        self.animation_speed = animation_speed
+
+        # Datos de cada hueco
+        self.left = array('i', [0]) * capacity
+        self.top = array('i', [0]) * capacity
+        self.centery = array('i', [0]) * capacity
+        self.born = array('q', [0]) * capacity
+        self.animation = array('i', [0]) * capacity
+        self.order = array('q', [0]) * capacity
+        self.free = list(range(capacity - 1, -1, -1))
+
+        self.slot_of = {} # orden -> hueco de las partículas activas
+        self.by_priority = {} # prioridad -> {orden: None}, de la más antigua a la más reciente
+        self.priority_of = {}
+        self.expiry = [] # montículo de (paso de fin, orden)
+        self.draw_list = [] # (centery, orden) ordenada
+        self.draw_list_dirty = False
+
+        self.requests = 0
+        self.hits = 0
+        self.evictions = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self.slot_of)
+
+    def animation_id(self, animation_frames):
+        """
+           Registra una animación y devuelve su índice.
+
+           Precalcula el fotograma (recortado) que se ve en cada paso de vida, con la misma suma
+           acumulada que `ParticleEffect.animate`, y la duración en pasos.
+           """
+        key = id(animation_frames)
+        animation = self.animation_ids.get(key)
+        if animation is not None and self.frame_tables[animation][1] is animation_frames:
+            return animation
+
+        # Los fotogramas se recortan a su zona no transparente: dibujar los píxeles con alfa 0 no
+        # cambia nada y, en efectos como las hojas, son la mayor parte de la imagen.
+        cropped = []
+        for frame in animation_frames:
+            bounds = frame.get_bounding_rect()
+            cropped.append((frame.subsurface(bounds).copy(), bounds.x, bounds.y, bounds.width, bounds.height))
+
+        frame_count = len(animation_frames)
+        progress = self.progress
+        table = [cropped[0]]
+        age = 1
+        while True:
+            while len(progress) <= age:
+                progress.append(progress[-1] + self.animation_speed)
+            if progress[age] >= frame_count:
+                break
+            table.append(cropped[int(progress[age])])
+            age += 1
+
+        animation = len(self.frame_tables)
+        self.animation_ids[key] = animation
+        self.frame_tables.append((table, animation_frames))
+        return animation
+
+    def spawn(self, pos, animation_frames, priority = 0):
+        """
+           Crea una partícula centrada en `pos`.
+
+           Parámetros
+           ----------
+           pos : tuple
+               Coordenadas (x, y) del centro.
+           animation_frames : list
+               Fotogramas de la animación.
+           priority : int, opcional
+               Prioridad del efecto (ver `particle_priority`).
+
+           Retorna
+           -------
+           int or None
+               Orden de dibujado de la partícula, o `None` si se ha descartado.
+           """
+        self.requests += 1
+        if self.free:
+            self.hits += 1
+        else:
+            lowest = min(self.by_priority, default = None)
+            if lowest is None or lowest > priority:
+                self.dropped += 1
+                return None
+            self.evictions += 1
+            self.retire(next(iter(self.by_priority[lowest])))
+
+        animation = self.animation_id(animation_frames)
+        rect = animation_frames[0].get_rect(center = pos)
+        slot = self.free.pop()
+        order = next(self.order_counter)
+        self.left[slot] = rect.left
+        self.top[slot] = rect.top
+        self.centery[slot] = rect.centery
+        self.born[slot] = self.step
+        self.animation[slot] = animation
+        self.order[slot] = order
+
+        self.slot_of[order] = slot
+        self.by_priority.setdefault(priority, {})[order] = None
+        self.priority_of[order] = priority
+        heappush(self.expiry, (self.step + len(self.frame_tables[animation][0]), order))
+        insort(self.draw_list, (rect.centery, order))
+        return order
+
+    def retire(self, order):
+        """
+           Retira una partícula activa y libera su hueco.
+           """
+        slot = self.slot_of.pop(order, None)
+        if slot is None:
+            return
+        priority = self.priority_of.pop(order)
+        orders = self.by_priority[priority]
+        del orders[order]
+        if not orders:
+            del self.by_priority[priority]
+        self.free.append(slot)
+        self.draw_list_dirty = True
+
+    def clear(self):
+        """
+           Retira todas las partículas activas (las estadísticas se conservan).
+           """
+        for order in list(self.slot_of):
+            self.retire(order)
+        self.expiry.clear()
+        self.draw_list.clear()
+        self.draw_list_dirty = False
+
+    def update(self):
+        """
+           Avanza todas las partículas un paso y retira las que han terminado su animación.
+           """
+        self.step += 1
+        expiry = self.expiry
+        while expiry and expiry[0][0] <= self.step:
+            self.retire(heappop(expiry)[1])
+
+    def draw_items(self, view_rect):
+        """
+           Devuelve las partículas que se solapan con la cámara, ordenadas por (centery, orden).
+
+           Parámetros
+           ----------
+           view_rect : pygame.Rect
+               Rectángulo de la cámara en coordenadas del mundo.
+
+           Retorna
+           -------
+           list
+               Tuplas (centery, orden, imagen, (left, top), rect), con la imagen y el rectángulo
+               recortados a la zona visible del fotograma.
+           """
+        if self.draw_list_dirty:
+            slot_of = self.slot_of
+            self.draw_list = [item for item in self.draw_list if item[1] in slot_of]
+            self.draw_list_dirty = False
+
+        view_left, view_top, view_right, view_bottom = view_rect.left, view_rect.top, view_rect.right, view_rect.bottom
+        step = self.step
+        items = []
+        for centery, order in self.draw_list:
+            slot = self.slot_of[order]
+            image, dx, dy, width, height = self.frame_tables[self.animation[slot]][0][step - self.born[slot]]
+            left = self.left[slot] + dx
+            top = self.top[slot] + dy
+            if width and height and left < view_right and left + width > view_left and top < view_bottom and top + height > view_top:
+                items.append((centery, order, image, (left, top), pygame.Rect(left, top, width, height)))
+        return items
+
+    def hit_rate(self):
+        return self.hits / self.requests if self.requests else 0.0
+
+    def stats(self):
+        """
+           Devuelve las estadísticas del sistema, con las mismas claves que `ParticlePool.stats`.
+           """
+        return {
+            'capacity': self.capacity,
+            'active': len(self),
+            'requests': self.requests,
+            'hits': self.hits,
+            'evictions': self.evictions,
+            'dropped': self.dropped,
+            'hit_rate': self.hit_rate(),
+        }
 
 class ParticleEffect(pygame.sprite.Sprite):
-    def __init__(self, pos, animation_frames, groups):
+    """
+    Efecto de partículas animado que desaparece al terminar su animación.
+
+    Parámetros
+    ----------
+    pos : tuple, opcional
+        Coordenadas (x, y) del centro del efecto.
+    animation_frames : list, opcional
+        Fotogramas de la animación. Si no se indican, el efecto queda sin activar (uso del pool).
+    groups : list, opcional
+        Grupos de sprites a los que se añade el efecto.
+    pool : ParticlePool, opcional
+        Pool al que vuelve el efecto al llamar a `kill()`.
+    """
+    def __init__(self, pos = None, animation_frames = None, groups = (), pool = None):
         super().__init__(groups)
+        self.pool = pool
+        self.sprite_type = 'magic'
+        self.priority = 0
+        if animation_frames is not None:
+            self.reset(pos, animation_frames)
+
+    def reset(self, pos, animation_frames, priority = 0):
+        """
+           Reinicia el efecto con una animación nueva en la posición indicada.
+           """
         self.frame_index = 0
         self.animation_speed = 0.15
         self.frames = animation_frames
         self.image = self.frames[self.frame_index]
         self.rect = self.image.get_rect(center = pos)
-        self.sprite_type = 'magic'
+        self.priority = priority
+
+    def kill(self):
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)
 
     def animate(self):
         """
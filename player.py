@@ -1,7 +1,9 @@
 import pygame
+import game_time
 from support import *
 from settings import *
 from entity import *
+from assets import asset_cache
 
 class Player(Entity):
 
@@ -52,6 +54,8 @@ class Player(Entity):
         Tiempo en milisegundos del último cambio de magia.
     obstacle_sprites : list
         Lista de los sprites con los que el jugador puede colisionar.
+    get_keys : callable
+        Función que devuelve el estado del teclado, por defecto `pygame.key.get_pressed`.
     animations : dict
         Diccionario que almacena las animaciones del jugador para diferentes direcciones y acciones.
     stats : dict
@@ -101,6 +105,12 @@ class Player(Entity):
         Obtiene el costo de mejora de una estadística del jugador por su índice.
     update():
         Actualiza el estado del jugador, incluyendo la entrada, movimiento, animaciones, y regeneración de energía.
+    save_data():
+        Devuelve los datos del jugador que se guardan en la base de datos.
+    load_data(data):
+        Restaura los datos del jugador de una partida guardada.
+    dirty_data():
+        Devuelve las columnas guardadas del jugador que han cambiado desde el último guardado.
     """
 
     def __init__(self, pos, groups, obstacle_sprites, create_attack, destroy_attack, create_magic):
@@ -127,7 +137,7 @@ class Player(Entity):
                Función para crear un hechizo del jugador.
            """
         super().__init__(groups)
-        self.image = pygame.image.load('graphics/test/player.png').convert_alpha()
+        self.image = asset_cache.image('graphics/test/player.png')
         self.rect = self.image.get_rect(topleft = pos)
         self.hitbox = self.rect.inflate(0,-26)
 
@@ -154,6 +164,9 @@ class Player(Entity):
 
         self.obstacle_sprites = obstacle_sprites
 
+        # Fuente de entrada del teclado (se puede sustituir por una entrada programada)
+        self.get_keys = pygame.key.get_pressed
+
         # Setup de recursos gráficos para las animaciones
         self.import_player_assets()
         self.status = 'down'
@@ -173,8 +186,7 @@ class Player(Entity):
         self.invincibility_duration = 500
 
         # Importar sonido
-        self.weapon_attack_sound = pygame.mixer.Sound('audio/sword.wav')
-        self.weapon_attack_sound.set_volume(0.4)
+        self.weapon_attack_sound = asset_cache.sound('audio/sword.wav', 0.4)
 
     def input(self):
         """
@@ -184,7 +196,7 @@ class Player(Entity):
 
            """
 
-        keys = pygame.key.get_pressed()
+        keys = self.get_keys()
 
         # Input del movimiento
         if not self.attacking:
@@ -208,14 +220,14 @@ class Player(Entity):
             # Input del ataque
             if keys[pygame.K_SPACE]:
                 self.attacking = True
-                self.attack_time = pygame.time.get_ticks()
+                self.attack_time = game_time.get_ticks()
                 self.weapon_attack_sound.play()
                 self.create_attack()
 
             # Input de magia
             if keys[pygame.K_LCTRL]:
                 self.attacking = True
-                self.attack_time = pygame.time.get_ticks()
+                self.attack_time = game_time.get_ticks()
                 style = list(magic_data.keys())[self.magic_index]
                 strength = list(magic_data.values())[self.magic_index]['strength'] + self.stats['magic']
                 cost = list(magic_data.values())[self.magic_index]['cost']
@@ -225,22 +237,24 @@ class Player(Entity):
             # Cambiar de arma
             if keys[pygame.K_c] and self.able_to_switch_weapon:
                 self.able_to_switch_weapon = False
-                self.weapon_switch_time = pygame.time.get_ticks()
+                self.weapon_switch_time = game_time.get_ticks()
                 if self.weapon_index < len(list(weapon_data.keys())) - 1:
                     self.weapon_index += 1
                 else:
                     self.weapon_index = 0
                 self.weapon = list(weapon_data.keys())[self.weapon_index]
+                self.dirty.add('equipment')
 
             # Cambiar magia
             if keys[pygame.K_r] and self.able_to_switch_magic:
                 self.able_to_switch_magic = False
-                self.magic_switch_time = pygame.time.get_ticks()
+                self.magic_switch_time = game_time.get_ticks()
                 if self.magic_index < len(list(magic_data.keys())) - 1:
                     self.magic_index += 1
                 else:
                     self.magic_index = 0
                 self.magic = list(magic_data.keys())[self.magic_index]
+                self.dirty.add('equipment')
 
 
 
@@ -252,7 +266,7 @@ class Player(Entity):
            cambiar de arma o magia, y permite que se realicen nuevamente.
 
            """
-        current_time = pygame.time.get_ticks()
+        current_time = game_time.get_ticks()
         if self.attacking:
             if current_time - self.attack_time >= self.attack_cooldown + weapon_data[self.weapon]['cooldown']:
                 self.attacking = False
@@ -284,7 +298,7 @@ class Player(Entity):
                            'right_attack': [], 'left_attack': [], 'up_attack': [], 'down_attack': []}
         for animation in self.animations.keys():
             full_path = character_path + animation
-            self.animations[animation] = import_folder(full_path)
+            self.animations[animation] = asset_cache.folder(full_path)
 
     def get_status(self):
         """
@@ -335,12 +349,12 @@ class Player(Entity):
            """
         super().animate()
 
-        # Parpadeo
+        # Parpadeo (los fotogramas son compartidos: se aplica sobre una copia)
         if not self.vulnerable:
             alpha = self.alpha_variation()
-            self.image.set_alpha(alpha)
-        else:
-            self.image.set_alpha(255)
+            if alpha != 255:
+                self.image = self.image.copy()
+                self.image.set_alpha(alpha)
 
     def energy_regen(self):
         """
@@ -421,3 +435,79 @@ class Player(Entity):
         self.get_status()
         self.animate()
         self.energy_regen()
+
+    def save_data(self):
+        """
+           Devuelve los datos del jugador en el formato de `DataBase.update_player`.
+
+           Retorna
+           -------
+           dict
+               Posición, vida, energía, experiencia, estadísticas y arma y magia elegidas. En 'stats' van las
+               estadísticas y los costes de mejora.
+           """
+        return {
+            'position': self.rect.topleft,
+            'health': self.health,
+            'max_health': self.stats['health'],
+            'energy': self.energy,
+            'max_energy': self.stats['energy'],
+            'exp': self.exp,
+            'speed': self.speed,
+            'attack': self.stats['attack'],
+            'magic': self.stats['magic'],
+            'weapon_index': self.weapon_index,
+            'magic_index': self.magic_index,
+            'stats': {'stats': self.stats, 'upgrade_cost': self.upgrade_cost},
+        }
+
+    def load_data(self, data):
+        """
+           Restaura los datos del jugador guardados con `save_data`. La posición se indica al crear el jugador.
+
+           Parámetros
+           ----------
+           data : dict
+               Datos del jugador, como los devuelve `DataBase.load_save`.
+           """
+        self.stats = dict(data['stats']['stats'])
+        self.upgrade_cost = dict(data['stats']['upgrade_cost'])
+        self.health = data['health']
+        self.energy = data['energy']
+        self.exp = data['exp']
+        self.speed = data['speed']
+        self.weapon_index = data['weapon_index']
+        self.weapon = list(weapon_data.keys())[self.weapon_index]
+        self.magic_index = data['magic_index']
+        self.magic = list(magic_data.keys())[self.magic_index]
+
+    def dirty_data(self):
+        """
+           Devuelve las columnas de la tabla players que han cambiado desde el último guardado, según
+           `dirty`. La energía se regenera sola, así que se incluye siempre que haya algo que guardar.
+
+           Retorna
+           -------
+           dict
+               {columna: valor} para `DataBase.save_changes`; vacío si no ha cambiado nada.
+           """
+        if not self.dirty:
+            return {}
+        fields = {'energy': self.energy}
+        if 'position' in self.dirty:
+            fields['position_x'], fields['position_y'] = self.rect.topleft
+        if 'health' in self.dirty:
+            fields['health'] = self.health
+        if 'exp' in self.dirty:
+            fields['exp'] = self.exp
+        if 'stats' in self.dirty:
+            fields['max_health'] = self.stats['health']
+            fields['max_energy'] = self.stats['energy']
+            fields['speed'] = self.speed
+            fields['attack'] = self.stats['attack']
+            fields['magic'] = self.stats['magic']
+            fields['stats'] = {'stats': dict(self.stats), 'upgrade_cost': dict(self.upgrade_cost)}
+        if 'equipment' in self.dirty:
+            fields['weapon_index'] = self.weapon_index
+            fields['magic_index'] = self.magic_index
+        return fields
@@ -0,0 +1,112 @@
+import time
+
+
+class _Phase:
+    """
+    Contexto que mide una fase y guarda su duración en el perfilador.
+    """
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, (time.perf_counter() - self.start) * 1000)
+
+
+class _NullPhase:
+    """
+    Contexto vacío usado cuando el perfilador está desactivado.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class PhaseProfiler:
+    """
+    Mide cuánto tarda cada fase de un fotograma (actualización, IA, dibujado...).
+
+    Desactivado no mide nada y su coste es el de entrar en un contexto vacío.
+
+    Atributos
+    ----------
+    enabled : bool
+        Indica si se están tomando medidas.
+    last : dict
+        Duración en milisegundos de cada fase en la última medida {fase: ms}.
+    samples : dict
+        Historial de duraciones de cada fase {fase: [ms, ...]}, si `keep_samples` es `True`.
+    keep_samples : bool
+        Guardar todas las medidas además de la última.
+
+    Métodos
+    -------
+    phase(name):
+        Devuelve un contexto que mide la fase `name`.
+    record(name, milliseconds):
+        Guarda una medida de una fase.
+    reset():
+        Borra las medidas tomadas.
+    """
+    def __init__(self, enabled = False, keep_samples = False):
+        self.enabled = enabled
+        self.keep_samples = keep_samples
+        self.last = {}
+        self.samples = {}
+
+    def phase(self, name):
+        """
+           Devuelve un contexto que mide la fase `name`.
+
+           Ejemplo
+           --------
+           >>> with profiler.phase('draw'):
+           ...     level.draw()
+           """
+        if self.enabled:
+            return _Phase(self, name)
+        return _NULL_PHASE
+
+    def record(self, name, milliseconds):
+        self.last[name] = milliseconds
+        if self.keep_samples:
+            self.samples.setdefault(name, []).append(milliseconds)
+
+    def reset(self):
+        self.last.clear()
+        self.samples.clear()
+
+
+def percentile(values, percent):
+    """
+       Calcula un percentil por el método del rango más cercano.
+
+       Parámetros
+       ----------
+       values : list
+           Valores a analizar.
+       percent : float
+           Percentil entre 0 y 100.
+
+       Retorna
+       -------
+       float
+           Valor del percentil, o 0 si no hay valores.
+       """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
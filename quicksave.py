@@ -0,0 +1,291 @@
+"""
+Guardado y carga rápidos del estado completo de un nivel en un archivo binario.
+
+A diferencia de la base de datos, que guarda la partida (jugador, enemigos, hierba cortada), aquí se
+guarda el estado de la simulación tal cual para poder volver a él: además de posiciones y vida, los
+estados de animación, las direcciones, todos los tiempos de recarga, el reloj del juego y el estado
+de `random`. Todo se empaqueta con `struct` y `array` y se escribe con una sola escritura.
+
+La carga se hace sobre un nivel ya construido del mismo mapa, sin volver a ejecutar `create_map`:
+se actualizan los enemigos que ya existen, se crean los que faltan y se vuelve a poner o quitar la
+hierba. Los ataques y las partículas en vuelo (las llamas, que son sprites, y las del
+`ParticleSystem` del grupo de cámara) no se guardan y se quitan al cargar; si el jugador estaba
+atacando con un arma se vuelve a crear. Tras cargar, `Level.needs_full_save` hace que el siguiente
+autoguardado en la base de datos sea completo.
+
+Formato (little-endian):
+
+    cabecera   : 'FPQSV', versión (H), reloj en ms (d, NaN sin simulación), pausa (?),
+                 casillas de hierba del mapa (I), nombres (I), enemigos (I), hierba cortada (I),
+                 longitud de los nombres (I)
+    nombres    : nombres de enemigos y estados en UTF-8 separados por '\\0'
+    jugador    : PLAYER
+    enemigos   : ENEMY por enemigo, en el orden del nivel
+    hierba     : tile_id de cada casilla cortada (array 'i')
+    random     : estado de Mersenne Twister (625 'I'), gauss_next (? y d)
+
+Uso (desde la raíz del proyecto), con el juego abierto: F5 guarda y F9 carga `QUICKSAVE_PATH`.
+"""
+import math
+import os
+import random
+import struct
+from array import array
+
+import pygame
+import game_time
+from settings import *
+
+MAGIC = b'FPQSV'
+VERSION = 1
+HEADER = struct.Struct('<5sHd?IIIII')
+# hitbox y rect (8i), estado (H), fotograma (d), dirección (2d), 14 números y máscara de enteros (I),
+# atacando (?), tiempo de ataque (q), arma con sprite (?), cambio de arma (? q), cambio de magia (? q),
+# vulnerable (?), tiempo del golpe (q), arma y magia (2H)
+PLAYER = struct.Struct('<8iHd2d14dI?q??q?q?q2H')
+# spawn_id (i), nombre y estado (2H), fotograma (d), hitbox y rect (8i), dirección (2d), vida (d),
+# vida entera (?), puede atacar (?), tiempo de ataque (q), vulnerable (?), tiempo del golpe (q), dormido (?)
+ENEMY = struct.Struct('<i2Hd8i2dd??q?q?')
+GAUSS = struct.Struct('<?d')
+
+STAT_NAMES = ('health', 'energy', 'attack', 'magic', 'speed')
+NO_TIME = -1 # Tiempo de recarga sin valor (None)
+
+
+def _time(value):
+    return NO_TIME if value is None else value
+
+
+def _restore_time(value):
+    return None if value == NO_TIME else value
+
+
+def _numbers(values):
+    """
+       Devuelve los números como floats y una máscara con los que eran enteros, para restaurar su tipo.
+       """
+    mask = 0
+    for index, value in enumerate(values):
+        if isinstance(value, int):
+            mask |= 1 << index
+    return [float(value) for value in values], mask
+
+
+def _restore_numbers(values, mask):
+    return [int(value) if mask & (1 << index) else value for index, value in enumerate(values)]
+
+
+def dumps(level):
+    """
+       Empaqueta el estado de la simulación del nivel.
+
+       Parámetros
+       ----------
+       level : Level
+           Nivel a guardar.
+
+       Retorna
+       -------
+       bytes
+           Estado del nivel en el formato del módulo.
+       """
+    names = {}
+    def name_index(name):
+        return names.setdefault(name, len(names))
+
+    player = level.player
+    numbers, mask = _numbers([player.health, player.energy, player.exp, player.speed,
+                              *(player.stats[stat] for stat in STAT_NAMES),
+                              *(player.upgrade_cost[stat] for stat in STAT_NAMES)])
+    player_record = PLAYER.pack(
+        *player.hitbox, *player.rect, name_index(player.status), player.frame_index, *player.direction,
+        *numbers, mask,
+        player.attacking, player.attack_time, level.current_attack is not None,
+        player.able_to_switch_weapon, _time(player.weapon_switch_time),
+        player.able_to_switch_magic, _time(player.magic_switch_time),
+        player.vulnerable, player.hurt_time, player.weapon_index, player.magic_index)
+
+    enemies = []
+    for enemy in level.enemy_manager:
+        enemies.append(ENEMY.pack(
+            -1 if enemy.spawn_id is None else enemy.spawn_id, name_index(enemy.enemy_name),
+            name_index(enemy.status), enemy.frame_index, *enemy.hitbox, *enemy.rect, *enemy.direction,
+            enemy.health, isinstance(enemy.health, int), enemy.able_to_attack, _time(enemy.attack_time),
+            enemy.vulnerable, enemy.hit_time, enemy.asleep))
+
+    cut_grass = array('i', sorted(level.cut_grass))
+    _, state, gauss_next = random.getstate()
+    ticks = game_time.get_time()
+    names_blob = '\0'.join(names).encode()
+    header = HEADER.pack(MAGIC, VERSION, math.nan if ticks is None else ticks, level.game_paused,
+                         len(level.grass_tiles), len(names), len(enemies), len(cut_grass), len(names_blob))
+    return b''.join((header, names_blob, player_record, *enemies, cut_grass.tobytes(),
+                     array('I', state).tobytes(), GAUSS.pack(gauss_next is not None, gauss_next or 0.0)))
+
+
+def loads(level, data):
+    """
+       Restaura sobre un nivel ya construido el estado empaquetado con `dumps`.
+
+       Parámetros
+       ----------
+       level : Level
+           Nivel del mismo mapa en el que se guardó el estado.
+       data : bytes
+           Estado empaquetado.
+       """
+    data = memoryview(data)
+    if len(data) < HEADER.size:
+        raise ValueError('El guardado rápido está incompleto')
+    magic, version, ticks, paused, grass_count, name_count, enemy_count, cut_count, names_size = \
+        HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('No es un guardado rápido compatible')
+    if grass_count != len(level.grass_tiles):
+        raise ValueError('El guardado rápido es de otro mapa')
+    # Se comprueba todo antes de tocar el nivel, para no dejarlo a medio restaurar
+    size = (HEADER.size + names_size + PLAYER.size + ENEMY.size * enemy_count + array('i').itemsize * cut_count
+            + array('I').itemsize * 625 + GAUSS.size)
+    if len(data) != size:
+        raise ValueError('El guardado rápido está incompleto')
+    offset = HEADER.size
+    try:
+        names = bytes(data[offset:offset + names_size]).decode().split('\0') if name_count else []
+    except UnicodeDecodeError:
+        names = None
+    if names is None or len(names) != name_count:
+        raise ValueError('El guardado rápido está dañado')
+    offset += names_size
+    player_values = PLAYER.unpack_from(data, offset)
+    offset += PLAYER.size
+    enemy_values = list(ENEMY.iter_unpack(data[offset:offset + ENEMY.size * enemy_count]))
+    offset += ENEMY.size * enemy_count
+    cut_grass = array('i')
+    cut_grass.frombytes(data[offset:offset + cut_grass.itemsize * cut_count])
+    offset += cut_grass.itemsize * cut_count
+    state = array('I')
+    state.frombytes(data[offset:offset + state.itemsize * 625])
+    offset += state.itemsize * 625
+    has_gauss, gauss_next = GAUSS.unpack_from(data, offset)
+    if any(values[1] >= name_count or values[2] >= name_count for values in enemy_values) \
+            or player_values[8] >= name_count or state[-1] > 624:
+        raise ValueError('El guardado rápido está dañado')
+
+    # Ataques y partículas en vuelo
+    level.destroy_attack()
+    for sprite in list(level.particle_sprites):
+        sprite.kill()
+    level.visible_sprites.particles.clear()
+
+    _restore_player(level, player_values, names)
+    _restore_enemies(level, enemy_values, names)
+    _restore_grass(level, set(cut_grass))
+
+    level.game_paused = paused
+    if not math.isnan(ticks):
+        game_time.start_simulation(ticks)
+    random.setstate((3, tuple(state), gauss_next if has_gauss else None))
+    level.needs_full_save = True
+
+
+def _restore_player(level, values, names):
+    player = level.player
+    player.hitbox = pygame.Rect(values[0:4])
+    player.rect = pygame.Rect(values[4:8])
+    player.status = names[values[8]]
+    player.frame_index = values[9]
+    player.direction = pygame.math.Vector2(values[10], values[11])
+    numbers = _restore_numbers(values[12:26], values[26])
+    player.health, player.energy, player.exp, player.speed = numbers[:4]
+    player.stats.update(zip(STAT_NAMES, numbers[4:9]))
+    player.upgrade_cost.update(zip(STAT_NAMES, numbers[9:14]))
+    (player.attacking, player.attack_time, has_weapon, player.able_to_switch_weapon, weapon_switch_time,
+     player.able_to_switch_magic, magic_switch_time, player.vulnerable, player.hurt_time,
+     player.weapon_index, player.magic_index) = values[27:]
+    player.weapon_switch_time = _restore_time(weapon_switch_time)
+    player.magic_switch_time = _restore_time(magic_switch_time)
+    player.weapon = list(weapon_data.keys())[player.weapon_index]
+    player.magic = list(magic_data.keys())[player.magic_index]
+    player.image = player.animations[player.status][int(player.frame_index)]
+    if has_weapon:
+        level.create_attack()
+
+
+def _restore_enemies(level, records, names):
+    """
+       Deja en el nivel exactamente los enemigos guardados, en el mismo orden. Los que ya existen se
+       reutilizan (sacarlos y volver a meterlos en los grupos es mucho más barato que crearlos).
+       """
+    existing = {}
+    for enemy in list(level.enemy_manager):
+        existing[enemy.spawn_id] = enemy
+        enemy.kill()
+    level.enemy_manager.killed.clear()
+
+    groups = level.enemy_groups()
+    for (spawn_id, name, status, frame_index, *rects, direction_x, direction_y, health, health_is_int,
+         able_to_attack, attack_time, vulnerable, hit_time, asleep) in records:
+        spawn_id = None if spawn_id == -1 else spawn_id
+        enemy = existing.pop(spawn_id, None) if spawn_id is not None else None
+        if enemy is None:
+            enemy = level.spawn_enemy(names[name], rects[4:6], spawn_id)
+            enemy.kill()
+        enemy.hitbox = pygame.Rect(rects[0:4])
+        enemy.rect = pygame.Rect(rects[4:8])
+        enemy.status = names[status]
+        enemy.frame_index = frame_index
+        enemy.image = enemy.animations[enemy.status][int(frame_index)]
+        enemy.direction = pygame.math.Vector2(direction_x, direction_y)
+        enemy.health = int(health) if health_is_int else health
+        enemy.able_to_attack = able_to_attack
+        enemy.attack_time = _restore_time(attack_time)
+        enemy.vulnerable = vulnerable
+        enemy.hit_time = hit_time
+        enemy.asleep = asleep
+        enemy.dirty.clear()
+        enemy.add(groups)
+
+
+def _restore_grass(level, cut_grass):
+    groups = level.grass_groups()
+    for tile_id, tile in level.grass_tiles.items():
+        cut = tile_id in cut_grass
+        if cut and tile.alive():
+            tile.kill()
+        elif not cut and not tile.alive():
+            tile.add(groups)
+    level.cut_grass = cut_grass
+    level.dirty_grass.clear()
+
+
+def save(level, path = QUICKSAVE_PATH):
+    """
+       Guarda el estado del nivel en un archivo con una sola escritura.
+
+       Retorna
+       -------
+       int
+           Bytes escritos.
+       """
+    data = dumps(level)
+    # Se escribe en un archivo temporal y se reemplaza el anterior, para que un fallo a mitad de la
+    # escritura no estropee el último guardado
+    temporary = path + '.tmp'
+    try:
+        with open(temporary, 'wb') as file:
+            file.write(data)
+        os.replace(temporary, path)
+    except OSError:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return len(data)
+
+
+def load(level, path = QUICKSAVE_PATH):
+    """
+       Restaura el estado del nivel guardado con `save`. Si el archivo está incompleto o no es
+       compatible se lanza `ValueError` sin cambiar el nivel.
+       """
+    with open(path, 'rb') as file:
+        loads(level, file.read())
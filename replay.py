@@ -0,0 +1,394 @@
+"""
+Grabación y reproducción determinista de partidas.
+
+`InputRecorder` guarda, paso de lógica a paso de lógica, las teclas que lee el juego (las de
+`Player.input` y `Upgrade.input`), las pulsaciones de ESC que abren el menú de mejoras y el tiempo
+que avanza el reloj, junto con la semilla de `random` con la que se construyó el nivel. Cada
+`CHECKPOINT_INTERVAL` pasos guarda además un hash del estado del nivel.
+
+`Replay` carga una grabación y hace de entrada de teclado para `HeadlessRunner`, de modo que la misma
+partida se puede volver a ejecutar sin ventana en cualquier versión del juego: los hashes deben
+coincidir y los tiempos por fotograma se pueden comparar entre versiones.
+
+Formato (little-endian, comprimido con zlib salvo la cabecera):
+
+    cabecera     : 'FPRPL', versión (H)
+    datos        : semilla (q), tiempo inicial en ms (d), intervalo de control (I),
+                   número de teclas (B) y sus códigos (I cada uno),
+                   número de tramos (I) y tramos (repeticiones (I), máscara (I), ms (d)),
+                   número de controles (I) y controles (paso (I), hash (8s))
+
+Un tramo agrupa pasos consecutivos con las mismas teclas y el mismo tiempo. El bit `TOGGLE_BIT` de la
+máscara indica que en ese paso se pulsó ESC.
+
+Uso (desde la raíz del proyecto):
+
+    python main.py --record partida.rpl            # grabar jugando
+    python replay.py --record-script partida.rpl   # grabar el guion de ejemplo sin ventana
+    python replay.py partida.rpl [--render] [--output perfil.json]
+"""
+import argparse
+import hashlib
+import json
+import struct
+import zlib
+
+import pygame
+import game_time
+from settings import *
+from profiling import percentile
+
+MAGIC = b'FPRPL'
+VERSION = 1
+HEADER = struct.Struct('<5sH')
+BODY_HEADER = struct.Struct('<qdIB')
+RUN = struct.Struct('<IId')
+CHECKPOINT = struct.Struct('<I8s')
+COUNT = struct.Struct('<I')
+
+CHECKPOINT_INTERVAL = 60
+TOGGLE_BIT = 1 << 31
+
+# Teclas que lee el juego durante la partida
+RECORDED_KEYS = (
+    pygame.K_w, pygame.K_s, pygame.K_a, pygame.K_d,
+    pygame.K_SPACE, pygame.K_LCTRL, pygame.K_c, pygame.K_r,
+    pygame.K_LEFT, pygame.K_RIGHT,
+)
+
+
+def state_hash(level):
+    """
+       Calcula un hash del estado jugable del nivel: jugador, enemigos, sprites atacables y reloj.
+
+       Parámetros
+       ----------
+       level : Level
+           Nivel a resumir.
+
+       Retorna
+       -------
+       bytes
+           Hash de 8 bytes.
+       """
+    player = level.player
+    digest = hashlib.blake2b(digest_size = 8)
+    digest.update(repr((
+        game_time.get_ticks(), level.game_paused,
+        tuple(player.hitbox), player.status, player.health, player.energy, player.exp,
+        player.weapon_index, player.magic_index, tuple(player.stats.values()), tuple(player.upgrade_cost.values()),
+        len(level.attackable_sprites),
+    )).encode())
+    for enemy in level.enemy_manager:
+        digest.update(repr((enemy.enemy_name, tuple(enemy.hitbox), enemy.status, enemy.health,
+                            enemy.vulnerable, enemy.able_to_attack)).encode())
+    return digest.digest()
+
+
+class InputRecorder:
+    """
+    Graba la entrada de cada paso de lógica y hashes periódicos del estado.
+
+    Parámetros
+    ----------
+    seed : int
+        Semilla de `random` con la que se construyó el nivel.
+    start_ticks : float, opcional
+        Tiempo del reloj del juego al empezar a grabar.
+    keys : tuple, opcional
+        Códigos de las teclas a grabar, por defecto `RECORDED_KEYS`.
+    checkpoint_interval : int, opcional
+        Pasos entre hashes del estado, por defecto `CHECKPOINT_INTERVAL`.
+
+    Atributos
+    ----------
+    runs : list
+        Tramos [repeticiones, máscara, ms] grabados.
+    checkpoints : list
+        Pares (paso, hash) grabados.
+    frames : int
+        Pasos grabados.
+
+    Métodos
+    -------
+    record(pressed, menu_toggled, milliseconds):
+        Graba la entrada de un paso, antes de ejecutarlo.
+    checkpoint(level):
+        Guarda el hash del estado si toca, después de ejecutar el paso.
+    save(path):
+        Escribe la grabación en un archivo.
+    """
+    def __init__(self, seed, start_ticks = 0, keys = RECORDED_KEYS, checkpoint_interval = CHECKPOINT_INTERVAL):
+        self.seed = seed
+        self.start_ticks = start_ticks
+        self.keys = tuple(keys)
+        self.checkpoint_interval = checkpoint_interval
+        self.runs = []
+        self.checkpoints = []
+        self.frames = 0
+
+    def record(self, pressed, menu_toggled = False, milliseconds = 1000 / FPS):
+        """
+           Graba la entrada de un paso de lógica.
+
+           Parámetros
+           ----------
+           pressed : sequence
+               Estado del teclado, como el de `pygame.key.get_pressed()`.
+           menu_toggled : bool, opcional
+               Si se ha pulsado ESC desde el paso anterior.
+           milliseconds : float, opcional
+               Tiempo que avanza el reloj tras el paso.
+           """
+        mask = TOGGLE_BIT if menu_toggled else 0
+        for bit, key in enumerate(self.keys):
+            if pressed[key]:
+                mask |= 1 << bit
+
+        last = self.runs[-1] if self.runs else None
+        if last is not None and last[1] == mask and last[2] == milliseconds:
+            last[0] += 1
+        else:
+            self.runs.append([1, mask, milliseconds])
+        self.frames += 1
+
+    def checkpoint(self, level):
+        """
+           Guarda el hash del estado del nivel cada `checkpoint_interval` pasos.
+           """
+        if self.frames % self.checkpoint_interval == 0:
+            self.checkpoints.append((self.frames, state_hash(level)))
+
+    def save(self, path):
+        """
+           Escribe la grabación en `path`.
+           """
+        body = bytearray(BODY_HEADER.pack(self.seed, self.start_ticks, self.checkpoint_interval, len(self.keys)))
+        body += struct.pack(f'<{len(self.keys)}I', *self.keys)
+        body += COUNT.pack(len(self.runs))
+        for count, mask, milliseconds in self.runs:
+            body += RUN.pack(count, mask, milliseconds)
+        body += COUNT.pack(len(self.checkpoints))
+        for frame, digest in self.checkpoints:
+            body += CHECKPOINT.pack(frame, digest)
+
+        with open(path, 'wb') as output:
+            output.write(HEADER.pack(MAGIC, VERSION))
+            output.write(zlib.compress(bytes(body), 9))
+
+
+class Replay:
+    """
+    Grabación cargada, con la misma interfaz de entrada que `headless.ScriptedInput`.
+
+    Atributos
+    ----------
+    seed : int
+        Semilla de `random` de la partida.
+    start_ticks : float
+        Tiempo inicial del reloj del juego.
+    frames : int
+        Pasos grabados.
+    checkpoints : dict
+        Hashes grabados {paso: hash}.
+    frame : int
+        Paso actual.
+
+    Métodos
+    -------
+    load(path):
+        Carga una grabación desde un archivo.
+    get_pressed():
+        Devuelve las teclas pulsadas en el paso actual.
+    menu_toggled():
+        Indica si en el paso actual se pulsó ESC.
+    frame_ms():
+        Devuelve el tiempo que avanza el reloj tras el paso actual.
+    next_frame():
+        Avanza al siguiente paso.
+    """
+    def __init__(self, seed, start_ticks, keys, runs, checkpoints, checkpoint_interval = CHECKPOINT_INTERVAL):
+        from headless import PressedKeys
+
+        self.seed = seed
+        self.start_ticks = start_ticks
+        self.keys = tuple(keys)
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoints = dict(checkpoints)
+
+        # Se expande a un registro por paso; los estados de teclado se comparten entre pasos iguales
+        pressed_cache = {}
+        self.pressed = []
+        self.toggled = []
+        self.milliseconds = []
+        for count, mask, milliseconds in runs:
+            keys_mask = mask & ~TOGGLE_BIT
+            pressed = pressed_cache.get(keys_mask)
+            if pressed is None:
+                pressed = PressedKeys(key for bit, key in enumerate(self.keys) if keys_mask & (1 << bit))
+                pressed_cache[keys_mask] = pressed
+            self.pressed.extend([pressed] * count)
+            self.toggled.extend([bool(mask & TOGGLE_BIT)] * count)
+            self.milliseconds.extend([milliseconds] * count)
+        self.frames = len(self.pressed)
+        self.empty = PressedKeys()
+        self.frame = 0
+
+    @classmethod
+    def load(cls, path):
+        """
+           Carga una grabación.
+
+           Parámetros
+           ----------
+           path : str
+               Ruta del archivo.
+
+           Retorna
+           -------
+           Replay
+               Grabación lista para reproducir.
+           """
+        with open(path, 'rb') as source:
+            data = source.read()
+        magic, version = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} no es una grabación compatible')
+        body = zlib.decompress(data[HEADER.size:])
+
+        seed, start_ticks, checkpoint_interval, key_count = BODY_HEADER.unpack_from(body)
+        offset = BODY_HEADER.size
+        keys = struct.unpack_from(f'<{key_count}I', body, offset)
+        offset += 4 * key_count
+        (run_count,) = COUNT.unpack_from(body, offset)
+        offset += COUNT.size
+        runs = []
+        for _ in range(run_count):
+            runs.append(RUN.unpack_from(body, offset))
+            offset += RUN.size
+        (checkpoint_count,) = COUNT.unpack_from(body, offset)
+        offset += COUNT.size
+        checkpoints = []
+        for _ in range(checkpoint_count):
+            checkpoints.append(CHECKPOINT.unpack_from(body, offset))
+            offset += CHECKPOINT.size
+        return cls(seed, start_ticks, keys, runs, checkpoints, checkpoint_interval)
+
+    def get_pressed(self):
+        if self.frame < self.frames:
+            return self.pressed[self.frame]
+        return self.empty
+
+    def menu_toggled(self):
+        return self.frame < self.frames and self.toggled[self.frame]
+
+    def frame_ms(self):
+        if self.frame < self.frames:
+            return self.milliseconds[self.frame]
+        return 1000 / FPS
+
+    def next_frame(self):
+        self.frame += 1
+
+
+def play(replay, render = False):
+    """
+       Reproduce una grabación sin ventana y comprueba sus hashes.
+
+       Parámetros
+       ----------
+       replay : Replay
+           Grabación a reproducir.
+       render : bool, opcional
+           Dibujar también cada paso, por defecto `False`.
+
+       Retorna
+       -------
+       dict
+           Resultado: pasos, hashes comprobados, primer paso que no coincide (o `None`), hash final,
+           percentiles del paso completo y de cada fase del perfilador.
+       """
+    from headless import HeadlessRunner
+
+    runner = HeadlessRunner(render = render, seed = replay.seed, input = replay)
+    game_time.start_simulation(replay.start_ticks)
+    level = runner.level
+    level.profiler.enabled = True
+    level.profiler.keep_samples = True
+
+    checked = 0
+    first_mismatch = None
+    for frame in range(1, replay.frames + 1):
+        runner.step()
+        expected = replay.checkpoints.get(frame)
+        if expected is not None:
+            checked += 1
+            if first_mismatch is None and state_hash(level) != expected:
+                first_mismatch = frame
+
+    def summary(values):
+        return {name: round(percentile(values, percent), 4) for name, percent in (('p50', 50), ('p95', 95), ('p99', 99))}
+
+    return {
+        'frames': replay.frames,
+        'checkpoints': checked,
+        'first_mismatch': first_mismatch,
+        'final_hash': state_hash(level).hex(),
+        'frame': summary(runner.frame_times),
+        'phases': {name: summary(samples) for name, samples in level.profiler.samples.items()},
+    }
+
+
+def record_script(path, script = None, frames = 600, seed = 0):
+    """
+       Graba sin ventana una partida con entrada programada (por defecto `DEFAULT_SCRIPT`).
+
+       Retorna
+       -------
+       InputRecorder
+           Grabación guardada en `path`.
+       """
+    from headless import DEFAULT_SCRIPT, HeadlessRunner
+
+    runner = HeadlessRunner(script = DEFAULT_SCRIPT if script is None else script, seed = seed)
+    recorder = InputRecorder(seed, game_time.get_ticks())
+    for _ in range(frames):
+        recorder.record(runner.input.get_pressed(), runner.input.menu_toggled(), runner.input.frame_ms())
+        runner.step()
+        recorder.checkpoint(runner.level)
+    recorder.save(path)
+    return recorder
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Reproduce una partida grabada sin ventana.')
+    parser.add_argument('path', help = 'archivo de la grabación')
+    parser.add_argument('--record-script', action = 'store_true', help = 'grabar el guion de ejemplo en lugar de reproducir')
+    parser.add_argument('--frames', type = int, default = 600, help = 'pasos a grabar con --record-script')
+    parser.add_argument('--seed', type = int, default = 0, help = 'semilla para --record-script')
+    parser.add_argument('--render', action = 'store_true', help = 'dibujar también cada paso')
+    parser.add_argument('--output', help = 'guardar el resultado en un JSON')
+    args = parser.parse_args(argv)
+
+    if args.record_script:
+        recorder = record_script(args.path, frames = args.frames, seed = args.seed)
+        print(f'{args.path}: {recorder.frames} pasos en {len(recorder.runs)} tramos, '
+              f'{len(recorder.checkpoints)} hashes de control')
+        return
+
+    result = play(Replay.load(args.path), render = args.render)
+    frame = result['frame']
+    print(f'{result["frames"]} pasos; fotograma p50 {frame["p50"]:.3f}  p95 {frame["p95"]:.3f}  p99 {frame["p99"]:.3f} ms')
+    if result['first_mismatch'] is None:
+        print(f'Estado idéntico en los {result["checkpoints"]} hashes de control (final {result["final_hash"]})')
+    else:
+        print(f'El estado diverge en el paso {result["first_mismatch"]}')
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(result, output, indent = 2)
+    if result['first_mismatch'] is not None:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
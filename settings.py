@@ -2,7 +2,20 @@
 WIDTH    = 1280	
 HEIGTH   = 720
 FPS      = 60
+UPDATE_RATE = 60 # Pasos de lógica por segundo (paso fijo)
+RENDER_FPS = FPS # Límite de fotogramas dibujados por segundo; 0 = sin límite
+MAX_UPDATES_PER_FRAME = 5 # Pasos de lógica máximos entre dos fotogramas; el resto se descarta
 TILESIZE = 64
+CHUNK_TILES = 16 # Casillas por lado de cada chunk pre-renderizado del mapa
+OCCLUDER_CACHE_SIZE = 16384 # Rectángulos con oclusores estáticos memorizados
+ASSET_CACHE_BYTES = 256 * 1024 * 1024 # Memoria máxima de la caché de imágenes y sonidos
+TEXT_CACHE_SIZE = 512 # Textos renderizados que se guardan para reutilizarlos
+ENEMY_SLEEP_MARGIN = 128 # Distancia extra sobre notice_radius y la cámara a la que se despiertan los enemigos
+PARTICLE_POOL_SIZE = 256 # Máximo de efectos de partículas que son sprites (llamas) activos a la vez
+PARTICLE_SYSTEM_SIZE = 8192 # Máximo de partículas por lotes (hojas, golpes, muertes) activas a la vez
+AUTOSAVE_INTERVAL = 30000 # Milisegundos de juego entre autoguardados de la partida
+QUICKSAVE_PATH = 'quicksave.bin' # Archivo del guardado rápido (F5 guarda, F9 carga)
+SAVE_DB_PATH = 'saves.db' # Base de datos de las partidas guardadas (--save)
 
 # Armas
 weapon_data = {
@@ -26,11 +39,28 @@ ITEM_BOX_SIZE = 80
 UI_FONT = 'graphics/font/joystix.ttf'
 UI_FONT_SIZE = 18
 
+# Panel de rendimiento (F3)
+PERF_OVERLAY_FONT_SIZE = 20
+PERF_OVERLAY_PHASES = ('update', 'enemy_update', 'attack_logic', 'draw', 'ui')
+PERF_GRAPH_WIDTH = 240 # Fotogramas que muestra la gráfica (uno por columna)
+PERF_GRAPH_HEIGHT = 60
+PERF_GRAPH_MAX_MS = 50 # Tiempo de fotograma correspondiente a la altura de la gráfica
+
 # Colores de la interfaz de usuario
 HEALTH_COLOR = 'red'
 ENERGY_COLOR = 'blue'
 UI_BORDER_COLOR_ACTIVE = 'gold'
 
+# Prioridad de cada efecto de partículas. Con el pool lleno se descartan primero los de menor prioridad.
+# Las llamas son sprites de ataque, así que tienen la prioridad más alta.
+particle_priority = {
+    'leaf': 0,
+    'squid': 1, 'raccoon': 1, 'spirit': 1, 'bamboo': 1,
+    'claw': 2, 'slash': 2, 'sparkle': 2, 'leaf_attack': 2, 'thunder': 2,
+    'aura': 2, 'heal': 2,
+    'flame': 3,
+}
+
 # Magia
 magic_data = {
     'flame': {'strength': 5, 'cost': 20, 'graphic': 'graphics/particles/flame/fire.png'},
@@ -0,0 +1,224 @@
+import heapq
+from itertools import count
+
+import pygame
+from settings import *
+
+
+class SpatialHashGroup(pygame.sprite.Group):
+    """
+    Grupo de sprites indexado en una rejilla alineada con las casillas del mapa (`TILESIZE`).
+
+    Cada sprite se registra en todas las celdas que ocupa su rectángulo de colisión, de forma que
+    las consultas solo recorren los sprites cercanos en lugar del grupo completo. El índice se
+    mantiene solo: al añadir un sprite se inserta en la rejilla y al llamar a `kill()` (o `remove`)
+    se elimina de ella. Los sprites que se mueven deben pasarse a `refresh` antes de consultar.
+
+    Hereda de
+    ----------
+    pygame.sprite.Group
+
+    Atributos
+    ----------
+    rect_attr : str
+        Nombre del atributo del sprite que se indexa ('hitbox' o 'rect').
+    cell_size : int
+        Tamaño en píxeles de cada celda de la rejilla.
+    grid : dict
+        Diccionario {(columna, fila): {sprite: orden}} con los sprites de cada celda.
+
+    Métodos
+    -------
+    cells_for(rect):
+        Devuelve las celdas de la rejilla que toca un rectángulo.
+    nearby(rect):
+        Itera los sprites que pueden colisionar con un rectángulo, en orden de inserción.
+    collide(rect):
+        Devuelve los sprites cuyo rectángulo colisiona con `rect`, como `pygame.sprite.spritecollide`.
+    refresh(sprites):
+        Vuelve a indexar los sprites que se han movido o cambiado de tamaño.
+    """
+
+    def __init__(self, *sprites, rect_attr = 'hitbox', cell_size = TILESIZE):
+        """
+           Inicializa el grupo y su rejilla vacía.
+
+           Parámetros
+           ----------
+           sprites : pygame.sprite.Sprite
+               Sprites iniciales del grupo.
+           rect_attr : str, opcional
+               Atributo del sprite usado para indexarlo, por defecto 'hitbox'.
+           cell_size : int, opcional
+               Tamaño de las celdas de la rejilla, por defecto `TILESIZE`.
+           """
+        self.rect_attr = rect_attr
+        self.cell_size = cell_size
+        self.grid = {}
+        self._cells = {}
+        self._rects = {}
+        self._order = {}
+        self._counter = count()
+        self._pending = []
+        super().__init__(*sprites)
+
+    def cells_for(self, rect):
+        """
+           Devuelve las celdas de la rejilla que toca un rectángulo.
+
+           Parámetros
+           ----------
+           rect : pygame.Rect
+               Rectángulo a consultar.
+
+           Retorna
+           -------
+           list
+               Lista de tuplas (columna, fila).
+           """
+        size = self.cell_size
+        left = rect.left // size
+        right = (rect.right - 1) // size
+        top = rect.top // size
+        bottom = (rect.bottom - 1) // size
+        return [(col, row) for row in range(top, bottom + 1) for col in range(left, right + 1)]
+
+    def add_internal(self, sprite, layer = None):
+        super().add_internal(sprite, layer)
+        # Los sprites se añaden a sus grupos antes de tener rectángulo, así que se indexan
+        # en la siguiente consulta.
+        self._order[sprite] = next(self._counter)
+        self._pending.append(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self._order.pop(sprite, None)
+        self._unindex(sprite)
+
+    def _index_pending(self):
+        """
+           Inserta en la rejilla los sprites añadidos desde la última consulta.
+           """
+        for sprite in self._pending:
+            order = self._order.get(sprite)
+            if order is None: # Eliminado antes de llegar a indexarse
+                continue
+            self._index(sprite, order)
+        self._pending.clear()
+
+    def _index(self, sprite, order):
+        """
+           Inserta un sprite en las celdas que toca su rectángulo actual.
+           """
+        rect = getattr(sprite, self.rect_attr)
+        cells = self.cells_for(rect)
+        self._cells[sprite] = cells
+        self._rects[sprite] = rect.copy()
+        for cell in cells:
+            self.grid.setdefault(cell, {})[sprite] = order
+
+    def _unindex(self, sprite):
+        """
+           Saca un sprite de todas las celdas de la rejilla en las que estaba.
+           """
+        self._rects.pop(sprite, None)
+        for cell in self._cells.pop(sprite, ()):
+            bucket = self.grid.get(cell)
+            if bucket is not None:
+                bucket.pop(sprite, None)
+                if not bucket:
+                    del self.grid[cell]
+
+    def nearby(self, rect):
+        """
+           Itera los sprites que pueden colisionar con un rectángulo, en el mismo orden en el que
+           se recorrería el grupo completo.
+
+           El rectángulo se vuelve a leer tras cada sprite devuelto: si el llamador lo desplaza
+           (por ejemplo, al resolver una colisión) se añaden los sprites de las nuevas celdas que
+           aún no se habrían visitado. Así el resultado coincide con recorrer el grupo entero.
+
+           Parámetros
+           ----------
+           rect : pygame.Rect
+               Rectángulo de consulta. Puede modificarse durante la iteración.
+
+           Retorna
+           -------
+           generator
+               Sprites candidatos, ordenados por orden de inserción.
+           """
+        if self._pending:
+            self._index_pending()
+
+        visited_cells = set()
+        pending = []
+        queued = set()
+        last_order = -1
+        last_rect = None
+
+        while True:
+            if rect != last_rect:
+                last_rect = rect.copy()
+                for cell in self.cells_for(rect):
+                    if cell in visited_cells:
+                        continue
+                    visited_cells.add(cell)
+                    for sprite, order in self.grid.get(cell, {}).items():
+                        if order > last_order and order not in queued:
+                            queued.add(order)
+                            heapq.heappush(pending, (order, sprite))
+            if not pending:
+                return
+            last_order, sprite = heapq.heappop(pending)
+            yield sprite
+
+    def refresh(self, sprites):
+        """
+           Vuelve a indexar los sprites cuyo rectángulo ha cambiado desde que se indexaron.
+
+           Parámetros
+           ----------
+           sprites : iterable
+               Sprites que pueden haberse movido. Se ignoran los que no pertenecen al grupo.
+           """
+        if self._pending:
+            self._index_pending()
+
+        rect_attr = self.rect_attr
+        for sprite in sprites:
+            old_rect = self._rects.get(sprite)
+            if old_rect is not None and getattr(sprite, rect_attr) != old_rect:
+                self._unindex(sprite)
+                self._index(sprite, self._order[sprite])
+
+    def collide(self, rect):
+        """
+           Devuelve los sprites del grupo cuyo rectángulo colisiona con `rect`.
+
+           Equivale a `pygame.sprite.spritecollide` (mismo resultado y mismo orden), pero solo
+           comprueba los sprites de las celdas que toca `rect`.
+
+           Parámetros
+           ----------
+           rect : pygame.Rect
+               Rectángulo de consulta.
+
+           Retorna
+           -------
+           list
+               Sprites que colisionan, en orden de inserción.
+           """
+        if self._pending:
+            self._index_pending()
+
+        candidates = {}
+        for cell in self.cells_for(rect):
+            bucket = self.grid.get(cell)
+            if bucket:
+                candidates.update(bucket)
+
+        rect_attr = self.rect_attr
+        hits = [(order, sprite) for sprite, order in candidates.items() if rect.colliderect(getattr(sprite, rect_attr))]
+        hits.sort(key = lambda hit: hit[0])
+        return [sprite for _, sprite in hits]
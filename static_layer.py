@@ -0,0 +1,224 @@
+from bisect import bisect_left, insort
+
+import pygame
+from settings import *
+
+
+class Chunk:
+    """
+    Porción cuadrada del mapa con el suelo y los sprites estáticos pre-renderizados.
+
+    Atributos
+    ----------
+    rect : pygame.Rect
+        Rectángulo del chunk en coordenadas del mundo.
+    sprites : dict
+        Sprites estáticos que tocan el chunk, con su orden de dibujado {sprite: orden}.
+    draw_list : list
+        Tuplas (centery, orden, sprite) mantenidas ordenadas con `bisect` al añadir o quitar sprites.
+    surface : pygame.Surface or None
+        Superficie cacheada del chunk. Es `None` hasta que se hornea por primera vez.
+    dirty : bool
+        Indica si el contenido ha cambiado y hay que volver a hornear la superficie.
+    """
+    def __init__(self, rect):
+        self.rect = rect
+        self.sprites = {}
+        self.draw_list = []
+        self.surface = None
+        self.dirty = True
+
+
+class StaticChunkLayer:
+    """
+    Capa estática del mundo dividida en chunks de `CHUNK_TILES` x `CHUNK_TILES` casillas.
+
+    El suelo y los azulejos que no se mueven (hierba, objetos) se hornean en una superficie por
+    chunk, de modo que cada fotograma solo se blitean los chunks que se ven en la cámara. Un chunk
+    solo se vuelve a hornear cuando cambia algo en él, por ejemplo al cortar la hierba.
+
+    Atributos
+    ----------
+    floor_surf : pygame.Surface
+        Imagen del suelo del nivel.
+    chunk_size : int
+        Lado de cada chunk en píxeles.
+    chunks : dict
+        Diccionario {(columna, fila): Chunk}.
+    cells : dict
+        Sprites estáticos de cada casilla {(columna, fila): {sprite: orden}}, para buscar oclusores.
+    occluder_cache : dict
+        Resultados de `occluders` por rectángulo. Se vacía cada vez que se añade o quita un sprite.
+
+    Métodos
+    -------
+    add(sprite, order):
+        Registra un sprite estático en los chunks que toca.
+    remove(sprite):
+        Quita un sprite estático y marca sus chunks para volver a hornearlos.
+    occluders(rect):
+        Devuelve los sprites estáticos que se solapan con un rectángulo.
+    draw(surface, offset):
+        Dibuja los chunks visibles con el desplazamiento de cámara indicado.
+    """
+    def __init__(self, floor_surf, chunk_tiles = CHUNK_TILES):
+        """
+           Inicializa la capa y crea los chunks que cubren el suelo.
+
+           Parámetros
+           ----------
+           floor_surf : pygame.Surface
+               Imagen del suelo, colocada en el origen del mundo.
+           chunk_tiles : int, opcional
+               Número de casillas por lado de cada chunk, por defecto `CHUNK_TILES`.
+           """
+        self.floor_surf = floor_surf
+        self.chunk_size = chunk_tiles * TILESIZE
+        self.chunks = {}
+        self.sprite_chunks = {}
+        self.cells = {}
+        self.sprite_cells = {}
+        self.occluder_cache = {}
+
+        for key in self.keys_for(floor_surf.get_rect()):
+            self.get_chunk(key)
+
+    def keys_for(self, rect, size = None):
+        """
+           Devuelve las claves de los chunks (o de las celdas de lado `size`) que toca un rectángulo.
+           """
+        size = size or self.chunk_size
+        return [(col, row)
+                for row in range(rect.top // size, (rect.bottom - 1) // size + 1)
+                for col in range(rect.left // size, (rect.right - 1) // size + 1)]
+
+    def get_chunk(self, key):
+        """
+           Devuelve el chunk con la clave indicada, creándolo si no existe.
+           """
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            size = self.chunk_size
+            chunk = Chunk(pygame.Rect(key[0] * size, key[1] * size, size, size))
+            self.chunks[key] = chunk
+        return chunk
+
+    def add(self, sprite, order):
+        """
+           Registra un sprite estático en los chunks que toca.
+
+           Parámetros
+           ----------
+           sprite : pygame.sprite.Sprite
+               Sprite que no se mueve (hierba u objeto).
+           order : int
+               Orden de inserción del sprite en el grupo, usado para desempatar la ordenación en Y.
+           """
+        keys = self.keys_for(sprite.rect)
+        self.sprite_chunks[sprite] = keys
+        for key in keys:
+            chunk = self.get_chunk(key)
+            chunk.sprites[sprite] = order
+            insort(chunk.draw_list, (sprite.rect.centery, order, sprite))
+            chunk.dirty = True
+
+        self.occluder_cache.clear()
+        cells = self.keys_for(sprite.rect, TILESIZE)
+        self.sprite_cells[sprite] = cells
+        for cell in cells:
+            self.cells.setdefault(cell, {})[sprite] = order
+
+    def remove(self, sprite):
+        """
+           Quita un sprite estático y marca sus chunks para volver a hornearlos.
+           """
+        for key in self.sprite_chunks.pop(sprite, ()):
+            chunk = self.chunks[key]
+            order = chunk.sprites.pop(sprite)
+            del chunk.draw_list[bisect_left(chunk.draw_list, (sprite.rect.centery, order))]
+            chunk.dirty = True
+
+        self.occluder_cache.clear()
+        for cell in self.sprite_cells.pop(sprite, ()):
+            sprites = self.cells[cell]
+            del sprites[sprite]
+            if not sprites:
+                del self.cells[cell]
+
+    def bake(self, chunk):
+        """
+           Hornea el suelo y los sprites estáticos de un chunk en su superficie.
+
+           Los sprites se dibujan ordenados por Y igual que en `YSortCameraGroup.custom_draw`, usando la
+           lista ya ordenada del chunk.
+           """
+        if chunk.surface is None:
+            chunk.surface = pygame.Surface(chunk.rect.size).convert()
+        chunk.surface.fill(WATER_COLOR)
+        origin = pygame.math.Vector2(chunk.rect.topleft)
+        chunk.surface.blit(self.floor_surf, -origin)
+        for _, _, sprite in chunk.draw_list:
+            chunk.surface.blit(sprite.image, sprite.rect.topleft - origin)
+        chunk.dirty = False
+
+    def occluders(self, rect):
+        """
+           Devuelve los sprites estáticos que se solapan con un rectángulo.
+
+           Parámetros
+           ----------
+           rect : pygame.Rect
+               Rectángulo en coordenadas del mundo.
+
+           Retorna
+           -------
+           dict
+               Diccionario {sprite: orden} con los sprites estáticos solapados. Es compartido con la
+               caché: no debe modificarse.
+           """
+        key = (rect.x, rect.y, rect.width, rect.height)
+        found = self.occluder_cache.get(key)
+        if found is not None:
+            return found
+        if len(self.occluder_cache) >= OCCLUDER_CACHE_SIZE:
+            self.occluder_cache.clear()
+
+        found = {}
+        cells = self.cells
+        for cell in self.keys_for(rect, TILESIZE):
+            sprites = cells.get(cell)
+            if sprites is None:
+                continue
+            for sprite, order in sprites.items():
+                if sprite not in found and sprite.rect.colliderect(rect):
+                    found[sprite] = order
+        self.occluder_cache[key] = found
+        return found
+
+    def draw(self, surface, offset):
+        """
+           Dibuja los chunks visibles, horneando antes los que hayan cambiado.
+
+           Parámetros
+           ----------
+           surface : pygame.Surface
+               Superficie de destino (la pantalla).
+           offset : pygame.math.Vector2
+               Desplazamiento de la cámara.
+
+           Retorna
+           -------
+           int
+               Número de chunks dibujados.
+           """
+        view_rect = surface.get_rect(topleft = (int(offset.x), int(offset.y)))
+        drawn = 0
+        for key in self.keys_for(view_rect):
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                continue
+            if chunk.dirty:
+                self.bake(chunk)
+            surface.blit(chunk.surface, chunk.rect.topleft - offset)
+            drawn += 1
+        return drawn
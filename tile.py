@@ -20,8 +20,10 @@ class Tile(pygame.sprite.Sprite):
           Tipo de sprite ('object' o 'background') que determina su comportamiento en el mundo.
       surface : pygame.Surface, opcional
           Superficie que representa el azulejo, por defecto es un cuadrado vacío de tamaño `TILESIZE`.
+      tile_id : int, opcional
+          Índice de la casilla del mapa. Identifica a la hierba cortada en las partidas guardadas.
       """
-    def __init__(self, pos, groups, sprite_type, surface = pygame.Surface((TILESIZE, TILESIZE))):
+    def __init__(self, pos, groups, sprite_type, surface = pygame.Surface((TILESIZE, TILESIZE)), tile_id = None):
         """
             Inicializa un nuevo azulejo en el juego.
 
@@ -36,6 +38,8 @@ class Tile(pygame.sprite.Sprite):
             surface : pygame.Surface, opcional
                 Superficie que representa el azulejo. Se usa una superficie predeterminada de tamaño
                 `TILESIZE` si no se proporciona una. Por defecto es un cuadrado vacío.
+            tile_id : int, opcional
+                Índice de la casilla del mapa (fila * columnas + columna).
 
             Atributos
             ----------
@@ -50,6 +54,7 @@ class Tile(pygame.sprite.Sprite):
             """
         super().__init__(groups)
         self.sprite_type = sprite_type
+        self.tile_id = tile_id
         self.image = surface
         if sprite_type == 'object':
             self.rect = self.image.get_rect(topleft = (pos[0], pos[1] - TILESIZE ))
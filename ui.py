@@ -1,5 +1,6 @@
 import pygame
 from settings import *
+from assets import asset_cache, text_cache
 
 class UI:
     def __init__(self):
@@ -7,6 +8,11 @@ class UI:
         """
         Clase encargada de gestionar y renderizar la interfaz gráfica del usuario (HUD).
 
+        Cada elemento del HUD (barras de vida y energía, cajas del arma y la magia y contador de
+        experiencia) se compone en su propia superficie opaca, que solo se vuelve a dibujar cuando
+        cambian los datos que muestra. El resto de fotogramas el HUD completo es una sola llamada a
+        `Surface.blits` con cinco superficies pequeñas.
+
         Atributos
         ----------
         display_surface : pygame.Surface
@@ -21,26 +27,36 @@ class UI:
             Lista de superficies gráficas de las armas disponibles.
         magic_graphics : list
             Lista de superficies gráficas de las magias disponibles.
+        layers : dict
+            Elementos del HUD ya compuestos {nombre: (datos, superficie, posición)}.
+        redraws : int
+            Veces que se ha tenido que volver a componer algún elemento.
 
         Métodos
         -------
+        layer(name, key, build, *args):
+            Devuelve un elemento del HUD, componiéndolo de nuevo solo si han cambiado sus datos.
+
         show_bar(current_amount, max_amount, bg_rect, color):
-            Dibuja una barra de estado (vida o energía) en pantalla.
+            Compone una barra de estado (vida o energía).
+
+        bar_width(current_amount, max_amount, bg_rect):
+            Devuelve el ancho en píxeles de la parte llena de una barra.
 
         show_exp(exp):
-            Muestra la cantidad de experiencia del jugador en pantalla.
+            Compone el contador de experiencia del jugador.
 
-        selection_box(x, y, is_switching):
+        selection_box(surface, x, y, is_switching):
             Dibuja una caja de selección para arma o magia y devuelve su rectángulo.
 
         weapon_overlay(weapon_index, is_switching):
-            Muestra el icono del arma actualmente seleccionada.
+            Compone la caja con el icono del arma actualmente seleccionada.
 
         magic_overlay(magic_index, is_switching):
-            Muestra el icono de la magia actualmente seleccionada.
+            Compone la caja con el icono de la magia actualmente seleccionada.
 
         display(player):
-            Llama a los métodos necesarios para renderizar el HUD completo del jugador.
+            Dibuja el HUD completo del jugador.
         """
 
         # General
@@ -55,18 +71,47 @@ class UI:
         self.weapon_graphics = []
         for row in weapon_data.values():
             path = row['graphic']
-            weapon = pygame.image.load(path).convert_alpha()
+            weapon = asset_cache.image(path)
             self.weapon_graphics.append(weapon)
 
         self.magic_graphics = []
         for row in magic_data.values():
             path  = row['graphic']
-            magic = pygame.image.load(path).convert_alpha()
+            magic = asset_cache.image(path)
             self.magic_graphics.append(magic)
 
+        # Elementos del HUD ya compuestos
+        self.layers = {}
+        self.redraws = 0
+
+    def layer(self, name, key, build, *args):
+        """
+           Devuelve un elemento del HUD ya compuesto, componiéndolo de nuevo solo si `key` ha cambiado.
+
+           Parámetros
+           ----------
+           name : str
+               Nombre del elemento.
+           key : object
+               Datos que muestra el elemento; si son iguales a los de la última vez se reutiliza.
+           build : callable
+               Método que compone el elemento con `args` y devuelve (superficie, posición).
+
+           Retorna
+           -------
+           tuple
+               (superficie, posición) del elemento.
+           """
+        cached = self.layers.get(name)
+        if cached is None or cached[0] != key:
+            cached = (key, *build(*args))
+            self.layers[name] = cached
+            self.redraws += 1
+        return cached[1], cached[2]
+
     def show_bar(self, current_amount, max_amount, bg_rect, color):
         """
-           Dibuja una barra de estado (vida o energía).
+           Compone una barra de estado (vida o energía).
 
            Parámetros
            ----------
@@ -75,47 +120,78 @@ class UI:
            max_amount : float
                Valor máximo que puede tener la estadística.
            bg_rect : pygame.Rect
-               Rectángulo de fondo para la barra.
+               Rectángulo de fondo para la barra, en coordenadas de la pantalla.
            color : tuple
                Color de la barra en formato RGB.
+
+           Retorna
+           -------
+           tuple
+               (superficie, posición) de la barra.
            """
+        surface = pygame.Surface(bg_rect.size).convert()
+        local_rect = surface.get_rect()
+
         # Dibujar fondo de la barra
-        pygame.draw.rect(self.display_surface, UI_BACKGROUND_COLOR, bg_rect)
+        pygame.draw.rect(surface, UI_BACKGROUND_COLOR, local_rect)
 
         # Convertir estadística a píxel
-        ratio = current_amount / max_amount
-        current_width = bg_rect.width * ratio
-        current_rect = bg_rect.copy()
-        current_rect.width = current_width
+        current_rect = local_rect.copy()
+        current_rect.width = self.bar_width(current_amount, max_amount, bg_rect)
 
         # Dibujar la barra
-        pygame.draw.rect(self.display_surface, color, current_rect)
-        pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, bg_rect, 3)
+        pygame.draw.rect(surface, color, current_rect)
+        pygame.draw.rect(surface, UI_BORDER_COLOR, local_rect, 3)
+        return surface, bg_rect.topleft
+
+    def bar_width(self, current_amount, max_amount, bg_rect):
+        """
+           Devuelve el ancho en píxeles de la parte llena de una barra, redondeado igual que `pygame.Rect`.
+
+           La barra solo se vuelve a componer cuando cambia este ancho, no con cada cambio de la
+           estadística (la energía se regenera poco a poco en cada fotograma).
+           """
+        ratio = current_amount / max_amount
+        current_rect = pygame.Rect(bg_rect)
+        current_rect.width = bg_rect.width * ratio
+        return current_rect.width
 
     def show_exp(self, exp):
         """
-           Muestra la experiencia actual del jugador en la esquina inferior derecha.
+           Compone la experiencia actual del jugador, que se muestra en la esquina inferior derecha.
+           El texto se toma de `text_cache`.
 
            Parámetros
            ----------
            exp : int
                Puntos de experiencia del jugador.
+
+           Retorna
+           -------
+           tuple
+               (superficie, posición) del contador.
            """
-        text_surf = self.font.render(str(int(exp)), False, TEXT_COLOR)
+        text_surf = text_cache.render(self.font, str(int(exp)), False, TEXT_COLOR)
         x = self.display_surface.get_size()[0] - 20
         y = self.display_surface.get_size()[1] - 20
         text_rect = text_surf.get_rect(bottomright = (x,y))
+        box_rect = text_rect.inflate(10,10)
 
-        pygame.draw.rect(self.display_surface, UI_BACKGROUND_COLOR, text_rect.inflate(10,10))
-        self.display_surface.blit(text_surf, text_rect)
-        pygame.draw.rect(self.display_surface, UI_BACKGROUND_COLOR, text_rect.inflate(10,10), 3)
+        surface = pygame.Surface(box_rect.size).convert()
+        local_rect = surface.get_rect()
+        pygame.draw.rect(surface, UI_BACKGROUND_COLOR, local_rect)
+        surface.blit(text_surf, text_rect.move(-box_rect.x, -box_rect.y))
+        pygame.draw.rect(surface, UI_BACKGROUND_COLOR, local_rect, 3)
+        return surface, box_rect.topleft
 
-    def selection_box(self, x, y, is_switching):
+    def selection_box(self, surface, x, y, is_switching):
         """
           Dibuja una caja de selección con borde resaltado si se está cambiando de arma o magia.
 
           Parámetros
           ----------
+          surface : pygame.Surface
+              Superficie sobre la que se dibuja.
           x : int
               Coordenada X de la caja.
           y : int
@@ -129,16 +205,30 @@ class UI:
               Rectángulo de la caja de selección.
           """
         bg_rect = pygame.Rect(x, y, ITEM_BOX_SIZE, ITEM_BOX_SIZE)
-        pygame.draw.rect(self.display_surface, UI_BACKGROUND_COLOR, bg_rect)
+        pygame.draw.rect(surface, UI_BACKGROUND_COLOR, bg_rect)
         if is_switching:
-            pygame.draw.rect(self.display_surface, UI_BORDER_COLOR_ACTIVE, bg_rect, 3)
+            pygame.draw.rect(surface, UI_BORDER_COLOR_ACTIVE, bg_rect, 3)
         else:
-            pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, bg_rect, 3)
+            pygame.draw.rect(surface, UI_BORDER_COLOR, bg_rect, 3)
         return bg_rect
 
+    def item_box(self, pos, image, is_switching):
+        """
+           Compone una caja de selección con un icono centrado.
+
+           Retorna
+           -------
+           tuple
+               (superficie, posición) de la caja.
+           """
+        surface = pygame.Surface((ITEM_BOX_SIZE, ITEM_BOX_SIZE)).convert()
+        bg_rect = self.selection_box(surface, 0, 0, is_switching)
+        surface.blit(image, image.get_rect(center = bg_rect.center))
+        return surface, pos
+
     def weapon_overlay(self, weapon_index, is_switching):
         """
-           Muestra el ícono del arma actualmente seleccionada.
+           Compone la caja con el ícono del arma actualmente seleccionada.
 
            Parámetros
            ----------
@@ -146,16 +236,17 @@ class UI:
                Índice del arma en la lista de armas.
            is_switching : bool
                Indica si se está cambiando de arma.
-           """
-        bg_rect = self.selection_box(10, 630, is_switching)
-        weapon_img = self.weapon_graphics[weapon_index]
-        weapon_rect = weapon_img.get_rect(center = bg_rect.center)
 
-        self.display_surface.blit(weapon_img, weapon_rect)
+           Retorna
+           -------
+           tuple
+               (superficie, posición) de la caja.
+           """
+        return self.item_box((10, 630), self.weapon_graphics[weapon_index], is_switching)
 
     def magic_overlay(self, magic_index, is_switching):
         """
-            Muestra el ícono de la magia actualmente seleccionada.
+            Compone la caja con el ícono de la magia actualmente seleccionada.
 
             Parámetros
             ----------
@@ -163,25 +254,38 @@ class UI:
                 Índice de la magia en la lista de magias.
             is_switching : bool
                 Indica si se está cambiando de magia.
-            """
-        bg_rect = self.selection_box(80, 620, is_switching)
-        magic_img = self.magic_graphics[magic_index]
-        magic_rect = magic_img.get_rect(center = bg_rect.center)
 
-        self.display_surface.blit(magic_img, magic_rect)
+            Retorna
+            -------
+            tuple
+                (superficie, posición) de la caja.
+            """
+        return self.item_box((80, 620), self.magic_graphics[magic_index], is_switching)
 
     def display(self, player):
         """
            Muestra la interfaz completa del jugador: barras de vida y energía, armas, magias y experiencia.
 
+           Cada elemento se vuelve a componer solo si ha cambiado lo que muestra (ancho de las barras de vida
+           y energía, arma o magia elegida y si se está cambiando, experiencia); si no, se reutiliza el del
+           fotograma anterior.
+           La caja de la magia se dibuja después de la del arma porque se solapan.
+
            Parámetros
            ----------
            player : Player
                Objeto jugador del cual se extraen los datos a mostrar.
            """
-        self.show_bar(player.health, player.stats['health'],self.health_bar_rect, HEALTH_COLOR)
-        self.show_bar(player.energy, player.stats['energy'],self.enery_bar_rect, ENERGY_COLOR)
-        self.weapon_overlay(player.weapon_index, not player.able_to_switch_weapon)
-        self.magic_overlay(player.magic_index, not player.able_to_switch_magic)
-        self.show_exp(player.exp)
-
+        health, max_health = player.health, player.stats['health']
+        energy, max_energy = player.energy, player.stats['energy']
+        health_width = self.bar_width(health, max_health, self.health_bar_rect)
+        energy_width = self.bar_width(energy, max_energy, self.enery_bar_rect)
+        weapon_switching = not player.able_to_switch_weapon
+        magic_switching = not player.able_to_switch_magic
+        self.display_surface.blits((
+            self.layer('health', health_width, self.show_bar, health, max_health, self.health_bar_rect, HEALTH_COLOR),
+            self.layer('energy', energy_width, self.show_bar, energy, max_energy, self.enery_bar_rect, ENERGY_COLOR),
+            self.layer('weapon', (player.weapon_index, weapon_switching), self.weapon_overlay, player.weapon_index, weapon_switching),
+            self.layer('magic', (player.magic_index, magic_switching), self.magic_overlay, player.magic_index, magic_switching),
+            self.layer('exp', int(player.exp), self.show_exp, player.exp),
+        ), doreturn = False)
@@ -1,5 +1,7 @@
 import pygame
+import game_time
 from settings import *
+from assets import text_cache
 
 class Upgrade:
 
@@ -34,6 +36,8 @@ class Upgrade:
         Controla si se puede mover la selección entre estadísticas.
     selection_time_cooldown : int
         Tiempo de espera en milisegundos entre movimientos de selección.
+    get_keys : callable
+        Función que devuelve el estado del teclado, por defecto `pygame.key.get_pressed`.
 
     Métodos
     -------
@@ -64,6 +68,7 @@ class Upgrade:
         self.attribute_names = list(player.stats.keys()) # Nombre de las estadísticas
         self.font = pygame.font.Font(UI_FONT, UI_FONT_SIZE)
         self.max_values = list(player.max_stats.values())
+        self.get_keys = pygame.key.get_pressed # Fuente de entrada del teclado
 
         # Creación de los ítems
         self.height = self.display_surface.get_size()[1] * 0.8 # Altura de los objetos
@@ -84,20 +89,20 @@ class Upgrade:
 
            Permite mover la selección entre las estadísticas y aplicar mejoras cuando se presiona la tecla de espacio.
            """
-        keys = pygame.key.get_pressed()
+        keys = self.get_keys()
 
         if self.able_to_move:
             if keys[pygame.K_RIGHT] and self.selection_index < self.attribute_n - 1:
                 self.selection_index += 1
                 self.able_to_move = False
-                self.selection_time = pygame.time.get_ticks()
+                self.selection_time = game_time.get_ticks()
             elif keys[pygame.K_LEFT] and self.selection_index >= 1:
                 self.selection_index -= 1
                 self.able_to_move = False
-                self.selection_time = pygame.time.get_ticks()
+                self.selection_time = game_time.get_ticks()
             if keys[pygame.K_SPACE]: # Botón de selección
                 self.able_to_move = False
-                self.selection_time = pygame.time.get_ticks()
+                self.selection_time = game_time.get_ticks()
                 self.item_list[self.selection_index].trigger(self.player)
 
     def selection_cooldown(self):
@@ -107,7 +112,7 @@ class Upgrade:
            Evita que el jugador se mueva rápidamente entre las estadísticas sin esperar el tiempo de cooldown.
            """
         if not self.able_to_move:
-            current_time = pygame.time.get_ticks()
+            current_time = game_time.get_ticks()
             if current_time - self.selection_time >= self.selection_time_cooldown:
                 self.able_to_move = True
 
@@ -206,7 +211,7 @@ class Item:
 
     def display_names(self, surface, name, cost, selected):
         """
-           Muestra el nombre y el costo de la mejora en el ítem.
+           Muestra el nombre y el costo de la mejora en el ítem. Los textos se toman de `text_cache`.
 
            Parámetros
            ----------
@@ -223,10 +228,10 @@ class Item:
 
 
         # Título
-        title_surf = self.font.render(name, False, color)
+        title_surf = text_cache.render(self.font, name, False, color)
         title_rect = title_surf.get_rect(midtop = self.rect.midtop + pygame.math.Vector2(0,20))
         # Coste
-        cost_surf = self.font.render(f'{int(cost)}', False, color)
+        cost_surf = text_cache.render(self.font, f'{int(cost)}', False, color)
         cost_rect = cost_surf.get_rect(midbottom = self.rect.midbottom - pygame.math.Vector2(0,20))
          # Dibujado
         surface.blit(title_surf, title_rect)
@@ -277,6 +282,7 @@ class Item:
             player.exp -= player.upgrade_cost[stat_upgrade]
             player.stats[stat_upgrade] *= 1.2
             player.upgrade_cost[stat_upgrade] *= 1.4
+            player.dirty.update(('exp', 'stats'))
 
     def display(self, surface, selection_index, stat_name, value, max_value, cost):
         """
@@ -1,13 +1,35 @@
 import pygame
+from settings import *
+from assets import asset_cache
+
+DIRECTIONS = ('up', 'down', 'left', 'right')
+
+# Tabla {(arma, dirección): superficie}, se rellena en la primera llamada a load_weapon_surfaces()
+weapon_surfaces = {}
+
+def load_weapon_surfaces():
+    """
+       Carga una sola vez las imágenes de todas las armas en todas las direcciones.
+
+       Retorna
+       -------
+       dict
+           Tabla {(arma, dirección): pygame.Surface} compartida por todos los ataques.
+       """
+    if not weapon_surfaces:
+        for weapon in weapon_data:
+            for direction in DIRECTIONS:
+                full_path = f'./graphics/weapons/{weapon}/{direction}.png'
+                weapon_surfaces[(weapon, direction)] = asset_cache.image(full_path)
+    return weapon_surfaces
 
 class Weapon(pygame.sprite.Sprite):
     def __init__(self, player, groups):
         super().__init__(groups)
         self.sprite_type = 'weapon'
         direction = player.status.split('_')[0]
-        # Recurso Gráfico
-        full_path = f'./graphics/weapons/{player.weapon}/{direction}.png'
-        self.image = pygame.image.load(full_path).convert_alpha()
+        # Recurso Gráfico (precargado, sin acceso a disco al atacar)
+        self.image = load_weapon_surfaces()[(player.weapon, direction)]
 
         # Posicionamiento (dibujado)
         if direction == 'right':
@@ -20,4 +42,4 @@ class Weapon(pygame.sprite.Sprite):
             self.rect = self.image.get_rect(midtop = player.rect.midbottom + pygame.math.Vector2(-10,0))
 
         else:
-            self.image.get_rect(center = player.rect.center)
\ No newline at end of file
+            self.image.get_rect(center = player.rect.center)